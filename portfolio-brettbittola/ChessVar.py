@@ -3,19 +3,240 @@
 # Date: 12/10/2023
 # Description: A game of chess with a board and unique moves for each piece.
 
+import random
+import time
+
+COLUMN_LETTERS = 'ABCDEFGH'
+ROW_NUMBERS = '12345678'
+
+# Squares are numbered 0-63 from A1 across each row to H8, so a square's index is (row - 1) * 8 + (column - 1)
+SQUARE_NAMES = [column + row for row in ROW_NUMBERS for column in COLUMN_LETTERS]
+SQUARE_INDEX = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+
+def square_index(square_name):
+    """Returns the 0-63 index of a square name such as 'E2' or 'e2', or None if the name is not on the board"""
+    return SQUARE_INDEX.get(square_name.upper())
+
+
+def encode_move(first_index, second_index):
+    """Packs a move between two 0-63 square indices into 12 bits"""
+    return first_index << 6 | second_index
+
+
+def decode_move(move):
+    """Unpacks a 12-bit move into a (from index, to index) pair"""
+    return move >> 6, move & 63
+
+
+# the 12-bit code of every move written as two lowercase square names run together, such as 'e2e4'
+MOVE_CODES = {(first + second).lower(): encode_move(first_index, second_index)
+              for first_index, first in enumerate(SQUARE_NAMES) for second_index, second in enumerate(SQUARE_NAMES)}
+
+
+# Pieces are encoded as small integers for the bitboard backend: 0 is an empty square, 1-6 are the white pawn through
+# king and 7-12 are the black pawn through king, so a piece's code is color * 6 + piece type + 1
+COLORS = ('white', 'black')
+PIECE_TYPES = ('pawn', 'knight', 'bishop', 'rook', 'queen', 'king')
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+WHITE, BLACK = range(2)
+
+
+def piece_code(color, piece_type):
+    """Returns the integer code for a piece given its color and piece type numbers"""
+    return color * 6 + piece_type + 1
+
+
+PIECE_CODES = {(color_name, type_name): piece_code(color, piece_type)
+               for color, color_name in enumerate(COLORS) for piece_type, type_name in enumerate(PIECE_TYPES)}
+COLOR_NUMBERS = {color_name: color for color, color_name in enumerate(COLORS)}
+PIECE_TYPE_NUMBERS = {type_name: piece_type for piece_type, type_name in enumerate(PIECE_TYPES)}
+# how many of each piece type, by PIECE_TYPES order, each side starts with
+STARTING_MATERIAL = (8, 2, 2, 2, 1, 1)
+# the order piece types are listed in by get_white_piece_list and get_black_piece_list
+PIECE_LIST_ORDER = ('pawn', 'rook', 'knight', 'bishop', 'king', 'queen')
+# the letter for each piece code in position text, standard FEN letters with white in uppercase
+FEN_LETTERS = '.PNBRQKpnbrqk'
+FEN_CODES = {letter: code for code, letter in enumerate(FEN_LETTERS) if code}
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w a2b2c2d2e2f2g2h2a7b7c7d7e7f7g7h7'
+# snapshots store each square as one 4-bit code, using these two extra codes for pawns that have not moved yet
+UNMOVED_WHITE_PAWN = 13
+UNMOVED_BLACK_PAWN = 14
+SNAPSHOT_SIZE = 33
+# the piece codes of the two squares in each possible snapshot byte, with None for a code that is not used, and which
+# of the two squares hold an unmoved pawn
+SNAPSHOT_NIBBLE_CODES = list(range(13)) + [piece_code(WHITE, PAWN), piece_code(BLACK, PAWN), None]
+SNAPSHOT_BYTE_CODES = [(SNAPSHOT_NIBBLE_CODES[byte & 15], SNAPSHOT_NIBBLE_CODES[byte >> 4]) for byte in range(256)]
+SNAPSHOT_BYTE_UNMOVED = [((byte & 15) in (UNMOVED_WHITE_PAWN, UNMOVED_BLACK_PAWN))
+                         | ((byte >> 4) in (UNMOVED_WHITE_PAWN, UNMOVED_BLACK_PAWN)) << 1 for byte in range(256)]
+
+
+# a bitboard with every square set
+ALL_SQUARES = (1 << 64) - 1
+
+
+def bit_indices(mask):
+    """Yields the square index of each set bit in a bitboard, lowest first"""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def _step_mask(index, steps):
+    """Returns a bitboard of the squares reached from a square by each (row, column) step that stays on the board"""
+    row, column = divmod(index, 8)
+    mask = 0
+    for row_step, column_step in steps:
+        target_row = row + row_step
+        target_column = column + column_step
+        if 0 <= target_row < 8 and 0 <= target_column < 8:
+            mask |= 1 << (target_row * 8 + target_column)
+    return mask
+
+
+def _line_mask(index, directions):
+    """Returns a bitboard of every square a slider could reach from a square on an empty board"""
+    row, column = divmod(index, 8)
+    mask = 0
+    for row_step, column_step in directions:
+        target_row = row + row_step
+        target_column = column + column_step
+        while 0 <= target_row < 8 and 0 <= target_column < 8:
+            mask |= 1 << (target_row * 8 + target_column)
+            target_row += row_step
+            target_column += column_step
+    return mask
+
+
+def _between_mask(first_index, second_index):
+    """Returns a bitboard of the squares strictly between two squares on a shared row, column or diagonal"""
+    first_row, first_column = divmod(first_index, 8)
+    second_row, second_column = divmod(second_index, 8)
+    row_difference = second_row - first_row
+    column_difference = second_column - first_column
+    if first_index == second_index:
+        return 0
+    if row_difference != 0 and column_difference != 0 and abs(row_difference) != abs(column_difference):
+        return 0
+    row_step = (row_difference > 0) - (row_difference < 0)
+    column_step = (column_difference > 0) - (column_difference < 0)
+    mask = 0
+    row = first_row + row_step
+    column = first_column + column_step
+    while (row, column) != (second_row, second_column):
+        mask |= 1 << (row * 8 + column)
+        row += row_step
+        column += column_step
+    return mask
+
+
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+
+KNIGHT_ATTACKS = [_step_mask(index, KNIGHT_STEPS) for index in range(64)]
+KING_ATTACKS = [_step_mask(index, ROOK_DIRECTIONS + BISHOP_DIRECTIONS) for index in range(64)]
+PAWN_ATTACKS = ([_step_mask(index, ((1, 1), (1, -1))) for index in range(64)],
+                [_step_mask(index, ((-1, 1), (-1, -1))) for index in range(64)])
+ROOK_LINES = [_line_mask(index, ROOK_DIRECTIONS) for index in range(64)]
+BISHOP_LINES = [_line_mask(index, BISHOP_DIRECTIONS) for index in range(64)]
+QUEEN_LINES = [ROOK_LINES[index] | BISHOP_LINES[index] for index in range(64)]
+# BETWEEN[first * 64 + second] holds the squares a slider passes over going from first to second
+BETWEEN = [_between_mask(first, second) for first in range(64) for second in range(64)]
+
+# RAYS[direction][index] holds every square from a square to the edge of the board in one of the eight directions of
+# QUEEN_DIRECTIONS. Rays in the first four directions run along rows and columns and the rest along diagonals. Rays
+# marked in RAY_INCREASING run toward higher square indices, so the nearest blocker on them is the lowest set bit.
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+RAYS = [[_line_mask(index, (direction,)) for index in range(64)] for direction in QUEEN_DIRECTIONS]
+RAY_INCREASING = [row_step > 0 or (row_step == 0 and column_step > 0) for row_step, column_step in QUEEN_DIRECTIONS]
+ROOK_RAYS = (0, 1, 2, 3)
+BISHOP_RAYS = (4, 5, 6, 7)
+QUEEN_RAYS = ROOK_RAYS + BISHOP_RAYS
+# the RAYS directions each piece type slides along, indexed by piece type, with None for the types that step
+SLIDER_RAYS = (None, None, BISHOP_RAYS, ROOK_RAYS, QUEEN_RAYS, None)
+
+
+def slider_attacks(index, occupied, directions):
+    """Returns a bitboard of the squares a slider on a square can reach in the given RAYS directions, stopping at and
+    including the first occupied square in each direction"""
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][index]
+        blockers = ray & occupied
+        if blockers:
+            if RAY_INCREASING[direction]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= RAYS[direction][blocker]
+        attacks |= ray
+    return attacks
+
+
+# Zobrist keys: a position's hash is the XOR of one random 64-bit key per (piece code, square), one per square holding
+# a pawn that has not made its first move, and one more when black is to move. The keys for code 0 (an empty square) are
+# all zero, and the seed is fixed so hashes are stable across processes and runs.
+_zobrist_random = random.Random(20231210)
+ZOBRIST_PIECES = [[0] * 64] + [[_zobrist_random.getrandbits(64) for index in range(64)] for code in range(1, 13)]
+ZOBRIST_FIRST_MOVES = [_zobrist_random.getrandbits(64) for index in range(64)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+
+# Tables restore reads a snapshot through. SNAPSHOT_LOW_CODES and SNAPSHOT_HIGH_CODES translate snapshot bytes to the
+# piece codes of their low and high squares, with 255 for a code that is not used. SNAPSHOT_BYTE_HASHES[n][byte] is the
+# Zobrist hash of the two squares of snapshot byte n, unmoved pawns included, SNAPSHOT_BYTE_PIECES[byte] lists the
+# byte's (piece code, 0 or 1 for the low or high square) pairs, and SNAPSHOT_BYTE_MATERIAL[byte] counts its pieces in
+# one byte per piece code, so adding the values of all 32 bytes gives every code's count at once.
+SNAPSHOT_LOW_CODES = bytes(255 if codes[0] is None else codes[0] for codes in SNAPSHOT_BYTE_CODES)
+SNAPSHOT_HIGH_CODES = bytes(255 if codes[1] is None else codes[1] for codes in SNAPSHOT_BYTE_CODES)
+SNAPSHOT_BYTE_PIECES = [tuple((code, offset) for offset, code in enumerate(SNAPSHOT_BYTE_CODES[byte]) if code)
+                        for byte in range(256)]
+SNAPSHOT_BYTE_MATERIAL = [sum(1 << (code - 1) * 8 for code, offset in SNAPSHOT_BYTE_PIECES[byte])
+                          for byte in range(256)]
+SNAPSHOT_BYTE_HASHES = [[0] * 256 for byte_index in range(32)]
+for _byte_index in range(32):
+    for _byte in range(256):
+        for _code, _offset in SNAPSHOT_BYTE_PIECES[_byte]:
+            SNAPSHOT_BYTE_HASHES[_byte_index][_byte] ^= ZOBRIST_PIECES[_code][_byte_index * 2 + _offset]
+            if SNAPSHOT_BYTE_UNMOVED[_byte] >> _offset & 1:
+                SNAPSHOT_BYTE_HASHES[_byte_index][_byte] ^= ZOBRIST_FIRST_MOVES[_byte_index * 2 + _offset]
+del _byte_index, _byte, _code, _offset
+
+
 class ChessVar:
     """Creates a new game of chess"""
 
-    def __init__(self):
-        """Initializes a new game of chess, setting the game state to unfinished and setting the team turn to white"""
+    def __init__(self, backend='board'):
+        """Initializes a new game of chess, setting the game state to unfinished and setting the team turn to white.
+        The backend is either 'board', which keeps Square and Piece objects, or 'bitboard', which keeps the position as
+        twelve 64-bit integers and validates moves with precomputed tables."""
         self._game_state = 'UNFINISHED'
         self._team_turn = 'white'
-        self._white_piece_list = ['pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'rook', 'rook',
-                                  'knight', 'knight', 'bishop', 'bishop', 'king', 'queen']
-        self._black_piece_list = ['pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'pawn', 'rook', 'rook',
-                                  'knight', 'knight', 'bishop', 'bishop', 'king', 'queen']
-        self._board = Board()
-        self._column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
+        # how many pieces of each type each team has left, indexed by color number then by PIECE_TYPES order
+        self._material = [list(STARTING_MATERIAL), list(STARTING_MATERIAL)]
+        if backend == 'board':
+            self._board = Board()
+            self._bitboards = None
+        elif backend == 'bitboard':
+            self._board = None
+            self._bitboards = Bitboards()
+        else:
+            raise ValueError(f"Unknown backend {backend!r}, expected 'board' or 'bitboard'")
+        # each made move links one (from index, to index, captured piece, board detail, game state, hash, previous
+        # record) tuple onto the chain, where the captured piece is a Piece or a bitboard piece code, the board detail
+        # is the bitboard backend's unmoved pawns mask before the move and the previous record is the one made before
+        # it, or None. Records are never changed once made, so a clone shares the whole chain and only links on its own.
+        self._undo_chain = None
+        self._undo_depth = 0
+        # how many of the first undo records are shared with a clone of this game, whose captured pieces must be
+        # copied before they are put back on the board
+        self._shared_moves = 0
+        self._hash = self.compute_hash()
+        # a profiling.MoveProfiler while profiling is turned on, checked once per move so it costs nothing when off
+        self._profiler = None
+        # an AttackMap kept up to date by every move once attack tracking is turned on
+        self._attack_map = None
 
     def get_game_state(self):
         """Returns if the game is still being played or, if not, who won"""
@@ -36,20 +257,285 @@ class ChessVar:
         """Returns whose turn it is"""
         return self._team_turn
 
-    def remove_piece(self, color, piece):
-        """Remove a captured piece from piece list"""
-        if color == 'white':
-            self._white_piece_list.remove(piece)
+    def get_hash(self):
+        """Returns the 64-bit Zobrist hash of the position, which covers piece placement, whose turn it is and which
+        pawns have not made their first move, and is updated by every make_move and unmake_move"""
+        return self._hash
+
+    def get_piece_code_at(self, index):
+        """Returns the code of the piece on a 0-63 square index, or 0 if the square is empty"""
+        if self._bitboards is not None:
+            return self._bitboards.get_code_at(index)
+        piece = self._board.get_piece_at(index)
+        if piece is None:
+            return 0
+        return piece.get_code()
+
+    def get_piece_codes(self):
+        """Returns a list of the piece code on each of the 64 squares, with 0 for an empty square"""
+        return [self.get_piece_code_at(index) for index in range(64)]
+
+    def get_unmoved_pawns(self):
+        """Returns a bitboard of the squares holding a pawn that has not made its first move"""
+        if self._bitboards is not None:
+            return self._bitboards.get_first_moves()
+        mask = 0
+        for index in range(64):
+            piece = self._board.get_piece_at(index)
+            if isinstance(piece, Pawn) and piece.is_first_move():
+                mask |= 1 << index
+        return mask
+
+    def compute_hash(self):
+        """Computes the Zobrist hash of the position from scratch"""
+        position_hash = 0
+        for index, code in enumerate(self.get_piece_codes()):
+            if code:
+                position_hash ^= ZOBRIST_PIECES[code][index]
+        for index in bit_indices(self.get_unmoved_pawns()):
+            position_hash ^= ZOBRIST_FIRST_MOVES[index]
+        if self._team_turn == 'black':
+            position_hash ^= ZOBRIST_BLACK_TO_MOVE
+        return position_hash
+
+    def set_position(self, codes, unmoved_pawns, team_turn):
+        """Replaces the position with the given list of 64 piece codes, bitboard of pawns that have not moved and team
+        to move. The piece counts, game state and hash are worked out from the new position, and the moves made so far
+        can no longer be unmade."""
+        material = [[0] * 6, [0] * 6]
+        pieces = [0] * 13
+        position_hash = 0
+        for index, code in enumerate(codes):
+            if code:
+                material[(code - 1) // 6][(code - 1) % 6] += 1
+                pieces[code] |= 1 << index
+                position_hash ^= ZOBRIST_PIECES[code][index]
+        for index in bit_indices(unmoved_pawns):
+            position_hash ^= ZOBRIST_FIRST_MOVES[index]
+        if team_turn == 'black':
+            position_hash ^= ZOBRIST_BLACK_TO_MOVE
+        self.load_position(codes, pieces, unmoved_pawns, team_turn, material, position_hash)
+
+    def load_position(self, codes, pieces, unmoved_pawns, team_turn, material, position_hash):
+        """Replaces the position with one already worked out by set_position or restore: the list of 64 piece codes,
+        the matching list of 13 piece bitboards indexed by code, the unmoved pawns bitboard, the team to move, the piece
+        counts indexed by color number then piece type, and the position's hash"""
+        if self._bitboards is not None:
+            self._bitboards.set_position(codes, pieces, unmoved_pawns)
+        else:
+            self._board.set_position(codes, pieces, unmoved_pawns)
+        # updated in place, so lists handed out by material() stay live when the position is replaced
+        self._material[WHITE][:] = material[WHITE]
+        self._material[BLACK][:] = material[BLACK]
+        if 0 in material[WHITE]:
+            if 0 in material[BLACK]:
+                raise ValueError('Both teams have lost every piece of a type')
+            self._game_state = 'BLACK_WON'
+        elif 0 in material[BLACK]:
+            self._game_state = 'WHITE_WON'
+        else:
+            self._game_state = 'UNFINISHED'
+        self._team_turn = team_turn
+        self._undo_chain = None
+        self._undo_depth = 0
+        self._shared_moves = 0
+        self._hash = position_hash
+        if self._attack_map is not None:
+            self._attack_map.set_position(codes)
+
+    def reset(self):
+        """Sets the game back to the standard starting position with white to move, reusing its board"""
+        self.set_position(STARTING_CODES, STARTING_UNMOVED_PAWNS, 'white')
+
+    def to_fen(self):
+        """Returns the position as text: the pieces in FEN order from row 8 down to row 1, 'w' or 'b' for the team to
+        move, then the squares of the pawns that have not moved yet run together (or '-' if there are none), such as
+        'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b a2b2c2d2f2g2h2a7b7c7d7e7f7g7h7'"""
+        codes = self.get_piece_codes()
+        rows = []
+        for row in range(7, -1, -1):
+            text = ''
+            empty = 0
+            for code in codes[row * 8:row * 8 + 8]:
+                if code:
+                    if empty:
+                        text += str(empty)
+                        empty = 0
+                    text += FEN_LETTERS[code]
+                else:
+                    empty += 1
+            if empty:
+                text += str(empty)
+            rows.append(text)
+        if self._team_turn == 'white':
+            turn = 'w'
+        else:
+            turn = 'b'
+        unmoved = ''.join(SQUARE_NAMES[index].lower() for index in bit_indices(self.get_unmoved_pawns()))
+        return f"{'/'.join(rows)} {turn} {unmoved or '-'}"
+
+    @classmethod
+    def from_fen(cls, fen, backend='board'):
+        """Returns a new game set to a position written by to_fen. If the unmoved pawns field is left off, every pawn
+        on its starting row is taken to be unmoved."""
+        fields = fen.split()
+        if len(fields) not in (2, 3):
+            raise ValueError(f"Expected 2 or 3 fields in position text, got {len(fields)}: {fen!r}")
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError(f"Expected 8 rows in position text, got {len(rows)}: {fen!r}")
+        codes = [0] * 64
+        for row, text in zip(range(7, -1, -1), rows):
+            column = 0
+            for letter in text:
+                if letter.isdigit():
+                    column += int(letter)
+                elif letter in FEN_CODES and column < 8:
+                    codes[row * 8 + column] = FEN_CODES[letter]
+                    column += 1
+                else:
+                    raise ValueError(f"Unexpected {letter!r} in row {row + 1} of position text: {fen!r}")
+            if column != 8:
+                raise ValueError(f"Row {row + 1} of position text does not have 8 squares: {fen!r}")
+        if fields[1] == 'w':
+            team_turn = 'white'
+        elif fields[1] == 'b':
+            team_turn = 'black'
+        else:
+            raise ValueError(f"Expected 'w' or 'b' for the team to move, got {fields[1]!r}")
+
+        white_pawn = piece_code(WHITE, PAWN)
+        black_pawn = piece_code(BLACK, PAWN)
+        unmoved_pawns = 0
+        if len(fields) == 2:
+            for index in range(8, 16):
+                if codes[index] == white_pawn:
+                    unmoved_pawns |= 1 << index
+            for index in range(48, 56):
+                if codes[index] == black_pawn:
+                    unmoved_pawns |= 1 << index
+        elif fields[2] != '-':
+            for start in range(0, len(fields[2]), 2):
+                index = square_index(fields[2][start:start + 2])
+                if index is None or codes[index] not in (white_pawn, black_pawn):
+                    raise ValueError(f"{fields[2][start:start + 2]!r} is not a pawn square in position text: {fen!r}")
+                unmoved_pawns |= 1 << index
+
+        game = cls(backend)
+        game.set_position(codes, unmoved_pawns, team_turn)
+        return game
+
+    def snapshot(self):
+        """Returns the position as 33 bytes: two squares per byte as 4-bit piece codes, with codes 13 and 14 for white
+        and black pawns that have not moved, followed by one byte that is 1 when black is to move"""
+        codes = self.get_piece_codes()
+        unmoved_pawns = self.get_unmoved_pawns()
+        for index in bit_indices(unmoved_pawns):
+            if codes[index] == piece_code(WHITE, PAWN):
+                codes[index] = UNMOVED_WHITE_PAWN
+            else:
+                codes[index] = UNMOVED_BLACK_PAWN
+        data = bytearray(SNAPSHOT_SIZE)
+        for index in range(0, 64, 2):
+            data[index // 2] = codes[index] | codes[index + 1] << 4
+        data[32] = self._team_turn == 'black'
+        return bytes(data)
+
+    def restore(self, data):
+        """Sets this game to a position saved by snapshot, reusing the game's board instead of building a new one. The
+        hash, piece counts and piece bitboards are read straight from the snapshot bytes through precomputed tables."""
+        if len(data) != SNAPSHOT_SIZE:
+            raise ValueError(f"Expected a {SNAPSHOT_SIZE} byte snapshot, got {len(data)} bytes")
+        squares = bytes(data[:32])
+        codes = bytearray(64)
+        codes[0::2] = squares.translate(SNAPSHOT_LOW_CODES)
+        codes[1::2] = squares.translate(SNAPSHOT_HIGH_CODES)
+        if 255 in codes:
+            raise ValueError(f"Snapshot has an unknown piece code on {SQUARE_NAMES[codes.index(255)]}")
+        pieces = [0] * 13
+        unmoved_pawns = 0
+        packed_material = 0
+        position_hash = 0
+        for byte_index, byte in enumerate(squares):
+            if byte:
+                position_hash ^= SNAPSHOT_BYTE_HASHES[byte_index][byte]
+                packed_material += SNAPSHOT_BYTE_MATERIAL[byte]
+                unmoved_pawns |= SNAPSHOT_BYTE_UNMOVED[byte] << byte_index * 2
+                for code, offset in SNAPSHOT_BYTE_PIECES[byte]:
+                    pieces[code] |= 1 << byte_index * 2 + offset
+        counts = packed_material.to_bytes(12, 'little')
+        material = [list(counts[:6]), list(counts[6:])]
+        if data[32]:
+            team_turn = 'black'
+            position_hash ^= ZOBRIST_BLACK_TO_MOVE
         else:
-            self._black_piece_list.remove(piece)
+            team_turn = 'white'
+        self.load_position(list(codes), pieces, unmoved_pawns, team_turn, material, position_hash)
+
+    def clone(self):
+        """Returns a copy of the game that can be played on, and have moves unmade, without changing this one. The two
+        games share their board until one of them changes it: the board backend then copies only the squares and
+        pieces a move touches, and the bitboard backend copies its piece tables once."""
+        game = ChessVar.__new__(ChessVar)
+        game._game_state = self._game_state
+        game._team_turn = self._team_turn
+        game._material = [list(self._material[WHITE]), list(self._material[BLACK])]
+        if self._bitboards is not None:
+            game._board = None
+            game._bitboards = self._bitboards.clone()
+        else:
+            game._board = self._board.clone()
+            game._bitboards = None
+        game._undo_chain = self._undo_chain
+        game._undo_depth = self._undo_depth
+        game._shared_moves = self._shared_moves = self._undo_depth
+        game._hash = self._hash
+        game._profiler = self._profiler
+        if self._attack_map is None:
+            game._attack_map = None
+        else:
+            game._attack_map = self._attack_map.clone()
+        return game
+
+    def get_backend(self):
+        """Returns the name of the board backend this game was created with"""
+        if self._bitboards is not None:
+            return 'bitboard'
+        return 'board'
+
+    def remove_piece(self, color, piece):
+        """Remove a captured piece from its team's piece counts"""
+        self._material[COLOR_NUMBERS[color]][PIECE_TYPE_NUMBERS[piece]] -= 1
 
     def get_white_piece_list(self):
         """Returns a list of white chess pieces"""
-        return self._white_piece_list
+        return self.piece_list(WHITE)
 
     def get_black_piece_list(self):
         """Returns a list of black chess pieces"""
-        return self._black_piece_list
+        return self.piece_list(BLACK)
+
+    def piece_list(self, color):
+        """Returns a new list naming each piece a color number has left, built from the piece counts"""
+        counts = self._material[color]
+        piece_list = []
+        for piece_type in PIECE_LIST_ORDER:
+            piece_list.extend([piece_type] * counts[PIECE_TYPE_NUMBERS[piece_type]])
+        return piece_list
+
+    def material(self):
+        """Returns the piece counts of both teams as a list indexed by color number (0 for white, 1 for black), each
+        holding how many pawns, knights, bishops, rooks, queens and kings that team has left. The lists are the ones
+        the game updates, through every move and whenever set_position, restore or reset replaces the position, so they
+        must not be changed."""
+        return self._material
+
+    def scarcest_type(self, color):
+        """Returns (piece type, count) for the piece type a team has fewest of, which is the type it is closest to
+        losing the game by. Ties go to the type listed first in PIECE_TYPES."""
+        counts = self._material[COLOR_NUMBERS[color]]
+        piece_type = min(range(6), key=counts.__getitem__)
+        return PIECE_TYPES[piece_type], counts[piece_type]
 
     def make_move(self, first_square_lower, second_square_lower):
         """Moves a piece to a new square, accessing the two square classes being used, checks to confirm a piece is in
@@ -58,137 +544,458 @@ class ChessVar:
         piece. If a piece is captured, that piece is removed from its teams piece list and checks to see if any other
         pieces of this type exist. If not, the game is over."""
 
-        first_square = self._board.get_square(first_square_lower.upper())
-        second_square = self._board.get_square(second_square_lower.upper())
-        moving_piece = first_square.get_piece()
+        first_index = square_index(first_square_lower)
+        second_index = square_index(second_square_lower)
+        if first_index is None or second_index is None:
+            return False
+
+        return self.make_move_idx(first_index, second_index)
+
+    def apply_moves(self, moves):
+        """Makes a sequence of moves, given either as 12-bit moves from encode_move or as one string of moves such as
+        'e2e4 e7e5 g1f3', and stops at the first move that is rejected. Returns the index of that move, which is also
+        the number of moves made, or the number of moves if every one was made. A word that does not name two squares
+        is rejected like an illegal move."""
+        if isinstance(moves, str):
+            moves = [MOVE_CODES.get(word, -1) for word in moves.lower().split()]
+        make_move_idx = self.make_move_idx
+        made = 0
+        for move in moves:
+            if not 0 <= move < 4096 or not make_move_idx(move >> 6, move & 63):
+                return made
+            made += 1
+        return made
+
+    def make_move_idx(self, first_index, second_index):
+        """Works like make_move, but takes the two squares as 0-63 square indices instead of names"""
+        if self._profiler is not None:
+            return self.make_profiled_move(first_index, second_index)
 
         if self.get_game_state() != 'UNFINISHED':
             return False
 
-        if moving_piece.get_piece_color() != self.get_team_turn():
+        if self._bitboards is not None:
+            return self.make_bitboard_move(first_index, second_index)
+
+        first_square = self._board.get_square_at(first_index)
+        second_square = self._board.get_square_at(second_index)
+        if not self.is_valid_move(first_square, second_square):
             return False
 
+        captured_piece = second_square.get_piece()
+        game_state = self._game_state
+        if captured_piece is not None:
+            if self.capture_piece(second_square) is False:
+                return False
+
+        self.move_board_piece(first_square, second_square, game_state)
+        self.set_team_turn()
+        return True
+
+    def move_board_piece(self, first_square, second_square, game_state):
+        """Moves a piece on the board backend once the move has been checked and any capture counted, saving the
+        undo record and updating the hash"""
+        first_index = first_square.get_index()
+        second_index = second_square.get_index()
+        first_square = self._board.own_square(first_index)
+        second_square = self._board.own_square(second_index)
+        moving_piece = first_square.get_piece()
+        captured_piece = second_square.get_piece()
+        self._undo_chain = (first_index, second_index, captured_piece, None, game_state, self._hash, self._undo_chain)
+        self._undo_depth += 1
+        moving_code = moving_piece.get_code()
+        position_hash = (self._hash ^ ZOBRIST_BLACK_TO_MOVE
+                         ^ ZOBRIST_PIECES[moving_code][first_index] ^ ZOBRIST_PIECES[moving_code][second_index])
+        if captured_piece is not None:
+            position_hash ^= ZOBRIST_PIECES[captured_piece.get_code()][second_index]
+            if isinstance(captured_piece, Pawn) and captured_piece.is_first_move():
+                position_hash ^= ZOBRIST_FIRST_MOVES[second_index]
+        if isinstance(moving_piece, Pawn) and moving_piece.is_first_move():
+            position_hash ^= ZOBRIST_FIRST_MOVES[first_index]
+        self._hash = position_hash
+
+        self._board.set_piece_at(second_index, moving_piece)
+        self._board.set_piece_at(first_index, None)
+        moving_piece.set_square(second_square)
+        if isinstance(moving_piece, Pawn):
+            moving_piece.set_first_move()
+        if self._attack_map is not None:
+            self._attack_map.move_piece(first_index, second_index)
+
+    def is_valid_move(self, first_square, second_square):
+        """Checks, without changing anything, that the first square holds a piece of the team whose turn it is, that
+        the second square does not hold one of that team's pieces, and that the move follows the piece's rules"""
+        moving_piece = first_square.get_piece()
+
         if moving_piece is None:
             return False
 
+        if moving_piece.get_piece_color() != self.get_team_turn():
+            return False
+
+        target_piece = second_square.get_piece()
+        if target_piece is not None and target_piece.get_piece_color() == self.get_team_turn():
+            return False
+
+        if self.check_path(moving_piece, first_square, second_square) is False:
+            return False
+
+        return moving_piece.valid_move(first_square, second_square)
+
+    def check_path(self, moving_piece, first_square, second_square):
+        """Checks a move's path with the check for the moving piece's type. Knights and kings have no path to check."""
         if isinstance(moving_piece, Rook):
-            if self.check_rook_path(first_square, second_square) is False:
-                return False
+            return self.check_rook_path(first_square, second_square)
         elif isinstance(moving_piece, Bishop):
-            if self.check_bishop_path(first_square, second_square) is False:
-                return False
+            return self.check_bishop_path(first_square, second_square)
         elif isinstance(moving_piece, Queen):
-            if self.check_queen_path(first_square, second_square) is False:
-                return False
+            return self.check_queen_path(first_square, second_square)
+        elif isinstance(moving_piece, Pawn):
+            return self.check_pawn_path(first_square, second_square)
+        return True
 
-        if first_square.get_piece() is None:
+    def make_bitboard_move(self, first_index, second_index):
+        """Makes a move between two 0-63 square indices on the bitboard backend, using table lookups and mask tests
+        in place of the Piece classes' valid_move methods"""
+        bitboards = self._bitboards
+        if self._team_turn == 'white':
+            color = WHITE
+        else:
+            color = BLACK
+
+        if not bitboards.is_legal_move(first_index, second_index, color):
             return False
 
-        if moving_piece and moving_piece.valid_move(first_square, second_square):
-            if second_square.get_piece() is not None:
-                if self.capture_piece(second_square) is False:
+        game_state = self._game_state
+        captured_code = bitboards.get_code_at(second_index)
+        if captured_code:
+            self.record_capture_code(captured_code)
+        self.move_bitboard_piece(first_index, second_index, game_state)
+        self.set_team_turn()
+        return True
+
+    def move_bitboard_piece(self, first_index, second_index, game_state):
+        """Moves a piece on the bitboard backend once the move has been checked and any capture counted, saving the
+        undo record and updating the hash"""
+        bitboards = self._bitboards
+        first_moves = bitboards.get_first_moves()
+        moving_code = bitboards.get_code_at(first_index)
+        captured_code = bitboards.move_piece(first_index, second_index)
+        self._undo_chain = (first_index, second_index, captured_code, first_moves, game_state, self._hash,
+                            self._undo_chain)
+        self._undo_depth += 1
+        position_hash = (self._hash ^ ZOBRIST_BLACK_TO_MOVE
+                         ^ ZOBRIST_PIECES[moving_code][first_index] ^ ZOBRIST_PIECES[moving_code][second_index]
+                         ^ ZOBRIST_PIECES[captured_code][second_index])
+        if first_moves >> first_index & 1:
+            position_hash ^= ZOBRIST_FIRST_MOVES[first_index]
+        if first_moves >> second_index & 1:
+            position_hash ^= ZOBRIST_FIRST_MOVES[second_index]
+        self._hash = position_hash
+        if self._attack_map is not None:
+            self._attack_map.move_piece(first_index, second_index)
+
+    def enable_profiling(self, profiler=None):
+        """Starts counting and timing each stage of this game's moves with a profiling.MoveProfiler, which can be
+        shared with other games, and returns the profiler"""
+        if profiler is None:
+            from profiling import MoveProfiler
+            profiler = MoveProfiler()
+        self._profiler = profiler
+        return profiler
+
+    def disable_profiling(self):
+        """Stops profiling this game's moves"""
+        self._profiler = None
+
+    def get_profiler(self):
+        """Returns the profiler recording this game's moves, or None if profiling is off"""
+        return self._profiler
+
+    def enable_attack_map(self):
+        """Starts keeping an AttackMap of the position that every move and unmade move updates, and returns it. The
+        attack queries turn this on the first time they are asked."""
+        if self._attack_map is None:
+            self._attack_map = AttackMap(self.get_piece_codes())
+        return self._attack_map
+
+    def disable_attack_map(self):
+        """Stops keeping the game's AttackMap up to date and drops it"""
+        self._attack_map = None
+
+    def get_attack_map(self):
+        """Returns the game's AttackMap, or None if attack tracking is off"""
+        return self._attack_map
+
+    def is_attacked(self, square_lower, by_color):
+        """Returns True if a piece of the given color ('white' or 'black') attacks a square such as 'e4', whether
+        the square is empty or holds a piece of either team. Returns False for a square name that does not exist."""
+        index = square_index(square_lower)
+        if index is None:
+            return False
+        attack_map = self.enable_attack_map()
+        return attack_map.get_attackers(index) & attack_map.get_occupied(COLOR_NUMBERS[by_color]) != 0
+
+    def attackers_of(self, square_lower):
+        """Returns the lowercase names of the squares holding pieces of either team that attack a square such as
+        'e4', in square index order, or an empty list for a square name that does not exist"""
+        index = square_index(square_lower)
+        if index is None:
+            return []
+        attack_map = self.enable_attack_map()
+        return [SQUARE_NAMES[attacker].lower() for attacker in bit_indices(attack_map.get_attackers(index))]
+
+    def threatened_types(self, color):
+        """Returns the piece types, in PIECE_TYPES order, that the other team could win the game by capturing on its
+        next move: types the given color has one piece of left, standing where an enemy piece attacks it"""
+        if self._game_state != 'UNFINISHED':
+            return []
+        attack_map = self.enable_attack_map()
+        color_number = COLOR_NUMBERS[color]
+        enemy = attack_map.get_occupied(1 - color_number)
+        threatened = []
+        for piece_type, count in enumerate(self._material[color_number]):
+            if count == 1:
+                index = attack_map.get_pieces(piece_code(color_number, piece_type)).bit_length() - 1
+                if attack_map.get_attackers(index) & enemy:
+                    threatened.append(PIECE_TYPES[piece_type])
+        return threatened
+
+    def make_profiled_move(self, first_index, second_index):
+        """Works like make_move_idx, recording how long each stage takes and which stage rejects the move, if any,
+        with the game's profiler"""
+        profiler = self._profiler
+        start = time.perf_counter()
+        if self._bitboards is not None:
+            moving_code = self._bitboards.get_code_at(first_index)
+        else:
+            first_square = self._board.get_square_at(first_index)
+            second_square = self._board.get_square_at(second_index)
+            moving_piece = first_square.get_piece()
+            if moving_piece is None:
+                moving_code = 0
+            else:
+                moving_code = moving_piece.get_code()
+        if moving_code:
+            piece_type = PIECE_TYPES[(moving_code - 1) % 6]
+        else:
+            piece_type = 'none'
+        end = time.perf_counter()
+        profiler.record('square_lookup', piece_type, end - start)
+        if self.get_game_state() != 'UNFINISHED':
+            profiler.count_move(piece_type, 'game_over')
+            return False
+        if not moving_code:
+            profiler.count_move(piece_type, 'square_lookup')
+            return False
+
+        start = end
+        if self._bitboards is not None:
+            legal = self._bitboards.is_legal_move(first_index, second_index, COLOR_NUMBERS[self._team_turn])
+            end = time.perf_counter()
+            profiler.record('valid_move', piece_type, end - start)
+            if not legal:
+                profiler.count_move(piece_type, 'valid_move')
+                return False
+            captured_code = self._bitboards.get_code_at(second_index)
+        else:
+            target_piece = second_square.get_piece()
+            owned = moving_piece.get_piece_color() == self._team_turn and (
+                target_piece is None or target_piece.get_piece_color() != self._team_turn)
+            end = time.perf_counter()
+            profiler.record('ownership', piece_type, end - start)
+            if not owned:
+                profiler.count_move(piece_type, 'ownership')
+                return False
+
+            for stage, check in (('path_check', self.check_path), ('valid_move', None)):
+                start = end
+                if check is None:
+                    legal = moving_piece.valid_move(first_square, second_square)
+                else:
+                    legal = check(moving_piece, first_square, second_square)
+                end = time.perf_counter()
+                profiler.record(stage, piece_type, end - start)
+                if legal is False:
+                    profiler.count_move(piece_type, stage)
                     return False
+            captured_code = target_piece is not None
 
-            second_square.set_piece(moving_piece)
-            first_square.set_piece(None)
-            self.set_team_turn()
-            moving_piece.set_square(second_square)
+        game_state = self._game_state
+        if captured_code:
+            start = end
+            if self._bitboards is not None:
+                self.record_capture_code(captured_code)
+            else:
+                self.capture_piece(second_square)
+            end = time.perf_counter()
+            profiler.record('capture_piece', piece_type, end - start)
+
+        start = end
+        if self._bitboards is not None:
+            self.move_bitboard_piece(first_index, second_index, game_state)
+        else:
+            self.move_board_piece(first_square, second_square, game_state)
+        end = time.perf_counter()
+        profiler.record('board_update', piece_type, end - start)
+
+        start = end
+        self.set_team_turn()
+        profiler.record('turn_switch', piece_type, time.perf_counter() - start)
+        profiler.count_move(piece_type, 'made')
+        return True
+
+    def unmake_move(self):
+        """Takes back the most recent move, restoring the moved and captured pieces, the piece lists, the game state,
+        whose turn it is and the pawn first-move status. Returns False if there is no move to take back."""
+        if self._undo_chain is None:
+            return False
+
+        first_index, second_index, captured, first_moves, game_state, position_hash, self._undo_chain = (
+            self._undo_chain)
+        self._undo_depth -= 1
+        shared = self._undo_depth < self._shared_moves
+        if shared:
+            self._shared_moves = self._undo_depth
+        self.set_team_turn()
+        self._game_state = game_state
+        self._hash = position_hash
+
+        if self._bitboards is not None:
+            self._bitboards.unmove_piece(first_index, second_index, captured, first_moves)
+            if captured:
+                self._material[(captured - 1) // 6][(captured - 1) % 6] += 1
+            if self._attack_map is not None:
+                self._attack_map.unmove_piece(first_index, second_index, captured)
             return True
 
-        return moving_piece.valid_move(first_square, second_square)
+        first_square = self._board.own_square(first_index)
+        second_square = self._board.own_square(second_index)
+        if shared and captured is not None:
+            captured = captured.copy()
+        moving_piece = second_square.get_piece()
+        self._board.set_piece_at(first_index, moving_piece)
+        moving_piece.set_square(first_square)
+        self._board.set_piece_at(second_index, captured)
+        if captured is not None:
+            captured.set_square(second_square)
+            code = captured.get_code()
+            self._material[(code - 1) // 6][(code - 1) % 6] += 1
+        if isinstance(moving_piece, Pawn):
+            moving_piece.take_back_move()
+        if self._attack_map is not None:
+            if captured is None:
+                self._attack_map.unmove_piece(first_index, second_index, 0)
+            else:
+                self._attack_map.unmove_piece(first_index, second_index, captured.get_code())
+        return True
+
+    def perft(self, depth):
+        """Counts the positions reachable from this one in exactly depth moves. A finished game has no moves, so lines
+        that end the game early add nothing to counts at greater depths."""
+        if depth == 0:
+            return 1
+        if depth == 1:
+            return sum(1 for move in self.generate_moves())
+        nodes = 0
+        for first_index, second_index in list(self.generate_moves()):
+            self.make_move_idx(first_index, second_index)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    def divide(self, depth):
+        """Returns a dictionary of perft counts at depth - 1 after each legal move, keyed by (from, to) square names"""
+        counts = {}
+        for first_index, second_index in list(self.generate_moves()):
+            self.make_move_idx(first_index, second_index)
+            counts[SQUARE_NAMES[first_index].lower(), SQUARE_NAMES[second_index].lower()] = self.perft(depth - 1)
+            self.unmake_move()
+        return counts
+
+    def get_undo_depth(self):
+        """Returns how many moves can be taken back with unmake_move"""
+        return self._undo_depth
+
+    def generate_moves(self):
+        """Yields every legal move for the team whose turn it is as a (from index, to index) pair of 0-63 square
+        indices, without changing the game"""
+        if self._game_state != 'UNFINISHED':
+            return
+
+        if self._bitboards is not None:
+            if self._team_turn == 'white':
+                yield from self._bitboards.generate_moves(WHITE)
+            else:
+                yield from self._bitboards.generate_moves(BLACK)
+            return
+
+        board = self._board
+        for first_index in range(64):
+            piece = board.get_piece_at(first_index)
+            if piece is None or piece.get_piece_color() != self._team_turn:
+                continue
+            first_square = board.get_square_at(first_index)
+            # every piece's moves lie on a queen line or a knight jump from its square, so only those are tried
+            for second_index in bit_indices(QUEEN_LINES[first_index] | KNIGHT_ATTACKS[first_index]):
+                if self.is_valid_move(first_square, board.get_square_at(second_index)):
+                    yield first_index, second_index
+
+    def legal_moves(self):
+        """Returns a list of every legal move for the team whose turn it is as (from, to) pairs of lowercase square
+        names, such as ('e2', 'e4'), that can be passed straight to make_move"""
+        return [(SQUARE_NAMES[first_index].lower(), SQUARE_NAMES[second_index].lower())
+                for first_index, second_index in self.generate_moves()]
 
     def capture_piece(self, second_square):
         """Removes a chess piece from the board"""
         if second_square.get_piece() is not None:
             captured_piece = second_square.get_piece()
             piece_color = captured_piece.get_piece_color()
-            piece_type = captured_piece.get_piece()
 
             if piece_color == self._team_turn:
                 return False
 
-            if piece_color == 'white':
-                self.remove_piece('white', piece_type)
-                piece_list = self.get_white_piece_list()
-                if piece_type not in piece_list:
-                    self.set_game_state('BLACK_WON')
-                    return True
-            else:
-                self.remove_piece('black', piece_type)
-                piece_list = self.get_black_piece_list()
-                if piece_type not in piece_list:
-                    self.set_game_state('WHITE_WON')
-                    return True
+            self.record_capture_code(captured_piece.get_code())
+            return True
         return False
 
+    def record_capture_code(self, code):
+        """Removes the captured piece with an integer code from its team's piece counts, and ends the game if it was
+        the last of its type"""
+        color, piece_type = divmod(code - 1, 6)
+        counts = self._material[color]
+        counts[piece_type] -= 1
+        if counts[piece_type] == 0:
+            if color == WHITE:
+                self.set_game_state('BLACK_WON')
+            else:
+                self.set_game_state('WHITE_WON')
+
     def check_rook_path(self, first_square, second_square):
         """Checks if there are any pieces between the first and second square of a move for a rook"""
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
-        first_square_column = self._column_nums[first_square.get_column()]
-        first_square_column_letter = first_square.get_column()
-        second_square_column = self._column_nums[second_square.get_column()]
-
-        row_difference_actual = first_square_row - second_square_row
-        column_difference_actual = second_square_column - first_square_column
-        row_difference = abs(row_difference_actual)
-        column_difference = abs(column_difference_actual)
-
-        if row_difference == 0:
-            for column in range(min(first_square_column, second_square_column) + 1, max(first_square_column,
-                                                                                        second_square_column)):
-                column_letter = next(key for key, value in self._column_nums.items() if value == column)
-                square = self._board.get_square(f"{column_letter}{first_square_row}")
-                if square.get_piece() is not None:
-                    return False
-
-        if column_difference == 0:
-            for row in range(min(first_square_row, second_square_row) + 1, max(first_square_row, second_square_row)):
-                square = self._board.get_square(f"{first_square_column_letter}{row}")
-                if square.get_piece() is not None:
-                    return False
-
-        if row_difference != 0 and column_difference != 0:
-            return False
-
-        return True
+        first_index = first_square.get_index()
+        second_index = second_square.get_index()
+        return (ROOK_LINES[first_index] >> second_index & 1 == 1
+                and BETWEEN[first_index * 64 + second_index] & self._board.get_occupied() == 0)
 
     def check_bishop_path(self, first_square, second_square):
         """Checks if there are any pieces between the first and second square of a move for a bishop"""
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
-        first_square_column = self._column_nums[first_square.get_column()]
-        second_square_column = self._column_nums[second_square.get_column()]
-        column_letters = {1: 'A', 2: 'B', 3: 'C', 4: 'D', 5: 'E', 6: 'F', 7: 'G', 8: 'H'}
-
-        row_difference_actual = second_square_row - first_square_row
-        column_difference_actual = second_square_column - first_square_column
-
-        if row_difference_actual > 0:
-            row_direction = 1
-        else:
-            row_direction = -1
-        if column_difference_actual > 0:
-            column_direction = 1
-        else:
-            column_direction = -1
-
-        current_row = first_square_row + row_direction
-        current_column = first_square_column + column_direction
-
-        while current_row != second_square_row and current_column != second_square_column:
-            square = self._board.get_square(f"{column_letters[current_column]}{current_row}")
-            if square.get_piece() is None:
-                current_row += row_direction
-                current_column += column_direction
-            else:
-                return False
-
-        return True
+        first_index = first_square.get_index()
+        second_index = second_square.get_index()
+        return (BISHOP_LINES[first_index] >> second_index & 1 == 1
+                and BETWEEN[first_index * 64 + second_index] & self._board.get_occupied() == 0)
 
     def check_queen_path(self, first_square, second_square):
         """Checks if there are any pieces between the first and second square of a move for a queen"""
-        return self.check_rook_path(first_square, second_square) or self.check_bishop_path(first_square, second_square)
+        first_index = first_square.get_index()
+        second_index = second_square.get_index()
+        return (QUEEN_LINES[first_index] >> second_index & 1 == 1
+                and BETWEEN[first_index * 64 + second_index] & self._board.get_occupied() == 0)
+
+    def check_pawn_path(self, first_square, second_square):
+        """Checks that a pawn moving two squares forward on its first move does not jump over a piece"""
+        return BETWEEN[first_square.get_index() * 64 + second_square.get_index()] & self._board.get_occupied() == 0
 
 
 class Board:
@@ -197,22 +1004,11 @@ class Board:
     def __init__(self):
         """Initializes 8 rows and 8 columns of Square classes to make a visual chess board, also initializes 16 Pieces
         of each color, in their correct location"""
-        self._chess_board = [[Square('A', '1'), Square('A', '2'), Square('A', '3'), Square('A', '4'), Square('A', '5'),
-                              Square('A', '6'), Square('A', '7'), Square('A', '8')],
-                             [Square('B', '1'), Square('B', '2'), Square('B', '3'), Square('B', '4'), Square('B', '5'),
-                              Square('B', '6'), Square('B', '7'), Square('B', '8')],
-                             [Square('C', '1'), Square('C', '2'), Square('C', '3'), Square('C', '4'), Square('C', '5'),
-                              Square('C', '6'), Square('C', '7'), Square('C', '8')],
-                             [Square('D', '1'), Square('D', '2'), Square('D', '3'), Square('D', '4'), Square('D', '5'),
-                              Square('D', '6'), Square('D', '7'), Square('D', '8')],
-                             [Square('E', '1'), Square('E', '2'), Square('E', '3'), Square('E', '4'), Square('E', '5'),
-                              Square('E', '6'), Square('E', '7'), Square('E', '8')],
-                             [Square('F', '1'), Square('F', '2'), Square('F', '3'), Square('F', '4'), Square('F', '5'),
-                              Square('F', '6'), Square('F', '7'), Square('F', '8')],
-                             [Square('G', '1'), Square('G', '2'), Square('G', '3'), Square('G', '4'), Square('G', '5'),
-                              Square('G', '6'), Square('G', '7'), Square('G', '8')],
-                             [Square('H', '1'), Square('H', '2'), Square('H', '3'), Square('H', '4'), Square('H', '5'),
-                              Square('H', '6'), Square('H', '7'), Square('H', '8')]]
+        self._squares = [Square(name[0], name[1], index) for index, name in enumerate(SQUARE_NAMES)]
+        # the squares whose Square object, and the piece on it, belong to this board alone and not to a clone of it
+        self._private = ALL_SQUARES
+        # True once the board has been cloned, until set_position gives it all new squares and pieces
+        self._shared = False
 
         self._chess_pieces = [Rook('A1', 'white'), Knight('B1', 'white'), Bishop('C1', 'white'), Queen('D1', 'white'),
                               King('E1', 'white'), Bishop('F1', 'white'), Knight('G1', 'white'), Rook('H1', 'white'),
@@ -222,15 +1018,93 @@ class Board:
                               King('E8', 'black'), Bishop('F8', 'black'), Knight('G8', 'black'), Rook('H8', 'black'),
                               Pawn('A7', 'black'), Pawn('B7', 'black'), Pawn('C7', 'black'), Pawn('D7', 'black'),
                               Pawn('E7', 'black'), Pawn('F7', 'black'), Pawn('G7', 'black'), Pawn('H7', 'black')]
+        self._occupied = 0
         for piece in self._chess_pieces:
-            square = self.get_square(piece.get_square())
-            square.set_piece(piece)
+            self.set_piece_at(SQUARE_INDEX[piece.get_square()], piece)
 
         self._column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
 
     def get_chess_board(self):
         """Returns a list of squares on the chess board"""
-        return self._chess_board
+        return [[self._squares[row * 8 + column] for row in range(8)] for column in range(8)]
+
+    def clone(self):
+        """Returns a board sharing this board's squares and pieces. Neither board changes a shared square or piece:
+        own_square gives a board its own copy of one the first time it needs to change it."""
+        board = Board.__new__(Board)
+        board._squares = list(self._squares)
+        board._chess_pieces = self._chess_pieces
+        board._occupied = self._occupied
+        board._column_nums = self._column_nums
+        board._private = self._private = 0
+        board._shared = self._shared = True
+        return board
+
+    def own_square(self, index):
+        """Returns the square at a 0-63 board index after making sure this board has its own copy of it and of the
+        piece on it, copying them if they are still shared with a clone"""
+        square = self._squares[index]
+        if self._private >> index & 1:
+            return square
+        copy = Square(square.get_column(), square.get_row(), index)
+        piece = square.get_piece()
+        if piece is not None:
+            piece = piece.copy()
+            piece.set_square(copy)
+            copy.set_piece(piece)
+        self._squares[index] = copy
+        self._private |= 1 << index
+        return copy
+
+    def set_position(self, codes, pieces, unmoved_pawns):
+        """Places pieces on the board from a list of 64 piece codes and the matching list of 13 piece bitboards indexed
+        by code, and marks the pawns on the squares of the unmoved_pawns bitboard as not having moved. Only squares
+        holding a piece before or after are visited, a piece already on a square with the right code stays there, and
+        pieces taken off other squares are reused where their codes match."""
+        occupied = 0
+        for code in range(1, 13):
+            occupied |= pieces[code]
+        if self._shared:
+            # a clone may still be using these squares and pieces, so the board starts over with new ones
+            self._squares = [Square(name[0], name[1], index) for index, name in enumerate(SQUARE_NAMES)]
+            self._private = ALL_SQUARES
+            self._shared = False
+            self._occupied = 0
+        squares = self._squares
+        spare_pieces = {}
+        chess_pieces = []
+        empty_indices = []
+        for index in bit_indices(self._occupied | occupied):
+            square = squares[index]
+            piece = square.get_piece()
+            code = codes[index]
+            if piece is not None:
+                if piece.get_code() == code:
+                    if isinstance(piece, Pawn):
+                        piece.reset_first_move()
+                        if unmoved_pawns >> index & 1 == 0:
+                            piece.set_first_move()
+                    chess_pieces.append(piece)
+                    continue
+                spare_pieces.setdefault(piece.get_code(), []).append(piece)
+                square.set_piece(None)
+            if code:
+                empty_indices.append(index)
+        for index in empty_indices:
+            code = codes[index]
+            if spare_pieces.get(code):
+                piece = spare_pieces[code].pop()
+                piece.set_square(SQUARE_NAMES[index])
+            else:
+                piece = PIECE_CLASSES[(code - 1) % 6](SQUARE_NAMES[index], COLORS[(code - 1) // 6])
+            if isinstance(piece, Pawn):
+                piece.reset_first_move()
+                if unmoved_pawns >> index & 1 == 0:
+                    piece.set_first_move()
+            chess_pieces.append(piece)
+            squares[index].set_piece(piece)
+        self._chess_pieces = chess_pieces
+        self._occupied = occupied
 
     def get_chess_pieces(self):
         """Returns a list of chess pieces"""
@@ -238,15 +1112,34 @@ class Board:
 
     def get_square(self, square_name):
         """Returns the square object from given square name"""
-        for row in self._chess_board:
-            for square in row:
-                if square.get_column() + square.get_row() == square_name:
-                    return square
-        return None
+        index = SQUARE_INDEX.get(square_name)
+        if index is None:
+            return None
+        return self._squares[index]
+
+    def get_square_at(self, index):
+        """Returns the square object at a 0-63 board index"""
+        return self._squares[index]
+
+    def get_piece_at(self, index):
+        """Returns the piece on the square at a 0-63 board index, or None if the square is empty"""
+        return self._squares[index].get_piece()
+
+    def set_piece_at(self, index, piece):
+        """Puts a piece, or None, on the square at a 0-63 board index and updates the occupied squares bitboard"""
+        self._squares[index].set_piece(piece)
+        if piece is None:
+            self._occupied &= ~(1 << index)
+        else:
+            self._occupied |= 1 << index
+
+    def get_occupied(self):
+        """Returns a bitboard of every square that holds a piece"""
+        return self._occupied
 
     def print_board(self):
         """Returns a visual copy of the board"""
-        for column in self._chess_board:
+        for column in self.get_chess_board():
             line = []
             for item in column:
                 if item.get_piece() is None:
@@ -260,13 +1153,356 @@ class Board:
         return self._column_nums
 
 
+class Bitboards:
+    """Represents the chess board for the bitboard backend as twelve 64-bit integers, one for each piece type and
+    color, where bit n is set when that piece stands on square index n"""
+
+    def __init__(self):
+        """Initializes the twelve piece bitboards, the occupancy of each color, a table of the piece code on each of the
+        64 squares and a bitboard of the pawns that have not moved yet, all set to the standard starting position"""
+        self._pieces = [0] * 13
+        self._occupied = [0, 0]
+        self._codes = [0] * 64
+        # True while the lists above are shared with a clone, which move_piece and unmove_piece copy before changing
+        self._shared = False
+        for column, piece_type in enumerate((ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK)):
+            self.put_piece(column, piece_code(WHITE, piece_type))
+            self.put_piece(8 + column, piece_code(WHITE, PAWN))
+            self.put_piece(48 + column, piece_code(BLACK, PAWN))
+            self.put_piece(56 + column, piece_code(BLACK, piece_type))
+        self._first_moves = self._pieces[piece_code(WHITE, PAWN)] | self._pieces[piece_code(BLACK, PAWN)]
+
+    def set_position(self, codes, pieces, unmoved_pawns):
+        """Sets the board from a list of 64 piece codes and the matching list of 13 piece bitboards indexed by code,
+        with the pawns on the squares of the unmoved_pawns bitboard marked as not having moved"""
+        self._pieces = pieces
+        self._occupied = [pieces[1] | pieces[2] | pieces[3] | pieces[4] | pieces[5] | pieces[6],
+                          pieces[7] | pieces[8] | pieces[9] | pieces[10] | pieces[11] | pieces[12]]
+        self._codes = list(codes)
+        self._first_moves = unmoved_pawns & (pieces[piece_code(WHITE, PAWN)] | pieces[piece_code(BLACK, PAWN)])
+        self._shared = False
+
+    def clone(self):
+        """Returns bitboards sharing this one's lists until either of them makes or unmakes a move"""
+        bitboards = Bitboards.__new__(Bitboards)
+        bitboards._pieces = self._pieces
+        bitboards._occupied = self._occupied
+        bitboards._codes = self._codes
+        bitboards._first_moves = self._first_moves
+        bitboards._shared = self._shared = True
+        return bitboards
+
+    def unshare(self):
+        """Gives these bitboards their own copies of the lists they share with a clone"""
+        self._pieces = list(self._pieces)
+        self._occupied = list(self._occupied)
+        self._codes = list(self._codes)
+        self._shared = False
+
+    def get_code_at(self, index):
+        """Returns the code of the piece on a 0-63 square index, or 0 if the square is empty"""
+        return self._codes[index]
+
+    def get_pieces(self, code):
+        """Returns the bitboard of every square holding the piece with the given code"""
+        return self._pieces[code]
+
+    def get_occupied(self, color):
+        """Returns the bitboard of every square holding a piece of the given color number"""
+        return self._occupied[color]
+
+    def get_first_moves(self):
+        """Returns the bitboard of pawns that have not made their first move"""
+        return self._first_moves
+
+    def put_piece(self, index, code):
+        """Places the piece with the given code on an empty square"""
+        bit = 1 << index
+        self._pieces[code] |= bit
+        self._occupied[(code - 1) // 6] |= bit
+        self._codes[index] = code
+
+    def remove_piece(self, index):
+        """Removes whatever piece is on a square and returns its code, or 0 if the square was empty"""
+        code = self._codes[index]
+        if code:
+            bit = 1 << index
+            self._pieces[code] &= ~bit
+            self._occupied[(code - 1) // 6] &= ~bit
+            self._codes[index] = 0
+        return code
+
+    def is_legal_move(self, first_index, second_index, color):
+        """Returns True if the piece on the first square belongs to the given color and can legally move to the
+        second square"""
+        code = self._codes[first_index]
+        if code == 0 or (code - 1) // 6 != color:
+            return False
+        target_code = self._codes[second_index]
+        if target_code and (target_code - 1) // 6 == color:
+            return False
+
+        piece_type = (code - 1) % 6
+        bit = 1 << second_index
+        if piece_type == KNIGHT:
+            return KNIGHT_ATTACKS[first_index] & bit != 0
+        if piece_type == KING:
+            return KING_ATTACKS[first_index] & bit != 0
+
+        occupied = self._occupied[WHITE] | self._occupied[BLACK]
+        if piece_type == PAWN:
+            if target_code:
+                return PAWN_ATTACKS[color][first_index] & bit != 0
+            if color == WHITE:
+                forward = 8
+            else:
+                forward = -8
+            if second_index == first_index + forward:
+                return True
+            return (second_index == first_index + 2 * forward and self._first_moves >> first_index & 1 == 1
+                    and occupied >> (first_index + forward) & 1 == 0)
+
+        if piece_type == ROOK:
+            lines = ROOK_LINES[first_index]
+        elif piece_type == BISHOP:
+            lines = BISHOP_LINES[first_index]
+        else:
+            lines = QUEEN_LINES[first_index]
+        return lines & bit != 0 and BETWEEN[first_index * 64 + second_index] & occupied == 0
+
+    def generate_moves(self, color):
+        """Yields every legal move for the given color number as a (from index, to index) pair"""
+        own = self._occupied[color]
+        enemy = self._occupied[1 - color]
+        occupied = own | enemy
+        for first_index in bit_indices(own):
+            piece_type = (self._codes[first_index] - 1) % 6
+            if piece_type == PAWN:
+                targets = PAWN_ATTACKS[color][first_index] & enemy
+                if color == WHITE:
+                    forward = first_index + 8
+                    double = first_index + 16
+                else:
+                    forward = first_index - 8
+                    double = first_index - 16
+                if 0 <= forward < 64 and occupied >> forward & 1 == 0:
+                    targets |= 1 << forward
+                    if self._first_moves >> first_index & 1 and 0 <= double < 64 and occupied >> double & 1 == 0:
+                        targets |= 1 << double
+            elif piece_type == KNIGHT:
+                targets = KNIGHT_ATTACKS[first_index] & ~own
+            elif piece_type == KING:
+                targets = KING_ATTACKS[first_index] & ~own
+            elif piece_type == ROOK:
+                targets = slider_attacks(first_index, occupied, ROOK_RAYS) & ~own
+            elif piece_type == BISHOP:
+                targets = slider_attacks(first_index, occupied, BISHOP_RAYS) & ~own
+            else:
+                targets = slider_attacks(first_index, occupied, QUEEN_RAYS) & ~own
+            for second_index in bit_indices(targets):
+                yield first_index, second_index
+
+    def move_piece(self, first_index, second_index):
+        """Moves the piece on the first square to the second square, and returns the code of any piece it captured"""
+        if self._shared:
+            self.unshare()
+        captured_code = self.remove_piece(second_index)
+        self.put_piece(second_index, self.remove_piece(first_index))
+        self._first_moves &= ~((1 << first_index) | (1 << second_index))
+        return captured_code
+
+    def unmove_piece(self, first_index, second_index, captured_code, first_moves):
+        """Moves a piece back from the second square to the first, puts back any piece it captured and restores the
+        unmoved pawns bitboard from before the move"""
+        if self._shared:
+            self.unshare()
+        self.put_piece(first_index, self.remove_piece(second_index))
+        if captured_code:
+            self.put_piece(second_index, captured_code)
+        self._first_moves = first_moves
+
+    def print_board(self):
+        """Prints a visual copy of the board, one column per line like Board.print_board"""
+        letters = '.PKBRQMpkbrqm'
+        for column in range(8):
+            line = []
+            for row in range(8):
+                index = row * 8 + column
+                if self._codes[index]:
+                    line.append(letters[self._codes[index]])
+                else:
+                    line.append(SQUARE_NAMES[index])
+            print(line)
+
+
+class AttackMap:
+    """Keeps, for every square, the squares the piece on it attacks and the squares holding pieces that attack it,
+    counting pieces of both teams so a piece's defenders are its attackers of its own color. Moves update only the
+    moving pieces and the sliders whose lines they open or close, so nothing is recomputed for the whole board."""
+
+    def __init__(self, codes):
+        """Initializes the map for a list of the piece code on each of the 64 squares"""
+        self.set_position(codes)
+
+    def set_position(self, codes):
+        """Rebuilds the map from scratch for a list of the piece code on each of the 64 squares"""
+        self._codes = list(codes)
+        self._pieces = [0] * 13
+        self._occupied = [0, 0]
+        # True while the lists are shared with a clone, which move_piece and unmove_piece copy before changing
+        self._shared = False
+        # _attacks[n] is the bitboard of squares the piece on square n attacks, and _attackers[n] the bitboard of
+        # squares holding a piece that attacks square n
+        self._attacks = [0] * 64
+        self._attackers = [0] * 64
+        for index, code in enumerate(self._codes):
+            if code:
+                self._pieces[code] |= 1 << index
+                self._occupied[(code - 1) // 6] |= 1 << index
+        for index, code in enumerate(self._codes):
+            if code:
+                self.set_attacks(index, self.piece_attacks(index, code))
+
+    def clone(self):
+        """Returns a map sharing this one's lists until either of them is updated for a move"""
+        attack_map = AttackMap.__new__(AttackMap)
+        attack_map._codes = self._codes
+        attack_map._pieces = self._pieces
+        attack_map._occupied = self._occupied
+        attack_map._attacks = self._attacks
+        attack_map._attackers = self._attackers
+        attack_map._shared = self._shared = True
+        return attack_map
+
+    def unshare(self):
+        """Gives the map its own copies of the lists it shares with a clone"""
+        self._codes = list(self._codes)
+        self._pieces = list(self._pieces)
+        self._occupied = list(self._occupied)
+        self._attacks = list(self._attacks)
+        self._attackers = list(self._attackers)
+        self._shared = False
+
+    def get_code_at(self, index):
+        """Returns the code of the piece on a 0-63 square index, or 0 if the square is empty"""
+        return self._codes[index]
+
+    def get_pieces(self, code):
+        """Returns the bitboard of every square holding the piece with the given code"""
+        return self._pieces[code]
+
+    def get_occupied(self, color):
+        """Returns the bitboard of every square holding a piece of the given color number"""
+        return self._occupied[color]
+
+    def get_attacks(self, index):
+        """Returns the bitboard of squares the piece on a square attacks, or 0 if the square is empty"""
+        return self._attacks[index]
+
+    def get_attackers(self, index):
+        """Returns the bitboard of squares holding a piece of either color that attacks a square"""
+        return self._attackers[index]
+
+    def piece_attacks(self, index, code):
+        """Returns the bitboard of squares a piece with the given code attacks from a square in the current position.
+        Pawns attack only the two squares they capture on."""
+        color, piece_type = divmod(code - 1, 6)
+        if piece_type == PAWN:
+            return PAWN_ATTACKS[color][index]
+        if piece_type == KNIGHT:
+            return KNIGHT_ATTACKS[index]
+        if piece_type == KING:
+            return KING_ATTACKS[index]
+        return slider_attacks(index, self._occupied[WHITE] | self._occupied[BLACK], SLIDER_RAYS[piece_type])
+
+    def set_attacks(self, index, attacks):
+        """Replaces the attacks of the piece on a square, updating the attackers of only the squares that changed"""
+        changed = self._attacks[index] ^ attacks
+        if changed:
+            bit = 1 << index
+            attackers = self._attackers
+            for target in bit_indices(changed):
+                attackers[target] ^= bit
+            self._attacks[index] = attacks
+
+    def refresh_sliders(self, index):
+        """Recomputes the attacks of every slider attacking a square after that square has been emptied or filled,
+        since those are the only pieces whose lines run into it"""
+        codes = self._codes
+        for attacker in bit_indices(self._attackers[index]):
+            code = codes[attacker]
+            if SLIDER_RAYS[(code - 1) % 6] is not None:
+                self.set_attacks(attacker, self.piece_attacks(attacker, code))
+
+    def put_piece(self, index, code):
+        """Places the piece with the given code on an empty square"""
+        bit = 1 << index
+        self._pieces[code] |= bit
+        self._occupied[(code - 1) // 6] |= bit
+        self._codes[index] = code
+        self.refresh_sliders(index)
+        self.set_attacks(index, self.piece_attacks(index, code))
+
+    def remove_piece(self, index):
+        """Removes the piece on an occupied square and returns its code"""
+        code = self._codes[index]
+        bit = 1 << index
+        self.set_attacks(index, 0)
+        self._pieces[code] &= ~bit
+        self._occupied[(code - 1) // 6] &= ~bit
+        self._codes[index] = 0
+        self.refresh_sliders(index)
+        return code
+
+    def replace_piece(self, index, code):
+        """Swaps the piece on an occupied square for another one. The square stays occupied, so no slider's lines
+        change."""
+        old_code = self._codes[index]
+        bit = 1 << index
+        self._pieces[old_code] &= ~bit
+        self._occupied[(old_code - 1) // 6] &= ~bit
+        self._pieces[code] |= bit
+        self._occupied[(code - 1) // 6] |= bit
+        self._codes[index] = code
+        self.set_attacks(index, self.piece_attacks(index, code))
+
+    def move_piece(self, first_index, second_index):
+        """Moves the piece on the first square to the second square, and returns the code of any piece it captured"""
+        if self._shared:
+            self.unshare()
+        captured_code = self._codes[second_index]
+        code = self.remove_piece(first_index)
+        if captured_code:
+            self.replace_piece(second_index, code)
+        else:
+            self.put_piece(second_index, code)
+        return captured_code
+
+    def unmove_piece(self, first_index, second_index, captured_code):
+        """Moves a piece back from the second square to the first and puts back any piece it captured"""
+        if self._shared:
+            self.unshare()
+        if captured_code:
+            code = self._codes[second_index]
+            self.replace_piece(second_index, captured_code)
+        else:
+            code = self.remove_piece(second_index)
+        self.put_piece(first_index, code)
+
+
 class Square:
     """Represents a square on the board, and shows what Piece is currently on that square, if any"""
 
-    def __init__(self, column, row):
-        """Initializes a row, column and sets value to None for a square on the chess board"""
+    __slots__ = ('_row', '_column', '_index', '_piece')
+
+    def __init__(self, column, row, index=None):
+        """Initializes a row, column and board index and sets value to None for a square on the chess board. The column
+        is a letter and the row a digit, as in 'A' and '1', and the index is worked out from them if not given."""
         self._row = row
         self._column = column
+        if index is None:
+            index = SQUARE_INDEX[column + row]
+        self._index = index
         self._piece = None
 
     def __repr__(self):
@@ -284,6 +1520,10 @@ class Square:
         """Returns the column a square is in"""
         return self._column
 
+    def get_index(self):
+        """Returns the 0-63 board index of this square"""
+        return self._index
+
     def get_piece(self):
         """Returns what piece is on this square, or None if there isn't one"""
         return self._piece
@@ -296,331 +1536,171 @@ class Square:
 
 
 class Piece:
-    """Represents a chess piece"""
+    """Represents a chess piece. Each subclass sets its piece type name, number, printed letters and move table at the
+    class level, and instances only store their square and color in __slots__, so a piece has no __dict__."""
 
-    def __init__(self, starting_square, color):
-        """Initializes a chess piece class with color, piece type, and starting square for that piece. Also sets a
-        string value for each piece to be used in the piece list."""
-        self._square = starting_square
-        self._color = color
-
-    def get_square(self):
-        """Returns location on the board of this piece"""
-        return self._square
-
-    def set_square(self, square):
-        """Moves this piece's square on the board to a new square"""
-        self._square = square
-
-    def get_piece_color(self):
-        """Returns the piece color"""
-        return self._color
-
-
-class Rook(Piece):
-    """Represents a rook that can only move within a row or a column each turn. Inherits all other methods from Piece
-    class"""
+    __slots__ = ('_square', '_color', '_code')
+    _piece = None
+    _type = None
+    _letters = ('?', '?')
+    _moves = None
 
     def __init__(self, starting_square, color):
-        """Initializes a rook chess piece"""
-        self._piece = 'rook'
-        self._color = color
-        super().__init__(starting_square, color)
+        """Initializes a chess piece class with color and starting square for that piece, and works out the piece's
+        integer code from its color and type"""
         self._square = starting_square
-        self._column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
+        self._color = color
+        self._code = piece_code(COLORS.index(color), self._type)
 
     def __repr__(self):
-        """Returns a readable name when the object is printed"""
+        """Returns a readable name when the object is printed, uppercase for white and lowercase for black"""
         if self._color == 'white':
-            return 'R'
+            return self._letters[0]
         else:
-            return 'r'
+            return self._letters[1]
 
     def get_piece(self):
         """Returns the value of a chess piece"""
         return self._piece
 
+    def get_code(self):
+        """Returns the integer code of this piece, which combines its color and type"""
+        return self._code
+
     def get_square(self):
-        """Returns the square a piece is on"""
+        """Returns location on the board of this piece"""
         return self._square
 
+    def set_square(self, square):
+        """Moves this piece's square on the board to a new square"""
+        self._square = square
+
     def get_piece_color(self):
-        """Returns the color of a chess piece"""
+        """Returns the piece color"""
         return self._color
 
-    def valid_move(self, first_square, second_square):
-        """Defines the movement rules for a rook"""
-        valid_move = False
-        column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
-        rows = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-        columns = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
+    def copy(self):
+        """Returns a new piece of the same type and color on the same square"""
+        return self.__class__(self._square, self._color)
 
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
+    def valid_move(self, first_square, second_square):
+        """Returns True if the second square is one this piece could move to from the first square on an empty board,
+        using the class's table of moves from each square"""
+        return self._moves[first_square.get_index()] >> second_square.get_index() & 1 == 1
 
-        row_difference = abs(second_square_row - first_square_row)
-        column_difference = abs(column_nums[second_square.get_column()] - column_nums[first_square.get_column()])
 
-        if row_difference == 0:
-            if second_square.get_column() in columns:
-                valid_move = True
-        elif column_difference == 0:
-            if second_square_row in rows:
-                valid_move = True
+class Rook(Piece):
+    """Represents a rook that can only move within a row or a column each turn. Inherits all other methods from Piece
+    class"""
 
-        return valid_move
+    __slots__ = ()
+    _piece = 'rook'
+    _type = ROOK
+    _letters = ('R', 'r')
+    _moves = ROOK_LINES
 
 
 class Bishop(Piece):
     """Represents a bishop that can only move diagonally on a certain color square. Inherits all other methods from
     Piece class"""
 
-    def __init__(self, starting_square, color):
-        """Initializes a bishop chess piece"""
-        self._piece = 'bishop'
-        super().__init__(starting_square, color)
-        self._square = starting_square
-        self._color = color
-
-    def __repr__(self):
-        """Returns a readable name when the object is printed"""
-        if self._color == 'white':
-            return 'B'
-        else:
-            return 'b'
-
-    def get_piece(self):
-        """Returns the value of a chess piece"""
-        return self._piece
-
-    def get_square(self):
-        """Returns the square a piece is on"""
-        return self._square
-
-    def get_piece_color(self):
-        """Returns the color of a chess piece"""
-        return self._color
-
-    def valid_move(self, first_square, second_square):
-        """Changes Piece class method to use bishop's valid moves"""
-        valid_move = False
-        column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
-
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
-
-        row_difference = abs(first_square_row - second_square_row)
-        column_difference = abs(column_nums[second_square.get_column()] - column_nums[first_square.get_column()])
-
-        if column_difference == row_difference:
-            valid_move = True
-
-        return valid_move
+    __slots__ = ()
+    _piece = 'bishop'
+    _type = BISHOP
+    _letters = ('B', 'b')
+    _moves = BISHOP_LINES
 
 
 class Knight(Piece):
     """Represents a knight who can move two spaces one way then one space perpendicular. Inherits all other methods from
      Piece class"""
 
-    def __init__(self, starting_square, color):
-        """Initializes a knight chess piece"""
-        self._piece = 'knight'
-        super().__init__(starting_square, color)
-        self._square = starting_square
-        self._color = color
-
-    def __repr__(self):
-        """Returns a readable name when the object is printed"""
-        if self._color == 'white':
-            return 'K'
-        else:
-            return 'k'
-
-    def get_piece(self):
-        """Returns the value of a chess piece"""
-        return self._piece
-
-    def get_square(self):
-        """Returns the square a piece is on"""
-        return self._square
-
-    def get_piece_color(self):
-        """Returns the color of a chess piece"""
-        return self._color
-
-    def valid_move(self, first_square, second_square):
-        """Changes Piece class method to use king's valid moves"""
-        valid_move = False
-        column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
-
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
-
-        row_difference = abs(first_square_row - second_square_row)
-        column_difference = abs(column_nums[second_square.get_column()] - column_nums[first_square.get_column()])
-
-        if column_difference == 1 and row_difference == 2:
-            valid_move = True
-        elif column_difference == 2 and row_difference == 1:
-            valid_move = True
-
-        return valid_move
+    __slots__ = ()
+    _piece = 'knight'
+    _type = KNIGHT
+    _letters = ('K', 'k')
+    _moves = KNIGHT_ATTACKS
 
 
 class King(Piece):
     """Represents a king that can only move one space at a time. Inherits all other methods from Piece class"""
 
-    def __init__(self, starting_square, color):
-        """Initializes a king chess piece"""
-        self._piece = 'king'
-        super().__init__(starting_square, color)
-        self._square = starting_square
-        self._color = color
-
-    def __repr__(self):
-        """Returns a readable name when the object is printed"""
-        if self._color == 'white':
-            return 'M'  # since knight also starts with a k, we use M for king since it resembles a crown
-        else:
-            return 'm'
-
-    def get_piece(self):
-        """Returns the value of a chess piece"""
-        return self._piece
-
-    def get_square(self):
-        """Returns the square a piece is on"""
-        return self._square
-
-    def get_piece_color(self):
-        """Returns the color of a chess piece"""
-        return self._color
-
-    def valid_move(self, first_square, second_square):
-        """Changes Piece class method to use king's valid moves"""
-        valid_move = False
-        column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
-
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
-
-        row_difference = abs(first_square_row - second_square_row)
-        column_difference = abs(column_nums[second_square.get_column()] - column_nums[first_square.get_column()])
-
-        if (column_difference <= 1) and (row_difference <= 1):
-            valid_move = True
-
-        return valid_move
+    __slots__ = ()
+    _piece = 'king'
+    _type = KING
+    _letters = ('M', 'm')  # since knight also starts with a k, we use M for king since it resembles a crown
+    _moves = KING_ATTACKS
 
 
 class Queen(Piece):
     """Represents a queen that can move in any direction any number of spaces. Inherits all other methods from Piece
     class"""
 
-    def __init__(self, starting_square, color):
-        """Initializes a queen chess piece"""
-        self._piece = 'queen'
-        super().__init__(starting_square, color)
-        self._square = starting_square
-        self._color = color
-
-    def __repr__(self):
-        """Returns a readable name when the object is printed"""
-        if self._color == 'white':
-            return 'Q'
-        else:
-            return 'q'
-
-    def get_piece(self):
-        """Returns the value of a chess piece"""
-        return self._piece
-
-    def get_square(self):
-        """Returns the square a piece is on"""
-        return self._square
-
-    def get_piece_color(self):
-        """Returns the color of a chess piece"""
-        return self._color
-
-    def valid_move(self, first_square, second_square):
-        """Changes Piece class method to use queen's valid moves"""
-        valid_move = False
-        column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
-        rows = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-        columns = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
-
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
-
-        row_difference = abs(first_square_row - second_square_row)
-        column_difference = abs(column_nums[second_square.get_column()] - column_nums[first_square.get_column()])
-
-        if column_difference == row_difference:
-            valid_move = True
-        elif (row_difference == 0) or (column_difference == 0):
-            if second_square.get_row() in rows or second_square.get_column() in columns:
-                valid_move = True
-
-        return valid_move
+    __slots__ = ()
+    _piece = 'queen'
+    _type = QUEEN
+    _letters = ('Q', 'q')
+    _moves = QUEEN_LINES
 
 
 class Pawn(Piece):
     """Represents a pawn that can move one space forward unless it is attacking, or it is it's first move. Inherits all
     other methods from Piece class"""
 
+    __slots__ = ('_first_move',)
+    _piece = 'pawn'
+    _type = PAWN
+    _letters = ('P', 'p')
+
     def __init__(self, starting_square, color):
         """Initializes a pawn chess piece"""
-        self._piece = 'pawn'
         super().__init__(starting_square, color)
-        self._square = starting_square
-        self._color = color
         self._first_move = 0
 
-    def __repr__(self):
-        """Returns a readable name when the object is printed"""
-        if self._color == 'white':
-            return 'P'
-        else:
-            return 'p'
+    def valid_move(self, first_square, second_square):
+        """Determines if a pawn's move is valid. White pawns move up the rows and black pawns move down them, one
+        square forward onto an empty square, two on their first move, or one square diagonally forward to capture"""
+        first_index = first_square.get_index()
+        second_index = second_square.get_index()
 
-    def get_piece(self):
-        """Returns the value of a chess piece"""
-        return self._piece
+        if second_square.get_piece() is not None:
+            if self._color == 'white':
+                return PAWN_ATTACKS[WHITE][first_index] >> second_index & 1 == 1
+            return PAWN_ATTACKS[BLACK][first_index] >> second_index & 1 == 1
 
-    def get_square(self):
-        """Returns the square a piece is on"""
-        return self._square
+        if self._color == 'white':
+            forward = second_index - first_index
+        else:
+            forward = first_index - second_index
+        return forward == 8 or (forward == 16 and self._first_move == 0)
 
-    def get_piece_color(self):
-        """Returns the color of a chess piece"""
-        return self._color
+    def set_first_move(self):
+        """Records that this pawn has moved, so it can no longer move two squares forward"""
+        self._first_move += 1
 
-    def valid_move(self, first_square, second_square):
-        """Determines if a pawn's move is valid"""
-        valid_move = False
-        column_nums = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8}
+    def is_first_move(self):
+        """Returns True if this pawn has not moved yet"""
+        return self._first_move == 0
 
-        first_square_row = int(first_square.get_row())
-        second_square_row = int(second_square.get_row())
+    def take_back_move(self):
+        """Takes back one of this pawn's recorded moves when a move is unmade"""
+        self._first_move -= 1
 
-        row_difference = abs(first_square_row - second_square_row)
-        column_difference = abs(column_nums[second_square.get_column()] - column_nums[first_square.get_column()])
+    def reset_first_move(self):
+        """Marks this pawn as not having moved yet"""
+        self._first_move = 0
 
-        if self._first_move == 0:
-            if column_difference == 0:
-                if row_difference <= 2:
-                    if second_square.get_piece() is None:
-                        valid_move = True
-                        self._first_move += 1
+    def copy(self):
+        """Returns a new pawn of the same color on the same square that has made the same number of moves"""
+        pawn = Pawn(self._square, self._color)
+        pawn._first_move = self._first_move
+        return pawn
 
-        elif column_difference == 0:
-            if row_difference == 1:
-                if second_square.get_piece() is None:
-                    valid_move = True
 
-        elif second_square.get_piece() is not None:
-            if column_difference == 1 and row_difference == 1:
-                valid_move = True
+# the Piece class for each piece type number, in PIECE_TYPES order
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
 
-        return valid_move
+_starting_game = ChessVar('bitboard')
+STARTING_CODES = tuple(_starting_game.get_piece_codes())
+STARTING_UNMOVED_PAWNS = _starting_game.get_unmoved_pawns()
+del _starting_game
@@ -0,0 +1,188 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Analyses batches of ChessVar positions across a pool of processes through shared memory buffers.
+
+import argparse
+import collections
+import multiprocessing
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+from ChessVar import (BISHOP, BISHOP_RAYS, BLACK, COLORS, KING, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS, PAWN,
+                      PAWN_ATTACKS, PIECE_TYPES, QUEEN, ROOK, ROOK_RAYS, SNAPSHOT_SIZE, WHITE, ChessVar, piece_code,
+                      slider_attacks)
+from replay import read_games
+from workers import init_worker_game, worker_game
+
+# Positions are packed one after another as 33-byte ChessVar snapshots, and each position's result is written to the
+# same slot of the results buffer as one RESULT_RECORD: its number of legal moves, its game state as an index into
+# STATES, each team's piece counts in PIECE_TYPES order, white first, and for each team a mask with bit n set when
+# piece type n is threatened, meaning the other team can capture the last piece of that type with its next move.
+RESULT_RECORD = struct.Struct('<HB12BBB')
+STATES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON', 'INVALID')
+INVALID = STATES.index('INVALID')
+DEFAULT_CHUNK_SIZE = 2000
+
+# the analysis of one position: its number of legal moves, its game state, each team's piece counts, and the piece
+# types each team could lose the game by on the next move, all keyed by color name
+PositionAnalysis = collections.namedtuple('PositionAnalysis', ('legal_moves', 'state', 'material', 'threatened'))
+
+# the shared memory blocks each worker process reuses, attached by init_worker
+_worker_positions = None
+_worker_results = None
+
+
+def pack_positions(positions):
+    """Returns a new shared memory block holding the snapshot of every position in a sequence of ChessVar games or
+    33-byte snapshots. The caller must close and unlink it."""
+    block = shared_memory.SharedMemory(create=True, size=max(len(positions) * SNAPSHOT_SIZE, 1))
+    for number, position in enumerate(positions):
+        if isinstance(position, ChessVar):
+            position = position.snapshot()
+        block.buf[number * SNAPSHOT_SIZE:(number + 1) * SNAPSHOT_SIZE] = position
+    return block
+
+
+def is_attacked(index, color, pieces):
+    """Returns True if a piece of a color number attacks a square, given the list of 13 piece bitboards indexed by
+    code. This answers ChessVar.is_attacked for a single position without building an AttackMap, which only pays for
+    itself over many moves of one game."""
+    first_code = piece_code(color, PAWN)
+    if PAWN_ATTACKS[1 - color][index] & pieces[first_code]:
+        return True
+    if KNIGHT_ATTACKS[index] & pieces[first_code + KNIGHT] or KING_ATTACKS[index] & pieces[first_code + KING]:
+        return True
+    occupied = 0
+    for code in range(1, 13):
+        occupied |= pieces[code]
+    queens = pieces[first_code + QUEEN]
+    return (slider_attacks(index, occupied, ROOK_RAYS) & (pieces[first_code + ROOK] | queens) != 0
+            or slider_attacks(index, occupied, BISHOP_RAYS) & (pieces[first_code + BISHOP] | queens) != 0)
+
+
+def analyze_position(game):
+    """Returns (legal move count, state number, 12 piece counts, white threatened mask, black threatened mask) for a
+    game, ready to pack into a RESULT_RECORD. The masks hold the types threatened_types would name."""
+    material = game.material()
+    state = game.get_game_state()
+    masks = [0, 0]
+    if state == 'UNFINISHED':
+        pieces = [0] * 13
+        for index, code in enumerate(game.get_piece_codes()):
+            pieces[code] |= 1 << index
+        for color in (WHITE, BLACK):
+            for piece_type, count in enumerate(material[color]):
+                if count == 1:
+                    index = pieces[piece_code(color, piece_type)].bit_length() - 1
+                    if is_attacked(index, 1 - color, pieces):
+                        masks[color] |= 1 << piece_type
+    moves = sum(1 for move in game.generate_moves())
+    return (moves, STATES.index(state), *material[WHITE], *material[BLACK], *masks)
+
+
+def analyze_range(game, positions, results, start, stop):
+    """Analyses positions start to stop - 1 of a positions buffer with a game, writing each one's RESULT_RECORD into
+    a results buffer. Snapshots that do not describe a legal position are marked INVALID."""
+    for number in range(start, stop):
+        try:
+            game.restore(positions[number * SNAPSHOT_SIZE:(number + 1) * SNAPSHOT_SIZE])
+        except ValueError:
+            RESULT_RECORD.pack_into(results, number * RESULT_RECORD.size, 0, INVALID, *[0] * 14)
+            continue
+        RESULT_RECORD.pack_into(results, number * RESULT_RECORD.size, *analyze_position(game))
+
+
+def init_worker(positions_name, results_name):
+    """Attaches a worker process to the positions and results blocks by name and creates the game it reuses"""
+    global _worker_positions, _worker_results
+    init_worker_game('bitboard')
+    _worker_positions = shared_memory.SharedMemory(name=positions_name)
+    _worker_results = shared_memory.SharedMemory(name=results_name)
+
+
+def analyze_chunk(bounds):
+    """Analyses the positions from start to stop - 1 in a worker process and returns how many there were. Only the two
+    bounds are pickled; the positions and results travel through shared memory."""
+    start, stop = bounds
+    analyze_range(worker_game(), _worker_positions.buf, _worker_results.buf, start, stop)
+    return stop - start
+
+
+def read_result(results, number):
+    """Returns the PositionAnalysis of one position from a results buffer"""
+    record = RESULT_RECORD.unpack_from(results, number * RESULT_RECORD.size)
+    return PositionAnalysis(
+        record[0], STATES[record[1]],
+        {'white': list(record[2:8]), 'black': list(record[8:14])},
+        {color: [piece_type for bit, piece_type in enumerate(PIECE_TYPES) if mask >> bit & 1]
+         for color, mask in zip(COLORS, record[14:16])})
+
+
+def analyze_positions(positions, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Returns a PositionAnalysis for every position in a sequence of ChessVar games or snapshots, in order. The
+    positions are packed into shared memory once and split into chunks for a pool of worker processes, which write
+    their results into a shared results block instead of sending them back."""
+    count = len(positions)
+    positions_block = pack_positions(positions)
+    results_block = shared_memory.SharedMemory(create=True, size=max(count * RESULT_RECORD.size, 1))
+    try:
+        if workers > 1:
+            chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+            with multiprocessing.Pool(workers, init_worker, (positions_block.name, results_block.name)) as pool:
+                pool.map(analyze_chunk, chunks)
+        else:
+            analyze_range(ChessVar('bitboard'), positions_block.buf, results_block.buf, 0, count)
+        return [read_result(results_block.buf, number) for number in range(count)]
+    finally:
+        positions_block.close()
+        positions_block.unlink()
+        results_block.close()
+        results_block.unlink()
+
+
+def game_positions(path):
+    """Returns the snapshot of every position reached in a file of games, one game per line, stopping each game at
+    its first illegal move"""
+    game = ChessVar('bitboard')
+    positions = []
+    with open(path) as lines:
+        for line_number, line in read_games(lines):
+            game.reset()
+            positions.append(game.snapshot())
+            for word in line.split():
+                if game.apply_moves(word) == 0:
+                    break
+                positions.append(game.snapshot())
+    return positions
+
+
+def main(argv=None):
+    """Analyses every position reached in a file of games from the command line and prints a summary"""
+    parser = argparse.ArgumentParser(description='Analyse ChessVar positions across worker processes')
+    parser.add_argument('path', help="file of games, each a line of moves such as 'e2e4 e7e5 g1f3'")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='positions per worker task')
+    arguments = parser.parse_args(argv)
+
+    positions = game_positions(arguments.path)
+    start = time.perf_counter()
+    results = analyze_positions(positions, arguments.workers, arguments.chunk_size)
+    seconds = time.perf_counter() - start
+    print(f"{len(results)} positions in {seconds:.2f}s ({len(results) / max(seconds, 1e-9):,.0f} positions/s)")
+    if results:
+        print(f"mean legal moves: {sum(result.legal_moves for result in results) / len(results):.1f}")
+    states = collections.Counter(result.state for result in results)
+    for state, count in sorted(states.items()):
+        print(f"{state}: {count}")
+    threatened = collections.Counter((color, piece_type) for result in results
+                                     for color, piece_types in result.threatened.items() for piece_type in piece_types)
+    for (color, piece_type), count in sorted(threatened.items(), key=lambda item: -item[1]):
+        print(f"{color} {piece_type} threatened: {count}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
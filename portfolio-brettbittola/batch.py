@@ -0,0 +1,298 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Plays thousands of ChessVar games in lockstep with NumPy arrays.
+
+import numpy as np
+
+from ChessVar import (BETWEEN, BISHOP, BISHOP_LINES, BISHOP_RAYS, KING, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS, PAWN,
+                      PAWN_ATTACKS, QUEEN, QUEEN_LINES, QUEEN_RAYS, RAY_INCREASING, RAYS, ROOK, ROOK_LINES, ROOK_RAYS,
+                      STARTING_CODES, STARTING_MATERIAL, STARTING_UNMOVED_PAWNS, ChessVar)
+
+# game states, in the order get_game_state's strings are numbered here
+STATES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+UNFINISHED, WHITE_WON, BLACK_WON = range(3)
+
+
+def move_table(masks):
+    """Turns a list of 64 bitboards into a (64, 64) table that is True where the second square is in the first
+    square's bitboard"""
+    return np.array([[mask >> index & 1 for index in range(64)] for mask in masks], dtype=bool)
+
+
+def bit_counts(bitboards):
+    """Returns an int64 array of how many bits are set in each element of a uint64 array"""
+    byte_counts = BYTE_BIT_COUNTS[np.ascontiguousarray(bitboards).view(np.uint8)]
+    return byte_counts.reshape(bitboards.shape + (8,)).sum(axis=-1, dtype=np.int64)
+
+
+def forward_table(step):
+    """Returns a (64, 64) table that is True where the second square is step squares past the first"""
+    table = np.zeros((64, 64), dtype=bool)
+    for index in range(64):
+        if 0 <= index + step < 64:
+            table[index, index + step] = True
+    return table
+
+
+# SHAPES[piece type, from, to] is True where that type could move between the squares on an empty board, and SLIDES
+# marks the types that are blocked by pieces in between. Pawns are handled separately, since their moves depend on
+# color and on whether they capture.
+SHAPES = np.stack([np.zeros((64, 64), dtype=bool), move_table(KNIGHT_ATTACKS), move_table(BISHOP_LINES),
+                   move_table(ROOK_LINES), move_table(QUEEN_LINES), move_table(KING_ATTACKS)])
+SLIDES = np.array([False, False, True, True, True, False])
+BETWEEN_BITS = np.array(BETWEEN, dtype=np.uint64).reshape(64, 64)
+SQUARE_BITS = np.array([1 << index for index in range(64)], dtype=np.uint64)
+# the number of set bits in each byte value, for counting the bits of uint64 arrays on any NumPy version
+BYTE_BIT_COUNTS = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+# pawn tables indexed by color number, then from and to squares
+PAWN_PUSHES = np.stack([forward_table(8), forward_table(-8)])
+PAWN_DOUBLE_PUSHES = np.stack([forward_table(16), forward_table(-16)])
+PAWN_CAPTURES = np.stack([move_table(PAWN_ATTACKS[0]), move_table(PAWN_ATTACKS[1])])
+
+# The same moves as bitboards for generating every move at once: STEP_BITS[piece type, from] holds the squares a
+# knight or king reaches, RAY_BITS[direction, from] the RAYS of ChessVar, and RAY_TYPES[piece type, direction] the
+# directions each slider moves in. The pawn tables hold 0 where a push would leave the board.
+STEP_BITS = np.zeros((6, 64), dtype=np.uint64)
+STEP_BITS[KNIGHT] = KNIGHT_ATTACKS
+STEP_BITS[KING] = KING_ATTACKS
+RAY_BITS = np.array(RAYS, dtype=np.uint64)
+RAY_TYPES = np.zeros((6, 8), dtype=bool)
+RAY_TYPES[ROOK, list(ROOK_RAYS)] = True
+RAY_TYPES[BISHOP, list(BISHOP_RAYS)] = True
+RAY_TYPES[QUEEN, list(QUEEN_RAYS)] = True
+PAWN_PUSH_BITS = (PAWN_PUSHES.astype(np.uint64) * SQUARE_BITS).sum(axis=2, dtype=np.uint64)
+PAWN_DOUBLE_PUSH_BITS = (PAWN_DOUBLE_PUSHES.astype(np.uint64) * SQUARE_BITS).sum(axis=2, dtype=np.uint64)
+PAWN_CAPTURE_BITS = np.array(PAWN_ATTACKS, dtype=np.uint64)
+ONE = np.uint64(1)
+
+
+def lowest_bit(masks):
+    """Returns an array holding only the lowest set bit of each bitboard in an array"""
+    return masks & (~masks + ONE)
+
+
+def highest_bit(masks):
+    """Returns an array holding only the highest set bit of each bitboard in an array"""
+    for shift in (1, 2, 4, 8, 16, 32):
+        masks = masks | (masks >> np.uint64(shift))
+    return masks ^ (masks >> ONE)
+
+
+def bit_index(bits):
+    """Returns the square index of each single-bit bitboard in an array, and 0 for empty bitboards"""
+    return np.log2(np.maximum(bits, ONE).astype(np.float64)).astype(np.int64)
+
+
+class BatchGames:
+    """Holds many games as arrays: a (games, 64) array of piece codes, the team to move, which pawns have not moved,
+    each team's count of each piece type, and the game state, so one call validates and makes a move in every game"""
+
+    def __init__(self, count):
+        """Initializes count games at the standard starting position"""
+        self._count = count
+        self._boards = np.zeros((count, 64), dtype=np.int8)
+        self._occupied = np.zeros((count, 2), dtype=np.uint64)
+        self._turns = np.zeros(count, dtype=np.int8)
+        self._unmoved = np.zeros((count, 64), dtype=bool)
+        self._material = np.zeros((count, 2, 6), dtype=np.int8)
+        self._states = np.zeros(count, dtype=np.int8)
+        self._moves_made = np.zeros(count, dtype=np.int32)
+        self.reset()
+
+    def __len__(self):
+        """Returns the number of games"""
+        return self._count
+
+    def reset(self, games=None):
+        """Sets every game, or the games at the given indices, back to the starting position"""
+        if games is None:
+            games = slice(None)
+        codes = np.array(STARTING_CODES)
+        self._boards[games] = codes
+        self._unmoved[games] = [bool(STARTING_UNMOVED_PAWNS >> index & 1) for index in range(64)]
+        self._occupied[games] = [SQUARE_BITS[(codes - 1) // 6 == color].sum(dtype=np.uint64) for color in (0, 1)]
+        self._turns[games] = 0
+        self._material[games] = [STARTING_MATERIAL, STARTING_MATERIAL]
+        self._states[games] = UNFINISHED
+        self._moves_made[games] = 0
+
+    def get_boards(self):
+        """Returns the (games, 64) array of piece codes, which must not be changed"""
+        return self._boards
+
+    def get_turns(self):
+        """Returns the array of the color number to move in each game, 0 for white and 1 for black"""
+        return self._turns
+
+    def get_material(self):
+        """Returns the (games, 2, 6) array of how many of each piece type each team has left"""
+        return self._material
+
+    def get_states(self):
+        """Returns the array of game states, numbered as in STATES"""
+        return self._states
+
+    def get_moves_made(self):
+        """Returns the array of how many moves each game has made"""
+        return self._moves_made
+
+    def get_game_state(self, game):
+        """Returns the state of one game as 'UNFINISHED', 'WHITE_WON' or 'BLACK_WON', like ChessVar.get_game_state"""
+        return STATES[self._states[game]]
+
+    def legality(self, games, first, second):
+        """Returns True for each (game, from square, to square) whose move is legal, where the three index arrays are
+        broadcast together"""
+        code = self._boards[games, first]
+        target = self._boards[games, second]
+        turn = self._turns[games]
+        color = (code - 1) // 6
+        target_color = (target - 1) // 6
+        own = (code != 0) & (color == turn)
+        target_ok = (target == 0) | (target_color != turn)
+        piece_type = np.where(code > 0, (code - 1) % 6, 0)
+
+        occupied = self._occupied[games, 0] | self._occupied[games, 1]
+        blocked = (BETWEEN_BITS[first, second] & occupied) != 0
+        piece_ok = SHAPES[piece_type, first, second] & ~(SLIDES[piece_type] & blocked)
+        pawn_ok = np.where(target == 0,
+                           PAWN_PUSHES[turn, first, second]
+                           | (PAWN_DOUBLE_PUSHES[turn, first, second] & self._unmoved[games, first] & ~blocked),
+                           PAWN_CAPTURES[turn, first, second])
+        legal = np.where(piece_type == PAWN, pawn_ok, piece_ok)
+        return own & target_ok & legal & (self._states[games] == UNFINISHED)
+
+    def move_targets(self):
+        """Returns (from squares, targets): a (games, 16) array of the squares of the pieces of the team to move in
+        each game, padded with -1, and a (games, 16) array of bitboards of the squares each of them can legally move
+        to, which are empty for padding and for finished games"""
+        games = np.arange(self._count)
+        turns = self._turns.astype(np.int64)
+        own = (self._boards > 0) & ((self._boards - 1) // 6 == self._turns[:, None])
+        own &= (self._states == UNFINISHED)[:, None]
+        piece_games, squares = np.nonzero(own)
+        ranks = own.cumsum(axis=1)[piece_games, squares] - 1
+        order = np.zeros((self._count, 16), dtype=np.int64)
+        present = np.zeros((self._count, 16), dtype=bool)
+        order[piece_games, ranks] = squares
+        present[piece_games, ranks] = True
+        first = np.where(present, order, -1)
+
+        piece_type = np.where(present, (self._boards[games[:, None], order] - 1) % 6, PAWN)
+        own_occupied = self._occupied[games, turns][:, None]
+        enemy_occupied = self._occupied[games, 1 - turns][:, None]
+        occupied = own_occupied | enemy_occupied
+        empty = ~occupied
+
+        targets = STEP_BITS[piece_type, order]
+        for direction in range(8):
+            slider_games, slider_pieces = np.nonzero(RAY_TYPES[piece_type, direction])
+            slider_squares = order[slider_games, slider_pieces]
+            rays = RAY_BITS[direction, slider_squares]
+            blockers = rays & occupied[slider_games, 0]
+            if RAY_INCREASING[direction]:
+                blocker = bit_index(lowest_bit(blockers))
+            else:
+                blocker = bit_index(highest_bit(blockers))
+            targets[slider_games, slider_pieces] |= np.where(blockers != 0, rays ^ RAY_BITS[direction, blocker], rays)
+
+        pawns = piece_type == PAWN
+        pushes = PAWN_PUSH_BITS[turns[:, None], order] & empty
+        double_pushes = np.where((pushes != 0) & self._unmoved[games[:, None], order],
+                                 PAWN_DOUBLE_PUSH_BITS[turns[:, None], order] & empty, np.uint64(0))
+        captures = PAWN_CAPTURE_BITS[turns[:, None], order] & enemy_occupied
+        targets = np.where(pawns, pushes | double_pushes | captures, targets & ~own_occupied)
+        targets = np.where(present, targets, np.uint64(0))
+        return first, targets
+
+    def legal_move_mask(self):
+        """Returns a (games, 64, 64) array that is True where moving from the first square to the second is legal"""
+        first, targets = self.move_targets()
+        mask = np.zeros((self._count, 64, 64), dtype=bool)
+        games, pieces = np.nonzero(targets)
+        mask[games, first[games, pieces]] = (targets[games, pieces, None] & SQUARE_BITS) != 0
+        return mask
+
+    def random_moves(self, rng):
+        """Returns a (games, 2) array holding a random legal move for each game, or -1 for games with no legal move,
+        chosen with a numpy.random.Generator"""
+        first, targets = self.move_targets()
+        counts = bit_counts(targets)
+        totals = counts.sum(axis=1)
+        moves = np.full((self._count, 2), -1, dtype=np.int64)
+        games = np.flatnonzero(totals)
+        if len(games) == 0:
+            return moves
+
+        choices = (rng.random(len(games)) * totals[games]).astype(np.int64)
+        ends = counts[games].cumsum(axis=1)
+        pieces = (ends <= choices[:, None]).sum(axis=1)
+        choices -= ends[np.arange(len(games)), pieces] - counts[games, pieces]
+        bits = (targets[games, pieces, None] & SQUARE_BITS) != 0
+        seconds = (bits.cumsum(axis=1) <= choices[:, None]).sum(axis=1)
+        moves[games, 0] = first[games, pieces]
+        moves[games, 1] = seconds
+        return moves
+
+    def make_moves(self, moves):
+        """Makes one move in each game from a (games, 2) array of from and to square indices, and returns a boolean
+        array that is True for the games whose move was legal and made. A from square of -1 skips that game, and
+        finished games reject every move."""
+        moves = np.asarray(moves, dtype=np.int64)
+        first = moves[:, 0]
+        second = moves[:, 1]
+        games = np.arange(self._count)
+        present = (first >= 0) & (first < 64) & (second >= 0) & (second < 64)
+        legal = np.zeros(self._count, dtype=bool)
+        legal[present] = self.legality(games[present], first[present], second[present])
+
+        games = games[legal]
+        first = first[legal]
+        second = second[legal]
+        turns = self._turns[games].astype(np.int64)
+        code = self._boards[games, first]
+        captured = self._boards[games, second]
+        self._boards[games, second] = code
+        self._boards[games, first] = 0
+        self._unmoved[games, first] = False
+        self._unmoved[games, second] = False
+        self._occupied[games, turns] = (self._occupied[games, turns] & ~SQUARE_BITS[first]) | SQUARE_BITS[second]
+        self._occupied[games, 1 - turns] &= ~SQUARE_BITS[second]
+
+        capturing = captured != 0
+        capture_games = games[capturing]
+        captured_color = (captured[capturing] - 1) // 6
+        captured_type = (captured[capturing] - 1) % 6
+        self._material[capture_games, captured_color, captured_type] -= 1
+        won = self._material[capture_games, captured_color, captured_type] == 0
+        self._states[capture_games[won]] = np.where(captured_color[won] == 0, BLACK_WON, WHITE_WON)
+
+        self._turns[games] ^= 1
+        self._moves_made[games] += 1
+        return legal
+
+    def to_game(self, game, backend='board'):
+        """Returns a ChessVar set to the position of one game, which cannot unmake the moves that led to it"""
+        unmoved_pawns = 0
+        for index in np.flatnonzero(self._unmoved[game]):
+            unmoved_pawns |= 1 << int(index)
+        chess_game = ChessVar(backend)
+        if self._turns[game]:
+            team_turn = 'black'
+        else:
+            team_turn = 'white'
+        chess_game.set_position([int(code) for code in self._boards[game]], unmoved_pawns, team_turn)
+        return chess_game
+
+
+def rollout(count, max_moves=400, seed=None):
+    """Plays count random games in lockstep until they finish or reach max_moves, and returns the BatchGames"""
+    rng = np.random.default_rng(seed)
+    batch = BatchGames(count)
+    for move_number in range(max_moves):
+        if not (batch.get_states() == UNFINISHED).any():
+            break
+        batch.make_moves(batch.random_moves(rng))
+    return batch
+
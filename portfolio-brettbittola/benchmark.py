@@ -0,0 +1,297 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Latency and memory benchmarks for ChessVar's public entry points, checked against a stored baseline.
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from ChessVar import SQUARE_NAMES, ChessVar
+from replay import replay_game
+
+# Each make_move case is the moves that set up a position from the start and the move timed there. The slider moves
+# cross as many empty squares as the opening allows, so they run the full check_rook_path and check_bishop_path, the
+# capture goes through capture_piece, and the win takes black's only queen.
+MOVE_CASES = {
+    'pawn': ('', 'e2e4'),
+    'knight': ('', 'g1f3'),
+    'bishop': ('e2e3 h7h6', 'f1a6'),
+    'rook': ('a2a4 b7b5 a4b5 h7h6', 'a1a6'),
+    'queen': ('e2e4 h7h6', 'd1h5'),
+    'king': ('e2e4 h7h6', 'e1e2'),
+    'capture': ('e2e4 d7d5', 'e4d5'),
+    'win': ('e2e4 d7d5 e4d5 d8d5 b1c3 h7h6', 'c3d5'),
+}
+DEFAULT_SAMPLES = 2000
+DEFAULT_GAMES = 200
+DEFAULT_SEED = 0
+MAX_GAME_MOVES = 200
+# untimed calls made before each timed run, as a fraction of its samples, so caches and lazy setup are warm
+WARMUP_FRACTION = 0.1
+# how much worse than the baseline each metric may get, as a fraction, before the run fails; a baseline file may
+# set its own under 'thresholds'
+DEFAULT_THRESHOLDS = {'p50_ns': 0.25, 'p99_ns': 0.75, 'bytes_per_game': 0.10}
+
+
+def summarize(samples, total_ns):
+    """Returns the p50 and p99 of a list of nanosecond timings, the operations per second if they took total_ns
+    nanoseconds in all, and the number of samples"""
+    samples = sorted(samples)
+    return {'samples': len(samples),
+            'p50_ns': samples[len(samples) // 2],
+            'p99_ns': samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+            'ops_per_second': len(samples) * 1e9 / max(total_ns, 1)}
+
+
+def traced_bytes(build, count):
+    """Returns the bytes tracemalloc sees allocated per object when build is called count times and every result is
+    kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build() for number in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return (after - before) // count
+
+
+def timed(function, count):
+    """Calls function count times with garbage collection paused, after a few untimed warmup calls, and returns (list
+    of nanosecond timings, total nanoseconds)"""
+    for number in range(int(count * WARMUP_FRACTION)):
+        function()
+    samples = []
+    clock = time.perf_counter_ns
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = clock()
+        for number in range(count):
+            before = clock()
+            function()
+            samples.append(clock() - before)
+        total = clock() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples, total
+
+
+def bench_construction(backend, samples):
+    """Times ChessVar() and measures the memory of a new game"""
+    result = summarize(*timed(lambda: ChessVar(backend), samples))
+    result['bytes_per_game'] = traced_bytes(lambda: ChessVar(backend), min(samples, 500))
+    return result
+
+
+def bench_restore(backend, games, samples):
+    """Times restore cycling through snapshots of the positions reached in a list of games, on one reused game, and
+    reports how many times faster it is than building a new game"""
+    game = ChessVar('bitboard')
+    snapshots = []
+    for line in games:
+        game.reset()
+        for word in line.split():
+            game.apply_moves(word)
+            snapshots.append(game.snapshot())
+    game = ChessVar(backend)
+    positions = itertools.cycle(snapshots)
+    result = summarize(*timed(lambda: game.restore(next(positions)), samples))
+    construction = summarize(*timed(lambda: ChessVar(backend), samples))
+    result['times_faster_than_construction'] = construction['p50_ns'] / max(result['p50_ns'], 1)
+    return result
+
+
+def bench_move(backend, setup, move, samples):
+    """Times make_move for one move from the position reached by the setup moves, taking the move back with
+    unmake_move between samples so every sample starts from the same position"""
+    game = ChessVar(backend)
+    if game.apply_moves(setup) != len(setup.split()):
+        raise ValueError(f"Benchmark setup {setup!r} has an illegal move")
+    first_square, second_square = move[:2], move[2:]
+    if not game.make_move(first_square, second_square):
+        raise ValueError(f"Benchmark move {move!r} is not legal after {setup!r}")
+    game.unmake_move()
+
+    timings = []
+    clock = time.perf_counter_ns
+    make_move = game.make_move
+    unmake_move = game.unmake_move
+    for number in range(int(samples * WARMUP_FRACTION)):
+        make_move(first_square, second_square)
+        unmake_move()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        total = 0
+        for number in range(samples):
+            before = clock()
+            make_move(first_square, second_square)
+            elapsed = clock() - before
+            unmake_move()
+            timings.append(elapsed)
+            total += elapsed
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(timings, total)
+
+
+def random_games(count, seed=DEFAULT_SEED, max_moves=MAX_GAME_MOVES):
+    """Returns count games of uniformly random legal moves as lines of moves such as 'e2e4 e7e5', each played until
+    a side wins or max_moves moves, the same for a given seed on every machine"""
+    rng = random.Random(seed)
+    game = ChessVar('bitboard')
+    games = []
+    for number in range(count):
+        game.reset()
+        words = []
+        while game.get_game_state() == 'UNFINISHED' and len(words) < max_moves:
+            moves = list(game.generate_moves())
+            if not moves:
+                break
+            first_index, second_index = rng.choice(moves)
+            game.make_move_idx(first_index, second_index)
+            words.append((SQUARE_NAMES[first_index] + SQUARE_NAMES[second_index]).lower())
+        games.append(' '.join(words))
+    return games
+
+
+def bench_replay(backend, games):
+    """Times replaying whole games through one reused game and measures the memory of a game kept after a full
+    replay, undo history included"""
+    game = ChessVar(backend)
+    lines = itertools.cycle(games)
+    samples, total = timed(lambda: replay_game(game, next(lines)), len(games))
+    result = summarize(samples, total)
+    result['moves_per_second'] = sum(len(line.split()) for line in games) * 1e9 / max(total, 1)
+    lines = iter(games)
+
+    def replayed_game():
+        """Returns a new game that has replayed the next game"""
+        new_game = ChessVar(backend)
+        new_game.apply_moves(next(lines))
+        return new_game
+
+    result['bytes_per_game'] = traced_bytes(replayed_game, len(games))
+    return result
+
+
+def run_benchmarks(backend='board', samples=DEFAULT_SAMPLES, games=DEFAULT_GAMES, seed=DEFAULT_SEED):
+    """Runs every benchmark on one backend and returns the results as a dictionary ready to write as JSON"""
+    replay_games = random_games(games, seed)
+    benchmarks = {'construction': bench_construction(backend, samples),
+                  'restore': bench_restore(backend, replay_games, samples)}
+    for name, (setup, move) in MOVE_CASES.items():
+        benchmarks['make_move_' + name] = bench_move(backend, setup, move, samples)
+    benchmarks['replay'] = bench_replay(backend, replay_games)
+    return {'backend': backend, 'python': platform.python_version(), 'platform': platform.platform(),
+            'samples': samples, 'games': games, 'seed': seed, 'benchmarks': benchmarks}
+
+
+def compare(results, baseline, thresholds=None):
+    """Returns a list of messages, one for each metric of a benchmark in both results that got worse than the
+    baseline by more than its threshold. Thresholds default to the baseline's own, then to DEFAULT_THRESHOLDS."""
+    limits = dict(DEFAULT_THRESHOLDS)
+    limits.update(baseline.get('thresholds', {}))
+    limits.update(thresholds or {})
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        expected = baseline['benchmarks'].get(name)
+        if expected is None:
+            continue
+        for metric, limit in limits.items():
+            if metric not in result or metric not in expected:
+                continue
+            allowed = expected[metric] * (1 + limit)
+            if result[metric] > allowed:
+                regressions.append(f"{name} {metric} {result[metric]:,} is over {allowed:,.0f} "
+                                   f"(baseline {expected[metric]:,} + {limit:.0%})")
+    return regressions
+
+
+def check_restore(results, min_speedup):
+    """Returns a list holding a message if restore was not at least min_speedup times faster than building a new
+    game, or an empty list"""
+    speedup = results['benchmarks']['restore']['times_faster_than_construction']
+    if speedup < min_speedup:
+        return [f"restore is only {speedup:.2f}x faster than construction, expected at least {min_speedup}x"]
+    return []
+
+
+def print_results(results, output=sys.stdout):
+    """Prints a table of benchmark results"""
+    print(f"{'benchmark':20} {'p50 us':>10} {'p99 us':>10} {'ops/s':>12} {'bytes/game':>11}  "
+          f"({results['backend']} backend)", file=output)
+    for name, result in results['benchmarks'].items():
+        memory = result.get('bytes_per_game')
+        if memory is None:
+            memory = ''
+        print(f"{name:20} {result['p50_ns'] / 1000:>10.2f} {result['p99_ns'] / 1000:>10.2f} "
+              f"{result['ops_per_second']:>12,.0f} {memory:>11}", file=output)
+    print(f"restore is {results['benchmarks']['restore']['times_faster_than_construction']:.2f}x faster than "
+          f"construction", file=output)
+
+
+def main(argv=None):
+    """Runs the benchmarks from the command line, exiting with status 1 if a metric regressed past its threshold or
+    restore beat construction by less than --min-restore-speedup asks for"""
+    parser = argparse.ArgumentParser(description='Latency and memory benchmarks for ChessVar')
+    parser.add_argument('--backend', choices=('board', 'bitboard'), default='board')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help='timings per benchmark')
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help='random games for the replay benchmark')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='seed of the random games')
+    parser.add_argument('--json', help='write the results to this file as JSON')
+    parser.add_argument('--baseline', help='fail if the results are worse than this JSON file by over a threshold')
+    parser.add_argument('--threshold', action='append', default=[], metavar='METRIC=FRACTION',
+                        help=f"override a threshold, such as p50_ns=0.1 (defaults: "
+                             f"{', '.join(f'{key}={value}' for key, value in DEFAULT_THRESHOLDS.items())})")
+    parser.add_argument('--min-restore-speedup', type=float, metavar='TIMES',
+                        help='fail unless restore is at least this many times faster than building a new game')
+    arguments = parser.parse_args(argv)
+
+    thresholds = {}
+    for setting in arguments.threshold:
+        metric, separator, fraction = setting.partition('=')
+        if metric not in DEFAULT_THRESHOLDS or not separator:
+            parser.error(f"--threshold expects METRIC=FRACTION for a METRIC in {', '.join(DEFAULT_THRESHOLDS)}, "
+                         f"got {setting!r}")
+        thresholds[metric] = float(fraction)
+
+    results = run_benchmarks(arguments.backend, arguments.samples, arguments.games, arguments.seed)
+    print_results(results)
+    if arguments.json:
+        with open(arguments.json, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+            json_file.write('\n')
+
+    regressions = []
+    if arguments.min_restore_speedup is not None:
+        regressions += check_restore(results, arguments.min_restore_speedup)
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('backend') != results['backend']:
+            parser.error(f"baseline is for the {baseline.get('backend')} backend, not {results['backend']}")
+        regressions += compare(results, baseline, thresholds)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        return 1
+    if arguments.baseline:
+        print(f"no regressions against {arguments.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
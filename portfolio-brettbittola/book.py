@@ -0,0 +1,226 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Builds an opening book from recorded games and looks up book moves for a game.
+
+import argparse
+import bisect
+import collections
+import mmap
+import struct
+import sys
+
+from ChessVar import SQUARE_NAMES, ChessVar
+from gamedb import MOVES_MAGIC, GameDatabase
+from replay import parse_moves, read_games
+
+# A book file is BOOK_MAGIC followed by one BOOK_ENTRY per (position, move) pair, sorted by the position's Zobrist
+# hash and then by the move, written as from index << 6 | to index. Each entry counts the games that played the move
+# there and how many of them the team making the move went on to win and lose, the rest being unfinished or drawn.
+BOOK_MAGIC = b'CVBOOK01'
+BOOK_ENTRY = struct.Struct('<QHIII')
+DEFAULT_PLIES = 12
+DEFAULT_MIN_GAMES = 2
+
+# one move of a book position: the move as lowercase square names, the games that played it, and the share of them
+# the team making the move won, with draws and unfinished games counting half
+BookMove = collections.namedtuple('BookMove', ('move', 'games', 'wins', 'losses', 'score'))
+
+# the books opened by book_move, by path
+_books = {}
+
+
+def archive_games(path):
+    """Yields (list of (from index, to index) moves, final game state) for every game in a gamedb archive"""
+    with GameDatabase(path) as database:
+        for game_number in range(len(database)):
+            yield list(database.get_moves(game_number)), database.get_outcome(game_number)
+
+
+def text_games(path, backend='bitboard'):
+    """Yields (list of moves, final game state) for every game in a text file of one game per line, replaying each
+    one to find its result. Games with an illegal move are skipped, as gamedb.import_text skips them."""
+    game = ChessVar(backend)
+    with open(path) as lines:
+        for line_number, line in read_games(lines):
+            game.reset()
+            moves = parse_moves(line)
+            if all(move is not None and game.make_move_idx(move[0], move[1]) for move in moves):
+                yield moves, game.get_game_state()
+
+
+def build_book(games, plies=DEFAULT_PLIES, min_games=DEFAULT_MIN_GAMES, backend='bitboard'):
+    """Returns the sorted list of (position hash, move, games, wins, losses) book entries for the first plies moves of
+    an iterable of (moves, final game state) games played from the starting position, keeping moves played in at
+    least min_games games"""
+    statistics = collections.defaultdict(lambda: [0, 0, 0])
+    game = ChessVar(backend)
+    for moves, state in games:
+        game.reset()
+        for first_index, second_index in moves[:plies]:
+            mover_won = state == ('WHITE_WON' if game.get_team_turn() == 'white' else 'BLACK_WON')
+            mover_lost = state == ('BLACK_WON' if game.get_team_turn() == 'white' else 'WHITE_WON')
+            key = (game.get_hash(), first_index << 6 | second_index)
+            if not game.make_move_idx(first_index, second_index):
+                break
+            counts = statistics[key]
+            counts[0] += 1
+            counts[1] += mover_won
+            counts[2] += mover_lost
+    return sorted((position_hash, move, count, wins, losses)
+                  for (position_hash, move), (count, wins, losses) in statistics.items() if count >= min_games)
+
+
+def write_book(entries, path):
+    """Writes sorted book entries to a file and returns the number written"""
+    with open(path, 'wb') as book_file:
+        book_file.write(BOOK_MAGIC)
+        for entry in entries:
+            book_file.write(BOOK_ENTRY.pack(*entry))
+    return len(entries)
+
+
+class PositionKeys:
+    """A read-only sequence of the position hashes of a book's entries, read from its memory map on demand so bisect
+    can search it without loading the book"""
+
+    def __init__(self, data, count):
+        """Initializes the sequence over a book's memory map and its number of entries"""
+        self._data = data
+        self._count = count
+
+    def __len__(self):
+        """Returns the number of entries"""
+        return self._count
+
+    def __getitem__(self, entry_number):
+        """Returns the position hash of one entry"""
+        return struct.unpack_from('<Q', self._data, len(BOOK_MAGIC) + entry_number * BOOK_ENTRY.size)[0]
+
+
+class OpeningBook:
+    """Reads a book file through a memory map and looks up positions by binary search on their hashes"""
+
+    def __init__(self, path):
+        """Maps a book file into memory and checks its header"""
+        self._book_file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            self._book_file.close()
+            raise ValueError(f"{path} is not an opening book") from None
+        if self._data[:len(BOOK_MAGIC)] != BOOK_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+        self._count = (len(self._data) - len(BOOK_MAGIC)) // BOOK_ENTRY.size
+        self._keys = PositionKeys(self._data, self._count)
+
+    def __enter__(self):
+        """Returns the book for use in a with statement"""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the book at the end of a with statement"""
+        self.close()
+
+    def __len__(self):
+        """Returns the number of (position, move) entries in the book"""
+        return self._count
+
+    def close(self):
+        """Releases the memory map and closes the file"""
+        self._data.close()
+        self._book_file.close()
+
+    def get_moves(self, game):
+        """Returns the BookMoves for the position of a game, best scoring first, leaving out any move that is not legal
+        there"""
+        position_hash = game.get_hash()
+        entry_number = bisect.bisect_left(self._keys, position_hash)
+        legal_moves = None
+        moves = []
+        while entry_number < self._count:
+            key, move, count, wins, losses = BOOK_ENTRY.unpack_from(
+                self._data, len(BOOK_MAGIC) + entry_number * BOOK_ENTRY.size)
+            if key != position_hash:
+                break
+            entry_number += 1
+            if legal_moves is None:
+                legal_moves = set(game.generate_moves())
+            if (move >> 6, move & 63) not in legal_moves:
+                continue
+            names = (SQUARE_NAMES[move >> 6].lower(), SQUARE_NAMES[move & 63].lower())
+            moves.append(BookMove(names, count, wins, losses, (wins + (count - wins - losses) / 2) / count))
+        moves.sort(key=lambda book_move: (-book_move.score, -book_move.games))
+        return moves
+
+    def book_move(self, game, rng=None, min_games=1):
+        """Returns a book move for a game as a pair of lowercase square names, or None if the position is not in the
+        book. Without a random.Random the best scoring move played in at least min_games games is chosen; with one,
+        moves are picked at random in proportion to how often they were played."""
+        moves = [book_move for book_move in self.get_moves(game) if book_move.games >= min_games]
+        if not moves:
+            return None
+        if rng is None:
+            return moves[0].move
+        return rng.choices(moves, weights=[book_move.games for book_move in moves])[0].move
+
+
+def book_move(game, path, rng=None, min_games=1):
+    """Returns a move for a game from the book file at path, opening it the first time, or None if the position is not
+    in the book"""
+    book = _books.get(path)
+    if book is None:
+        book = _books[path] = OpeningBook(path)
+    return book.book_move(game, rng, min_games)
+
+
+def close_books():
+    """Closes every book book_move has opened, so the next call opens its book again"""
+    for book in _books.values():
+        book.close()
+    _books.clear()
+
+
+def main(argv=None):
+    """Builds a book and looks up positions in it from the command line"""
+    parser = argparse.ArgumentParser(description='Opening book for ChessVar built from recorded games')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_command = commands.add_parser('build', help='build a book from a game archive or text file of games')
+    build_command.add_argument('games_path', help='a gamedb archive, or a text file of one game per line')
+    build_command.add_argument('book_path')
+    build_command.add_argument('--plies', type=int, default=DEFAULT_PLIES, help='moves of each game to include')
+    build_command.add_argument('--min-games', type=int, default=DEFAULT_MIN_GAMES,
+                               help='games a move needs to be kept')
+    probe_command = commands.add_parser('probe', help='list the book moves after a sequence of moves')
+    probe_command.add_argument('book_path')
+    probe_command.add_argument('moves', nargs='*', help="moves from the starting position such as 'e2e4'")
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'build':
+        with open(arguments.games_path, 'rb') as games_file:
+            is_archive = games_file.read(len(MOVES_MAGIC)) == MOVES_MAGIC
+        if is_archive:
+            games = archive_games(arguments.games_path)
+        else:
+            games = text_games(arguments.games_path)
+        written = write_book(build_book(games, arguments.plies, arguments.min_games), arguments.book_path)
+        print(f"wrote {written} book moves, {len(BOOK_MAGIC) + written * BOOK_ENTRY.size} bytes")
+        return 0
+
+    game = ChessVar('bitboard')
+    for move in arguments.moves:
+        if not game.make_move(move[:2], move[2:]):
+            parser.error(f"{move} is not a legal move")
+    with OpeningBook(arguments.book_path) as book:
+        moves = book.get_moves(game)
+        for move in moves:
+            print(f"{move.move[0]}{move.move[1]}\t{move.games} games\t{move.score:.1%} score")
+        if not moves:
+            print('position is not in the book')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
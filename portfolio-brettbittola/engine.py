@@ -0,0 +1,273 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: An alpha-beta search engine that picks moves for a ChessVar game.
+
+import time
+
+from ChessVar import SQUARE_NAMES
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+WIN_SCORE = 100000
+# scores within this distance of WIN_SCORE are wins found by the search, adjusted by how many moves away they are
+WIN_THRESHOLD = WIN_SCORE - 1000
+DEFAULT_DEPTH = 4
+MAX_DEPTH = 64
+
+# Losing the last piece of any type loses the game, so each type is weighted by how few of it a side has left: a side
+# with n pieces of a type is charged SCARCITY_WEIGHT / n for it. Classical piece values only break ties.
+SCARCITY_WEIGHT = 400
+# classical values of the pawn, knight, bishop, rook, queen and king, in PIECE_TYPES order
+PIECE_VALUES = (100, 300, 300, 500, 900, 300)
+PIECE_VALUE_FACTOR = 0.25
+# the classical value of the piece with each code, used to order captures most valuable victim, least valuable
+# attacker (MVV-LVA) among those victim_scarcity leaves tied
+VICTIM_ORDER = [0] + [PIECE_VALUES[(code - 1) % 6] for code in range(1, 13)]
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time limit runs out"""
+    pass
+
+
+def side_score(counts):
+    """Returns how safe a side's material is from its counts of each piece type, which drops sharply as any type
+    runs low"""
+    score = 0.0
+    for piece_type, count in enumerate(counts):
+        if count == 0:
+            return -WIN_SCORE
+        score += PIECE_VALUES[piece_type] * count * PIECE_VALUE_FACTOR - SCARCITY_WEIGHT / count
+    return score
+
+
+def evaluate(game):
+    """Scores a game from the point of view of the team whose turn it is, where a positive score favors that team"""
+    state = game.get_game_state()
+    if state != 'UNFINISHED':
+        if (state == 'WHITE_WON') == (game.get_team_turn() == 'white'):
+            return WIN_SCORE
+        return -WIN_SCORE
+    white_counts, black_counts = game.material()
+    white_score = side_score(white_counts)
+    black_score = side_score(black_counts)
+    if game.get_team_turn() == 'white':
+        return int(white_score - black_score)
+    return int(black_score - white_score)
+
+
+def victim_scarcity(game, code):
+    """Returns how many pieces of a captured piece's type its owner has, so captures that bring a team closest to
+    losing are ordered first"""
+    color, piece_type = divmod(code - 1, 6)
+    return game.material()[color][piece_type]
+
+
+class Engine:
+    """Chooses moves for a ChessVar game with iterative deepening alpha-beta search, a transposition table and
+    capture-first move ordering"""
+
+    def __init__(self, table_bytes=16 * 1024 * 1024, book=None):
+        """Initializes the engine with a transposition table of at most table_bytes bytes and, optionally, a
+        book.OpeningBook whose moves are played without searching"""
+        self._table = TranspositionTable(table_bytes)
+        self._book = book
+        self._nodes = 0
+        self._deadline = None
+        self._last_search = {}
+
+    def get_table(self):
+        """Returns the engine's transposition table"""
+        return self._table
+
+    def get_last_search(self):
+        """Returns a dictionary describing the most recent search: depth reached, score, nodes, seconds and move"""
+        return self._last_search
+
+    def best_move(self, game, depth=None, time_limit=None):
+        """Returns the best move found for the team whose turn it is as a pair of lowercase square names, or None if
+        the game has no legal moves. The search deepens one move at a time up to depth, or until time_limit seconds
+        have passed, and the game is left as it was. A move from the engine's opening book is returned at once."""
+        if self._book is not None:
+            move = self._book.book_move(game)
+            if move is not None:
+                self._last_search = {'depth': 0, 'score': evaluate(game), 'nodes': 0, 'seconds': 0.0, 'move': move,
+                                     'book': True}
+                return move
+        if depth is None and time_limit is None:
+            depth = DEFAULT_DEPTH
+        if depth is None:
+            depth = MAX_DEPTH
+        start = time.perf_counter()
+        if time_limit is None:
+            self._deadline = None
+        else:
+            self._deadline = start + time_limit
+        self._nodes = 0
+        self._table.new_search()
+
+        root_moves = self.order_moves(game, list(game.generate_moves()), None)
+        if not root_moves:
+            self._last_search = {'depth': 0, 'score': evaluate(game), 'nodes': 0, 'seconds': 0.0, 'move': None}
+            return None
+
+        best = root_moves[0]
+        best_score = evaluate(game)
+        reached = 0
+        for current_depth in range(1, depth + 1):
+            try:
+                score, move = self.search_root(game, root_moves, current_depth)
+            except SearchTimeout:
+                break
+            best, best_score, reached = move, score, current_depth
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            if abs(score) >= WIN_THRESHOLD:
+                break
+
+        move = (SQUARE_NAMES[best[0]].lower(), SQUARE_NAMES[best[1]].lower())
+        self._last_search = {'depth': reached, 'score': best_score, 'nodes': self._nodes,
+                             'seconds': time.perf_counter() - start, 'move': move}
+        return move
+
+    def search_root(self, game, root_moves, depth):
+        """Searches every root move to the given depth and returns (best score, best move)"""
+        alpha = -WIN_SCORE - 1
+        best_move = root_moves[0]
+        for move in root_moves:
+            game.make_move_idx(move[0], move[1])
+            try:
+                score = -self.negamax(game, depth - 1, -WIN_SCORE - 1, -alpha, 1)
+            finally:
+                game.unmake_move()
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self._table.store(game.get_hash(), depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def negamax(self, game, depth, alpha, beta, ply):
+        """Returns the score of a position for the team to move, searched to the given depth within an alpha-beta
+        window"""
+        self._nodes += 1
+        if self._deadline is not None and self._nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        if game.get_game_state() != 'UNFINISHED':
+            # the team that just moved captured the last piece of a type
+            return -WIN_SCORE + ply
+        if depth <= 0:
+            return self.quiesce(game, alpha, beta, ply)
+
+        key = game.get_hash()
+        entry = self._table.probe(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry
+            if entry_depth >= depth:
+                entry_score = score_from_table(entry_score, ply)
+                if bound == EXACT:
+                    return entry_score
+                if bound == LOWER_BOUND and entry_score >= beta:
+                    return entry_score
+                if bound == UPPER_BOUND and entry_score <= alpha:
+                    return entry_score
+
+        moves = self.order_moves(game, list(game.generate_moves()), table_move)
+        if not moves:
+            return evaluate(game)
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in moves:
+            game.make_move_idx(move[0], move[1])
+            try:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self._table.store(key, depth, score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def quiesce(self, game, alpha, beta, ply):
+        """Searches only captures until the position is quiet, so the search never stops halfway through an
+        exchange"""
+        self._nodes += 1
+        if self._deadline is not None and self._nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        if game.get_game_state() != 'UNFINISHED':
+            return -WIN_SCORE + ply
+        stand_pat = evaluate(game)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = [move for move in game.generate_moves() if game.get_piece_code_at(move[1])]
+        for move in self.order_moves(game, captures, None):
+            game.make_move_idx(move[0], move[1])
+            try:
+                score = -self.quiesce(game, -beta, -alpha, ply + 1)
+            finally:
+                game.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def order_moves(self, game, moves, table_move):
+        """Sorts moves so the transposition table's move comes first, then captures of the scarcest and most
+        valuable victims by the least valuable attackers, then quiet moves"""
+        def move_order(move):
+            """Returns the sort key of a move, lowest first"""
+            if move == table_move:
+                return -10 ** 9
+            victim = game.get_piece_code_at(move[1])
+            if not victim:
+                return 0
+            attacker = game.get_piece_code_at(move[0])
+            return (victim_scarcity(game, victim) * 10000 - VICTIM_ORDER[victim] * 10 + VICTIM_ORDER[attacker] // 100
+                    - 10 ** 6)
+
+        moves.sort(key=move_order)
+        return moves
+
+
+def score_to_table(score, ply):
+    """Converts a win score found ply moves from the root into one measured from the stored position"""
+    if score >= WIN_THRESHOLD:
+        return score + ply
+    if score <= -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """Converts a stored win score back into one measured from the root of the current search"""
+    if score >= WIN_THRESHOLD:
+        return score - ply
+    if score <= -WIN_THRESHOLD:
+        return score + ply
+    return score
+
+
+def best_move(game, depth=None, time_limit=None):
+    """Returns the best move for the team whose turn it is using a new Engine, searching to depth moves or for
+    time_limit seconds"""
+    return Engine().best_move(game, depth, time_limit)
@@ -0,0 +1,251 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: A compact append-only game archive with a memory-mapped reader.
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+from ChessVar import PIECE_TYPES, SQUARE_NAMES, ChessVar
+from replay import parse_moves, read_games
+
+# An archive is two append-only files. The moves file holds every game's moves as 12-bit (from index << 6 | to index)
+# values, two moves to three bytes, one game after another. The index file, named after it with '.idx' on the end,
+# holds one fixed-size entry per game: where its moves start in the moves file, how many moves it has, its outcome
+# and the type of the piece whose last capture ended it. Queries on outcome only read the index.
+MOVES_MAGIC = b'CVMOVES1'
+INDEX_MAGIC = b'CVINDEX1'
+INDEX_ENTRY = struct.Struct('<QHBB')
+
+OUTCOMES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+NOT_DECIDED = 255
+
+
+def index_path(path):
+    """Returns the path of the index file that goes with a moves file"""
+    return path + '.idx'
+
+
+def pack_moves(moves):
+    """Packs a list of (from index, to index) moves into bytes, two moves to every three bytes"""
+    values = [first_index << 6 | second_index for first_index, second_index in moves]
+    if len(values) % 2:
+        values.append(0)
+    data = bytearray()
+    for start in range(0, len(values), 2):
+        first_value, second_value = values[start], values[start + 1]
+        data += bytes((first_value >> 4, (first_value & 15) << 4 | second_value >> 8, second_value & 255))
+    return bytes(data)
+
+
+def unpack_moves(data, count):
+    """Yields count (from index, to index) moves from bytes, a memoryview or an mmap slice written by pack_moves"""
+    for move_number in range(count):
+        start = move_number // 2 * 3
+        if move_number % 2 == 0:
+            value = data[start] << 4 | data[start + 1] >> 4
+        else:
+            value = (data[start + 1] & 15) << 8 | data[start + 2]
+        yield value >> 6, value & 63
+
+
+class GameWriter:
+    """Appends games to an archive, creating its files if needed"""
+
+    def __init__(self, path, backend='bitboard'):
+        """Opens the archive's moves and index files for appending. Each added game is replayed on one reused game to
+        check it and find its outcome."""
+        self._moves_file = open(path, 'ab')
+        self._index_file = open(index_path(path), 'ab')
+        if self._moves_file.tell() == 0:
+            self._moves_file.write(MOVES_MAGIC)
+        if self._index_file.tell() == 0:
+            self._index_file.write(INDEX_MAGIC)
+        self._game = ChessVar(backend)
+
+    def __enter__(self):
+        """Returns the writer for use in a with statement"""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the writer at the end of a with statement"""
+        self.close()
+
+    def add_game(self, moves):
+        """Appends a game given as a list of (from index, to index) moves and returns its outcome. Raises ValueError,
+        without writing anything, if a move is illegal."""
+        if len(moves) > 0xFFFF:
+            raise ValueError(f"A game can have at most {0xFFFF} moves, got {len(moves)}")
+        game = self._game
+        game.reset()
+        for move_number, move in enumerate(moves):
+            if move is None or not game.make_move_idx(move[0], move[1]):
+                raise ValueError(f"Move {move_number} of the game is not legal")
+        state = game.get_game_state()
+        decided_by = NOT_DECIDED
+        if state == 'WHITE_WON':
+            decided_by = PIECE_TYPES.index(game.scarcest_type('black')[0])
+        elif state == 'BLACK_WON':
+            decided_by = PIECE_TYPES.index(game.scarcest_type('white')[0])
+
+        offset = self._moves_file.tell()
+        self._moves_file.write(pack_moves(moves))
+        self._index_file.write(INDEX_ENTRY.pack(offset, len(moves), OUTCOMES.index(state), decided_by))
+        return state
+
+    def close(self):
+        """Flushes and closes the archive's files"""
+        self._moves_file.close()
+        self._index_file.close()
+
+
+class GameDatabase:
+    """Reads an archive through memory maps, so games are read straight from the page cache without loading or
+    parsing the whole file. Games written after the database is opened are not seen."""
+
+    def __init__(self, path):
+        """Maps the archive's moves and index files into memory and checks their headers"""
+        self._moves_file = open(path, 'rb')
+        self._index_file = open(index_path(path), 'rb')
+        self._moves = mmap.mmap(self._moves_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._moves[:len(MOVES_MAGIC)] != MOVES_MAGIC or self._index[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a game archive")
+        self._count = (len(self._index) - len(INDEX_MAGIC)) // INDEX_ENTRY.size
+        self._moves_view = memoryview(self._moves)
+        self._index_view = memoryview(self._index)[len(INDEX_MAGIC):len(INDEX_MAGIC) + self._count * INDEX_ENTRY.size]
+
+    def __enter__(self):
+        """Returns the database for use in a with statement"""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the database at the end of a with statement"""
+        self.close()
+
+    def __len__(self):
+        """Returns the number of games in the archive"""
+        return self._count
+
+    def close(self):
+        """Releases the memory maps and closes the files"""
+        if getattr(self, '_moves_view', None) is not None:
+            self._moves_view.release()
+            self._index_view.release()
+            self._moves_view = None
+            self._index_view = None
+        self._moves.close()
+        self._index.close()
+        self._moves_file.close()
+        self._index_file.close()
+
+    def get_entry(self, game_number):
+        """Returns (moves offset, move count, outcome, piece type that decided it or None) for one game"""
+        if not 0 <= game_number < self._count:
+            raise IndexError(f"Game {game_number} is not in the archive of {self._count} games")
+        offset, count, outcome, decided_by = INDEX_ENTRY.unpack_from(self._index_view,
+                                                                     game_number * INDEX_ENTRY.size)
+        if decided_by == NOT_DECIDED:
+            return offset, count, OUTCOMES[outcome], None
+        return offset, count, OUTCOMES[outcome], PIECE_TYPES[decided_by]
+
+    def get_outcome(self, game_number):
+        """Returns the final game state of one game"""
+        return self.get_entry(game_number)[2]
+
+    def get_length(self, game_number):
+        """Returns the number of moves in one game"""
+        return self.get_entry(game_number)[1]
+
+    def get_moves(self, game_number):
+        """Returns the list of (from index, to index) moves of one game, read straight from the memory map. They are
+        unpacked before returning so no view of the map outlives the call and blocks close."""
+        offset, count, outcome, decided_by = self.get_entry(game_number)
+        with self._moves_view[offset:offset + (count + 1) // 2 * 3] as data:
+            return list(unpack_moves(data, count))
+
+    def get_move_names(self, game_number):
+        """Returns the moves of one game as four-character strings such as 'e2e4'"""
+        return [(SQUARE_NAMES[first_index] + SQUARE_NAMES[second_index]).lower()
+                for first_index, second_index in self.get_moves(game_number)]
+
+    def query(self, outcome=None, decided_by=None, min_length=None, max_length=None):
+        """Yields the numbers of the games matching every given condition, reading only the index: outcome is a game
+        state such as 'WHITE_WON', and decided_by the type of the piece whose last capture ended the game, so
+        decided_by='knight' finds every game won by capturing both of a side's knights"""
+        if outcome is not None:
+            outcome = OUTCOMES.index(outcome)
+        if decided_by is not None:
+            decided_by = PIECE_TYPES.index(decided_by)
+        for game_number in range(self._count):
+            offset, count, game_outcome, game_decided_by = INDEX_ENTRY.unpack_from(self._index_view,
+                                                                                   game_number * INDEX_ENTRY.size)
+            if outcome is not None and game_outcome != outcome:
+                continue
+            if decided_by is not None and game_decided_by != decided_by:
+                continue
+            if min_length is not None and count < min_length:
+                continue
+            if max_length is not None and count > max_length:
+                continue
+            yield game_number
+
+
+def import_text(text_path, archive_path, backend='bitboard'):
+    """Appends every game in a text file of one game per line, written as moves like 'e2e4 e7e5', to an archive.
+    Returns (games added, games skipped because a move was illegal)."""
+    added = 0
+    skipped = 0
+    with open(text_path) as lines, GameWriter(archive_path, backend) as writer:
+        for line_number, line in read_games(lines):
+            try:
+                writer.add_game(parse_moves(line))
+            except ValueError:
+                skipped += 1
+            else:
+                added += 1
+    return added, skipped
+
+
+def main(argv=None):
+    """Imports, queries and prints games in an archive from the command line"""
+    parser = argparse.ArgumentParser(description='Compact binary archive of ChessVar games')
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_command = commands.add_parser('import', help='append the games in a text file to an archive')
+    import_command.add_argument('text_path')
+    import_command.add_argument('archive_path')
+    query_command = commands.add_parser('query', help='list the games matching conditions')
+    query_command.add_argument('archive_path')
+    query_command.add_argument('--outcome', choices=OUTCOMES)
+    query_command.add_argument('--decided-by', choices=PIECE_TYPES)
+    query_command.add_argument('--min-length', type=int)
+    query_command.add_argument('--max-length', type=int)
+    query_command.add_argument('--moves', action='store_true', help='print the moves of each game')
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'import':
+        added, skipped = import_text(arguments.text_path, arguments.archive_path)
+        print(f"added {added} games, skipped {skipped} with an illegal move, "
+              f"archive is {os.path.getsize(arguments.archive_path)} bytes")
+        return 0
+
+    with GameDatabase(arguments.archive_path) as database:
+        matches = 0
+        for game_number in database.query(arguments.outcome, arguments.decided_by, arguments.min_length,
+                                          arguments.max_length):
+            matches += 1
+            offset, count, outcome, decided_by = database.get_entry(game_number)
+            line = f"{game_number}\t{count}\t{outcome}\t{decided_by or '-'}"
+            if arguments.moves:
+                line += '\t' + ' '.join(database.get_move_names(game_number))
+            print(line)
+        print(f"{matches} of {len(database)} games match", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: A Monte Carlo tree search player that picks moves for a ChessVar game from random playouts.
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from ChessVar import (ALL_SQUARES, BISHOP, BISHOP_RAYS, BLACK, COLOR_NUMBERS, KING, KING_ATTACKS, KNIGHT,
+                      KNIGHT_ATTACKS, PAWN, QUEEN_RAYS, ROOK, ROOK_RAYS, SQUARE_NAMES, WHITE, ChessVar,
+                      slider_attacks)
+
+DEFAULT_PLAYOUTS = 1000
+# the UCT exploration constant, sqrt(2) for rewards between 0 and 1
+DEFAULT_EXPLORATION = math.sqrt(2)
+# plies a playout may run before it is scored as a draw
+DEFAULT_PLAYOUT_PLIES = 300
+DRAW_REWARD = 0.5
+
+# masks for moving every pawn of a team at once by shifting its bitboard: a shift that changes the column must not
+# land on the far edge column, where a pawn on the near edge would wrap around to
+NOT_A_COLUMN = ALL_SQUARES ^ sum(1 << row * 8 for row in range(8))
+NOT_H_COLUMN = ALL_SQUARES ^ sum(1 << row * 8 + 7 for row in range(8))
+
+
+def random_playout(codes, unmoved_pawns, color, material, rng, max_plies=DEFAULT_PLAYOUT_PLIES):
+    """Plays uniformly random legal moves from a position, given as a list of 64 piece codes, a bitboard of unmoved
+    pawns, the color number to move and both teams' piece counts, until a team loses its last piece of a type. Returns
+    the winning color number, or None if the side to move has no moves or max_plies pass first. The arguments are
+    copied, and moves are made on plain integers and lists rather than through ChessVar.make_move."""
+    codes = list(codes)
+    counts = [list(material[WHITE]), list(material[BLACK])]
+    occupied = [0, 0]
+    for index, code in enumerate(codes):
+        if code:
+            occupied[(code - 1) // 6] |= 1 << index
+    first_moves = unmoved_pawns
+    for ply in range(max_plies):
+        own = occupied[color]
+        enemy = occupied[1 - color]
+        empty = ALL_SQUARES ^ (own | enemy)
+        # each group of moves is (target bitboard, from index, shift): pieces give one group each with their square,
+        # and the pawns give four groups, one per direction, whose from index is the target square minus the shift
+        groups = []
+        total = 0
+        mask = own
+        pawns = 0
+        while mask:
+            low_bit = mask & -mask
+            index = low_bit.bit_length() - 1
+            mask ^= low_bit
+            piece_type = (codes[index] - 1) % 6
+            if piece_type == PAWN:
+                pawns |= low_bit
+                continue
+            if piece_type == KNIGHT:
+                targets = KNIGHT_ATTACKS[index] & ~own
+            elif piece_type == KING:
+                targets = KING_ATTACKS[index] & ~own
+            elif piece_type == ROOK:
+                targets = slider_attacks(index, own | enemy, ROOK_RAYS) & ~own
+            elif piece_type == BISHOP:
+                targets = slider_attacks(index, own | enemy, BISHOP_RAYS) & ~own
+            else:
+                targets = slider_attacks(index, own | enemy, QUEEN_RAYS) & ~own
+            if targets:
+                groups.append((targets, index, 0))
+                total += targets.bit_count()
+        if pawns:
+            if color == WHITE:
+                pushes = pawns << 8 & empty
+                pawn_groups = ((pushes, 8), ((pushes & first_moves << 8) << 8 & empty, 16),
+                               (pawns << 7 & enemy & NOT_H_COLUMN, 7), (pawns << 9 & enemy & NOT_A_COLUMN, 9))
+            else:
+                pushes = pawns >> 8 & empty
+                pawn_groups = ((pushes, -8), ((pushes & first_moves >> 8) >> 8 & empty, -16),
+                               (pawns >> 9 & enemy & NOT_H_COLUMN, -9), (pawns >> 7 & enemy & NOT_A_COLUMN, -7))
+            for targets, shift in pawn_groups:
+                if targets:
+                    groups.append((targets, None, shift))
+                    total += targets.bit_count()
+        if not total:
+            return None
+
+        choice = rng.randrange(total)
+        for targets, first_index, shift in groups:
+            target_count = targets.bit_count()
+            if choice < target_count:
+                break
+            choice -= target_count
+        for skipped in range(choice):
+            targets &= targets - 1
+        second_bit = targets & -targets
+        second_index = second_bit.bit_length() - 1
+        if first_index is None:
+            first_index = second_index - shift
+
+        captured_code = codes[second_index]
+        if captured_code:
+            occupied[1 - color] ^= second_bit
+            captured_counts = counts[1 - color]
+            captured_counts[(captured_code - 1) % 6] -= 1
+            if captured_counts[(captured_code - 1) % 6] == 0:
+                return color
+        codes[second_index] = codes[first_index]
+        codes[first_index] = 0
+        occupied[color] ^= 1 << first_index | second_bit
+        first_moves &= ~(1 << first_index | second_bit)
+        color = 1 - color
+    return None
+
+
+class SearchNode:
+    """A position in the search tree, reached by one move from its parent, with the playout results of every
+    simulation that passed through it counted for the team that made that move"""
+
+    __slots__ = ('_move', '_parent', '_children', '_untried', '_visits', '_reward', '_team', '_hash')
+
+    def __init__(self, move, parent, game):
+        """Initializes a node for the position a game is in after move, a (from index, to index) pair or None for
+        the root, with the game's legal moves still to be tried"""
+        self._move = move
+        self._parent = parent
+        self._children = []
+        self._untried = list(game.generate_moves())
+        self._visits = 0
+        self._reward = 0.0
+        # the color number of the team that made the move into this node
+        self._team = 1 - COLOR_NUMBERS[game.get_team_turn()]
+        self._hash = game.get_hash()
+
+    def get_move(self):
+        """Returns the (from index, to index) move that leads to this node"""
+        return self._move
+
+    def get_parent(self):
+        """Returns the parent node, or None for the root"""
+        return self._parent
+
+    def detach(self):
+        """Makes this node the root of its own tree, letting the rest of the old tree be freed"""
+        self._parent = None
+        self._move = None
+
+    def get_children(self):
+        """Returns the list of expanded child nodes"""
+        return self._children
+
+    def get_visits(self):
+        """Returns how many simulations passed through this node"""
+        return self._visits
+
+    def get_reward(self):
+        """Returns the total reward of the simulations through this node for the team that moved into it"""
+        return self._reward
+
+    def get_hash(self):
+        """Returns the Zobrist hash of the node's position"""
+        return self._hash
+
+    def has_untried_moves(self):
+        """Returns True if some legal move from this node has no child yet"""
+        return bool(self._untried)
+
+    def expand(self, game, rng):
+        """Makes a random untried move on a game standing at this node and returns the new child for it"""
+        untried = self._untried
+        position = rng.randrange(len(untried))
+        untried[position], untried[-1] = untried[-1], untried[position]
+        move = untried.pop()
+        game.make_move_idx(move[0], move[1])
+        child = SearchNode(move, self, game)
+        self._children.append(child)
+        return child
+
+    def select_child(self, exploration):
+        """Returns the child with the highest UCT score: its mean reward plus an exploration bonus that shrinks as it
+        is visited more often than its siblings"""
+        log_visits = math.log(self._visits)
+        best_child = None
+        best_score = -1.0
+        for child in self._children:
+            score = child._reward / child._visits + exploration * math.sqrt(log_visits / child._visits)
+            if score > best_score:
+                best_child = child
+                best_score = score
+        return best_child
+
+    def update(self, winner):
+        """Counts one simulation that ended with winner, a color number or None for a draw"""
+        self._visits += 1
+        if winner is None:
+            self._reward += DRAW_REWARD
+        elif winner == self._team:
+            self._reward += 1.0
+
+    def find_position(self, position_hash, depth):
+        """Returns the node within depth moves below this one whose position has the given hash, or None"""
+        if self._hash == position_hash:
+            return self
+        if depth > 0:
+            for child in self._children:
+                node = child.find_position(position_hash, depth - 1)
+                if node is not None:
+                    return node
+        return None
+
+
+class MonteCarloPlayer:
+    """Chooses moves for a ChessVar game with Monte Carlo tree search: UCT selection down the tree, one new node per
+    simulation, a fast random playout from it and the result counted back up to the root. The tree below the chosen
+    move is kept, so when the opponent's reply was explored its statistics carry over to the next search."""
+
+    def __init__(self, playouts=DEFAULT_PLAYOUTS, exploration=DEFAULT_EXPLORATION, max_plies=DEFAULT_PLAYOUT_PLIES,
+                 rng=None):
+        """Initializes the player with its default playout budget, UCT exploration constant, playout length limit
+        and random.Random"""
+        self._playouts = playouts
+        self._exploration = exploration
+        self._max_plies = max_plies
+        if rng is None:
+            rng = random.Random()
+        self._rng = rng
+        self._root = None
+        # the game searches are run on, so the caller's game is never changed
+        self._search_game = ChessVar('bitboard')
+        self._last_search = {}
+
+    def get_root(self):
+        """Returns the root of the tree kept from the last search, or None"""
+        return self._root
+
+    def get_last_search(self):
+        """Returns a dictionary describing the most recent search: playouts run, visits reused from the previous
+        search, seconds, the move chosen, its visits and its mean reward"""
+        return self._last_search
+
+    def reset(self):
+        """Drops the search tree, as when starting a new game"""
+        self._root = None
+
+    def best_move(self, game, playouts=None, time_limit=None):
+        """Returns the move with the most visits after searching a game's position, as a pair of lowercase square
+        names, or None if the game has no legal moves. The search runs playouts simulations, the player's default if
+        neither playouts nor time_limit is given, or stops once time_limit seconds have passed."""
+        if playouts is None and time_limit is None:
+            playouts = self._playouts
+        start = time.perf_counter()
+        if time_limit is None:
+            deadline = None
+        else:
+            deadline = start + time_limit
+
+        search_game = self._search_game
+        search_game.restore(game.snapshot())
+        # the position after our last move is the old root's child, and the opponent's reply one more level down
+        root = None
+        if self._root is not None:
+            root = self._root.find_position(search_game.get_hash(), 2)
+        if root is None or root.get_visits() == 0:
+            root = SearchNode(None, None, search_game)
+        root.detach()
+        reused = root.get_visits()
+
+        run = 0
+        while (playouts is None or run < playouts) and (deadline is None or time.perf_counter() < deadline):
+            self.simulate(root, search_game)
+            run += 1
+
+        children = root.get_children()
+        if not children:
+            self._root = None
+            self._last_search = {'playouts': run, 'reused': reused, 'seconds': time.perf_counter() - start,
+                                 'move': None}
+            return None
+        best = max(children, key=SearchNode.get_visits)
+        self._root = best
+        first_index, second_index = best.get_move()
+        move = (SQUARE_NAMES[first_index].lower(), SQUARE_NAMES[second_index].lower())
+        self._last_search = {'playouts': run, 'reused': reused, 'seconds': time.perf_counter() - start,
+                             'move': move, 'visits': best.get_visits(),
+                             'reward': best.get_reward() / max(best.get_visits(), 1)}
+        return move
+
+    def simulate(self, root, game):
+        """Runs one simulation from the root on a game standing at the root's position, leaving the game there"""
+        node = root
+        depth = 0
+        while not node.has_untried_moves() and node.get_children():
+            node = node.select_child(self._exploration)
+            game.make_move_idx(*node.get_move())
+            depth += 1
+        if node.has_untried_moves():
+            node = node.expand(game, self._rng)
+            depth += 1
+
+        state = game.get_game_state()
+        if state == 'WHITE_WON':
+            winner = WHITE
+        elif state == 'BLACK_WON':
+            winner = BLACK
+        else:
+            winner = random_playout(game.get_piece_codes(), game.get_unmoved_pawns(),
+                                    COLOR_NUMBERS[game.get_team_turn()], game.material(), self._rng, self._max_plies)
+
+        while node is not None:
+            node.update(winner)
+            node = node.get_parent()
+        for undone in range(depth):
+            game.unmake_move()
+
+
+def main(argv=None):
+    """Searches a position from the command line and prints the chosen move, or times random playouts"""
+    parser = argparse.ArgumentParser(description='Monte Carlo tree search for ChessVar')
+    parser.add_argument('moves', nargs='*', help="moves from the starting position such as 'e2e4'")
+    parser.add_argument('--playouts', type=int, default=DEFAULT_PLAYOUTS)
+    parser.add_argument('--time', type=float, help='seconds to search instead of a fixed number of playouts')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--benchmark', action='store_true', help='time random playouts from the position instead')
+    arguments = parser.parse_args(argv)
+
+    game = ChessVar('bitboard')
+    for move in arguments.moves:
+        if not game.make_move(move[:2], move[2:]):
+            parser.error(f"{move} is not a legal move")
+    rng = random.Random(arguments.seed)
+
+    if arguments.benchmark:
+        codes = game.get_piece_codes()
+        start = time.perf_counter()
+        results = [random_playout(codes, game.get_unmoved_pawns(), COLOR_NUMBERS[game.get_team_turn()],
+                                  game.material(), rng)
+                   for playout in range(arguments.playouts)]
+        seconds = time.perf_counter() - start
+        print(f"{arguments.playouts} playouts in {seconds:.2f}s, {arguments.playouts / seconds:,.0f} playouts/s: "
+              f"white {results.count(WHITE)}, black {results.count(BLACK)}, drawn {results.count(None)}")
+        return 0
+
+    if arguments.time is None:
+        playouts = arguments.playouts
+    else:
+        playouts = None
+    player = MonteCarloPlayer(rng=rng)
+    move = player.best_move(game, playouts, arguments.time)
+    search = player.get_last_search()
+    if move is None:
+        print('no legal moves')
+    else:
+        print(f"{move[0]}{move[1]}\t{search['visits']} visits\t{search['reward']:.1%} reward\t"
+              f"{search['playouts']} playouts in {search['seconds']:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
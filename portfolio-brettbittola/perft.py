@@ -0,0 +1,94 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Perft node counts and move generation benchmarks for ChessVar.
+
+import argparse
+import sys
+import time
+
+from ChessVar import ChessVar
+
+# Each test position is the list of moves that reaches it from the starting position, with its known perft counts by
+# depth. The counts follow this variant's rules: no castling, en passant or promotion, no check, and no moves once a
+# side has lost every piece of one type.
+POSITIONS = {
+    'start': ('', {1: 20, 2: 400, 3: 8902, 4: 197742}),
+    'open-center': ('e2e4 d7d5 e4d5 d8d5 b1c3', {1: 47, 2: 1489, 3: 62849, 4: 2018961}),
+    'bishop-trade': ('e2e3 e7e6 f1b5 f8b4 b5d7 c8d7', {1: 25, 2: 924, 3: 24819, 4: 923891}),
+    'queen-hunt': ('e2e4 e7e5 d1h5 b8c6 f1c4 g8f6', {1: 43, 2: 1218, 3: 48265, 4: 1452160}),
+    'advanced-pawns': ('a2a4 h7h5 a4a5 h5h4 a5a6 h4h3 b2b4 g7g5 b4b5 g5g4', {1: 22, 2: 488, 3: 12080, 4: 300811}),
+}
+
+
+def load_position(name, backend='board'):
+    """Returns a new game that has played the moves leading to one of the stored test positions"""
+    moves, counts = POSITIONS[name]
+    game = ChessVar(backend)
+    for move in moves.split():
+        if not game.make_move(move[:2], move[2:4]):
+            raise ValueError(f"Stored position {name!r} has an illegal move {move!r}")
+    return game
+
+
+def run_perft(game, depth, divide=False):
+    """Runs perft on a game and returns (node count, seconds taken, divide counts or None)"""
+    start = time.perf_counter()
+    if divide:
+        counts = game.divide(depth)
+        nodes = sum(counts.values())
+    else:
+        counts = None
+        nodes = game.perft(depth)
+    return nodes, time.perf_counter() - start, counts
+
+
+def run_suite(backend='board', max_depth=3, names=None, divide=False, output=sys.stdout):
+    """Runs perft on each stored position up to max_depth, printing counts and nodes per second, and returns the list
+    of (position, depth, expected, actual) results whose count did not match"""
+    failures = []
+    total_nodes = 0
+    total_seconds = 0.0
+    for name in names or POSITIONS:
+        expected_counts = POSITIONS[name][1]
+        for depth in range(1, max_depth + 1):
+            game = load_position(name, backend)
+            nodes, seconds, counts = run_perft(game, depth, divide)
+            total_nodes += nodes
+            total_seconds += seconds
+            expected = expected_counts.get(depth)
+            if expected is None:
+                status = 'no stored count'
+            elif expected == nodes:
+                status = 'ok'
+            else:
+                status = f'MISMATCH, expected {expected}'
+                failures.append((name, depth, expected, nodes))
+            print(f"{name:16} depth {depth}  {nodes:>10} nodes  {seconds:8.3f}s  "
+                  f"{nodes / max(seconds, 1e-9):>12,.0f} nodes/s  {status}", file=output)
+            if counts is not None:
+                for (first_square, second_square), count in sorted(counts.items()):
+                    print(f"    {first_square}{second_square}: {count}", file=output)
+    print(f"total {total_nodes} nodes in {total_seconds:.3f}s, "
+          f"{total_nodes / max(total_seconds, 1e-9):,.0f} nodes/s ({backend} backend)", file=output)
+    return failures
+
+
+def main(argv=None):
+    """Runs the perft suite from the command line, exiting with status 1 if any count does not match"""
+    parser = argparse.ArgumentParser(description='Perft correctness and throughput suite for ChessVar')
+    parser.add_argument('--backend', choices=('board', 'bitboard'), default='board')
+    parser.add_argument('--depth', type=int, default=3, help='deepest perft depth to run for each position')
+    parser.add_argument('--position', action='append', choices=sorted(POSITIONS),
+                        help='stored position to run, may be repeated (default: all)')
+    parser.add_argument('--divide', action='store_true', help='break each count down by root move')
+    arguments = parser.parse_args(argv)
+
+    failures = run_suite(arguments.backend, arguments.depth, arguments.position, arguments.divide)
+    if failures:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Counts and times the stages of ChessVar.make_move for games that have profiling turned on.
+
+import bisect
+
+# the stages of a move, in the order make_move runs them. The bitboard backend checks ownership, the path and the
+# piece's moves in one table test, which it records as valid_move.
+STAGES = ('square_lookup', 'ownership', 'path_check', 'valid_move', 'capture_piece', 'board_update', 'turn_switch')
+# upper bounds, in seconds, of the timing histogram buckets; the last bucket has no upper bound
+BUCKET_BOUNDS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 1e-4)
+
+
+def format_bound(bound):
+    """Returns a bucket bound written the way Prometheus labels expect"""
+    if bound is None:
+        return '+Inf'
+    return repr(bound)
+
+
+class MoveProfiler:
+    """Keeps a count and a timing histogram for each (stage, piece type) and counts moves made and rejected for each
+    piece type. One profiler can be shared by many games."""
+
+    def __init__(self):
+        """Initializes a profiler with nothing recorded"""
+        # (stage, piece type) -> [bucket counts..., total seconds]
+        self._timings = {}
+        # (piece type, 'made', 'game_over' or the stage that rejected the move) -> count
+        self._moves = {}
+
+    def record(self, stage, piece_type, seconds):
+        """Adds the time one stage took while moving a piece of a type"""
+        timing = self._timings.get((stage, piece_type))
+        if timing is None:
+            timing = self._timings[stage, piece_type] = [0] * (len(BUCKET_BOUNDS) + 1) + [0.0]
+        timing[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        timing[-1] += seconds
+
+    def count_move(self, piece_type, result):
+        """Counts one move of a piece type, or 'none' for a move from an empty square, where result is 'made',
+        'game_over' or the name of the stage that rejected it"""
+        key = (piece_type, result)
+        self._moves[key] = self._moves.get(key, 0) + 1
+
+    def reset(self):
+        """Forgets everything recorded so far"""
+        self._timings.clear()
+        self._moves.clear()
+
+    def to_dict(self):
+        """Returns what has been recorded as a dictionary: 'stages' maps each stage to each piece type's count, total
+        and mean seconds and bucket counts by upper bound (None for the last bucket), and 'moves' maps each piece type
+        to its counts of moves made and rejected by each stage"""
+        stages = {}
+        for (stage, piece_type), timing in sorted(self._timings.items(), key=lambda item: STAGES.index(item[0][0])):
+            count = sum(timing[:-1])
+            stages.setdefault(stage, {})[piece_type] = {
+                'count': count, 'seconds': timing[-1], 'mean_seconds': timing[-1] / count,
+                'buckets': dict(zip(BUCKET_BOUNDS + (None,), timing[:-1]))}
+        moves = {}
+        for (piece_type, result), count in sorted(self._moves.items()):
+            moves.setdefault(piece_type, {})[result] = count
+        return {'stages': stages, 'moves': moves}
+
+    def to_prometheus(self, prefix='chessvar'):
+        """Returns what has been recorded in the Prometheus text exposition format, as a stage timing histogram and a
+        counter of moves by piece type and result"""
+        lines = [f"# HELP {prefix}_move_stage_seconds Time spent in each stage of make_move.",
+                 f"# TYPE {prefix}_move_stage_seconds histogram"]
+        for (stage, piece_type), timing in sorted(self._timings.items()):
+            labels = f'stage="{stage}",piece="{piece_type}"'
+            total = 0
+            for bound, count in zip(BUCKET_BOUNDS + (None,), timing[:-1]):
+                total += count
+                lines.append(f'{prefix}_move_stage_seconds_bucket{{{labels},le="{format_bound(bound)}"}} {total}')
+            lines.append(f"{prefix}_move_stage_seconds_sum{{{labels}}} {timing[-1]!r}")
+            lines.append(f"{prefix}_move_stage_seconds_count{{{labels}}} {total}")
+        lines.append(f"# HELP {prefix}_moves_total Moves tried, by piece type and 'made' or the stage that rejected "
+                     f"them.")
+        lines.append(f"# TYPE {prefix}_moves_total counter")
+        for (piece_type, result), count in sorted(self._moves.items()):
+            lines.append(f'{prefix}_moves_total{{piece="{piece_type}",result="{result}"}} {count}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,169 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Streams recorded games through ChessVar to validate them and find their results.
+
+import argparse
+import collections
+import multiprocessing
+import sys
+import time
+
+from ChessVar import SQUARE_INDEX, ChessVar
+from workers import init_worker_game, worker_game
+
+# One replayed game: the line it came from, how many moves it lists, the index of the first move make_move rejected
+# (or None if every move was legal), and the game state after the last legal move.
+GameResult = collections.namedtuple('GameResult', ('line_number', 'move_count', 'first_illegal', 'state'))
+
+
+def parse_moves(line):
+    """Returns a list of (from index, to index) pairs for a line of moves written as four-character square pairs such
+    as 'e2e4 e7e5', with None in place of any move that does not name two squares"""
+    moves = []
+    for token in line.split():
+        first_index = SQUARE_INDEX.get(token[:2].upper())
+        second_index = SQUARE_INDEX.get(token[2:].upper())
+        if len(token) != 4 or first_index is None or second_index is None:
+            moves.append(None)
+        else:
+            moves.append((first_index, second_index))
+    return moves
+
+
+def replay_game(game, line, line_number=0):
+    """Resets a game, plays a line of moves through it and returns the GameResult"""
+    game.reset()
+    move_count = len(line.split())
+    made = game.apply_moves(line)
+    if made < move_count:
+        return GameResult(line_number, move_count, made, game.get_game_state())
+    return GameResult(line_number, move_count, None, game.get_game_state())
+
+
+def read_games(lines):
+    """Yields (line number, line) for each game in an iterable of lines, skipping blank lines and # comments"""
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line_number, line
+
+
+def replay_games(lines, backend='bitboard', game=None):
+    """Yields a GameResult for each game in an iterable of lines, one game per line, reusing a single game object"""
+    if game is None:
+        game = ChessVar(backend)
+    for line_number, line in read_games(lines):
+        yield replay_game(game, line, line_number)
+
+
+def replay_batch(batch):
+    """Replays a list of (line number, line) games in a worker process and returns their GameResults"""
+    game = worker_game()
+    return [replay_game(game, line, line_number) for line_number, line in batch]
+
+
+def batches(games, batch_size):
+    """Yields lists of up to batch_size items from an iterable"""
+    batch = []
+    for game in games:
+        batch.append(game)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def replay_parallel(lines, workers, backend='bitboard', batch_size=500):
+    """Yields a GameResult for each game in an iterable of lines, in order, replayed across a pool of worker
+    processes. At most two batches per worker are read ahead, so memory stays bounded however long the input is."""
+    with multiprocessing.Pool(workers, init_worker_game, (backend,)) as pool:
+        pending = collections.deque()
+        for batch in batches(read_games(lines), batch_size):
+            pending.append(pool.apply_async(replay_batch, (batch,)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+class ReplaySummary:
+    """Adds up the results of replayed games"""
+
+    def __init__(self):
+        """Initializes empty totals and starts the clock"""
+        self._games = 0
+        self._moves = 0
+        self._illegal_games = 0
+        self._states = collections.Counter()
+        self._start = time.perf_counter()
+
+    def add(self, result):
+        """Adds one GameResult to the totals"""
+        self._games += 1
+        if result.first_illegal is None:
+            self._moves += result.move_count
+        else:
+            self._moves += result.first_illegal
+            self._illegal_games += 1
+        self._states[result.state] += 1
+
+    def get_totals(self):
+        """Returns a dictionary of games, legal moves played, games with an illegal move, final game states, seconds,
+        and games and moves per second"""
+        seconds = time.perf_counter() - self._start
+        return {'games': self._games, 'moves': self._moves, 'illegal_games': self._illegal_games,
+                'states': dict(self._states), 'seconds': seconds,
+                'games_per_second': self._games / max(seconds, 1e-9),
+                'moves_per_second': self._moves / max(seconds, 1e-9)}
+
+
+def replay_file(path, workers=1, backend='bitboard', on_result=None):
+    """Replays every game in a file and returns the ReplaySummary totals, calling on_result with each GameResult as
+    it is found"""
+    summary = ReplaySummary()
+    with open(path) as lines:
+        if workers > 1:
+            results = replay_parallel(lines, workers, backend)
+        else:
+            results = replay_games(lines, backend)
+        for result in results:
+            summary.add(result)
+            if on_result is not None:
+                on_result(result)
+    return summary.get_totals()
+
+
+def main(argv=None):
+    """Replays a file of games from the command line and prints a summary, and each game's result if asked"""
+    parser = argparse.ArgumentParser(description='Validate and score recorded ChessVar games, one game per line')
+    parser.add_argument('path', help="file of games, each a line of moves such as 'e2e4 e7e5 g1f3'")
+    parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+    parser.add_argument('--backend', choices=('board', 'bitboard'), default='bitboard')
+    parser.add_argument('--details', action='store_true', help='print the result of every game')
+    arguments = parser.parse_args(argv)
+
+    def print_result(result):
+        """Prints one game's line number, move count, first illegal move and final state"""
+        if result.first_illegal is None:
+            first_illegal = '-'
+        else:
+            first_illegal = result.first_illegal
+        print(f"{result.line_number}\t{result.move_count}\t{first_illegal}\t{result.state}")
+
+    if arguments.details:
+        print('line\tmoves\tfirst_illegal\tstate')
+        totals = replay_file(arguments.path, arguments.workers, arguments.backend, print_result)
+    else:
+        totals = replay_file(arguments.path, arguments.workers, arguments.backend)
+    print(f"{totals['games']} games, {totals['moves']} moves, {totals['illegal_games']} with an illegal move, "
+          f"in {totals['seconds']:.2f}s ({totals['games_per_second']:,.0f} games/s, "
+          f"{totals['moves_per_second']:,.0f} moves/s)", file=sys.stderr)
+    for state, count in sorted(totals['states'].items()):
+        print(f"{state}: {count}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
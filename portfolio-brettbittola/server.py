@@ -0,0 +1,398 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Hosts many ChessVar games over a line-based TCP protocol, with a load-generating client.
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import random
+import sys
+import time
+
+from ChessVar import SQUARE_INDEX, ChessVar
+from workers import init_worker_game, worker_game
+
+# Each request is one line of words and gets one line back, starting with OK, ILLEGAL or ERR:
+#   NEW                  -> OK <session>
+#   MOVE <session> e2e4  -> OK <state> <team to move>, or ILLEGAL <state> <team to move> (also 'MOVE <session> e2 e4')
+#   STATE <session>      -> OK <state> <team to move> <position text from to_fen>
+#   MOVES <session>      -> OK <every legal move, such as e2e4 e2e3 ...>
+#   PLAY <session> e2e4 e7e5 ...
+#                        -> OK <moves made> <state> <team to move>, or ILLEGAL <moves made> <state> <team to move>
+#                           when a move is rejected, leaving the moves before it made
+#   CLOSE <session>      -> OK
+#   STATS                -> OK <name>=<value> ...
+#   QUIT                 -> OK, then the server closes the connection
+DEFAULT_PORT = 7162
+DEFAULT_SESSION_TTL = 300.0
+DEFAULT_MAX_SESSIONS = 10000
+# moves are validated in the worker pool while at least this many connections are open
+DEFAULT_OFFLOAD_CONNECTIONS = 64
+# long enough for PLAY to resend a whole game when a client reconnects
+MAX_LINE_BYTES = 4096
+
+
+def validate_move(data, first_index, second_index):
+    """Restores a snapshot in a worker process and tries a move on it, returning (whether the move was legal, the
+    snapshot after it)"""
+    game = worker_game()
+    game.restore(data)
+    legal = game.make_move_idx(first_index, second_index)
+    return legal, game.snapshot()
+
+
+def parse_move(words):
+    """Returns the (from index, to index) move named by either one word such as 'e2e4' or two words 'e2' 'e4', or
+    raises ValueError"""
+    text = ''.join(words)
+    first_index = SQUARE_INDEX.get(text[:2].upper())
+    second_index = SQUARE_INDEX.get(text[2:].upper())
+    if len(text) != 4 or first_index is None or second_index is None:
+        raise ValueError(f"Expected a move such as e2e4, got {' '.join(words)!r}")
+    return first_index, second_index
+
+
+def percentile(values, fraction):
+    """Returns the value below which the given fraction of a sorted list falls, or 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Session:
+    """One hosted game, with a lock so moves from different connections are made one at a time"""
+
+    def __init__(self, session_id, backend):
+        """Initializes a session with a new game at the starting position"""
+        self._session_id = session_id
+        self._game = ChessVar(backend)
+        self._lock = asyncio.Lock()
+        self._last_used = time.monotonic()
+
+    def get_session_id(self):
+        """Returns the session's id"""
+        return self._session_id
+
+    def get_game(self):
+        """Returns the session's game"""
+        return self._game
+
+    def get_lock(self):
+        """Returns the lock held while a move is being made"""
+        return self._lock
+
+    def get_last_used(self):
+        """Returns the monotonic time the session was last used"""
+        return self._last_used
+
+    def touch(self):
+        """Marks the session as used now, so it does not expire"""
+        self._last_used = time.monotonic()
+
+    def get_status(self):
+        """Returns the game state and the team to move, separated by a space"""
+        return f"{self._game.get_game_state()} {self._game.get_team_turn()}"
+
+
+class GameServer:
+    """Hosts ChessVar sessions for many connections on one asyncio event loop. Each connection's requests are
+    answered in order, and the next line is not read until the answer has been written out, so a client that stops
+    reading stops being served instead of growing the server's buffers. Idle sessions expire, and under load moves are
+    checked in a pool of worker processes so the event loop keeps answering other connections."""
+
+    def __init__(self, backend='bitboard', session_ttl=DEFAULT_SESSION_TTL, max_sessions=DEFAULT_MAX_SESSIONS,
+                 workers=0, offload_connections=DEFAULT_OFFLOAD_CONNECTIONS):
+        """Initializes a server with no sessions. Moves go to a pool of worker processes only while at least
+        offload_connections connections are open, and never when workers is 0."""
+        self._backend = backend
+        self._session_ttl = session_ttl
+        self._max_sessions = max_sessions
+        self._workers = workers
+        self._offload_connections = offload_connections
+        self._sessions = {}
+        self._session_ids = itertools.count(1)
+        self._connections = 0
+        self._pool = None
+        self._pool_slots = None
+        self._server = None
+        self._expiry_task = None
+        self._stats = {'sessions_created': 0, 'sessions_expired': 0, 'moves': 0, 'illegal_moves': 0,
+                       'offloaded_moves': 0, 'requests': 0, 'errors': 0}
+
+    def get_stats(self):
+        """Returns a dictionary of the server's counters, with the open sessions and connections"""
+        stats = dict(self._stats)
+        stats['sessions'] = len(self._sessions)
+        stats['connections'] = self._connections
+        return stats
+
+    def get_port(self):
+        """Returns the port the server is listening on, which is useful after starting on port 0"""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """Starts listening for connections and expiring idle sessions"""
+        if self._workers > 0:
+            self._pool = concurrent.futures.ProcessPoolExecutor(self._workers, initializer=init_worker_game,
+                                                                initargs=(self._backend,))
+            # at most this many moves wait on the pool, after which connections wait their turn
+            self._pool_slots = asyncio.Semaphore(self._workers * 4)
+        self._server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+        self._expiry_task = asyncio.create_task(self.expire_sessions())
+
+    async def serve_forever(self):
+        """Serves connections until the server is closed"""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stops listening, cancels session expiry and shuts down the worker pool"""
+        self._server.close()
+        await self._server.wait_closed()
+        self._expiry_task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    async def expire_sessions(self):
+        """Removes sessions that have not been used for the session time to live, checking four times per period"""
+        while True:
+            await asyncio.sleep(self._session_ttl / 4)
+            cutoff = time.monotonic() - self._session_ttl
+            for session_id in [session_id for session_id, session in self._sessions.items()
+                               if session.get_last_used() < cutoff and not session.get_lock().locked()]:
+                del self._sessions[session_id]
+                self._stats['sessions_expired'] += 1
+
+    async def handle_connection(self, reader, writer):
+        """Answers one connection's requests in order until it quits or disconnects"""
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(f"ERR Request lines are limited to {MAX_LINE_BYTES} bytes\n".encode())
+                    break
+                if not line:
+                    break
+                words = line.decode(errors='replace').split()
+                if words and words[0].upper() == 'QUIT':
+                    writer.write(b'OK\n')
+                    break
+                response = await self.handle_request(words)
+                writer.write(response.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_request(self, words):
+        """Returns the response line, without its newline, to a request split into words"""
+        self._stats['requests'] += 1
+        try:
+            if not words:
+                raise ValueError('Empty request')
+            command = words[0].upper()
+            if command == 'NEW':
+                return self.new_session()
+            if command == 'STATS':
+                return 'OK ' + ' '.join(f"{name}={value}" for name, value in sorted(self.get_stats().items()))
+            if len(words) < 2:
+                raise ValueError(f"{command} needs a session id")
+            session = self.get_session(words[1])
+            if command == 'MOVE':
+                return await self.move(session, parse_move(words[2:]))
+            if command == 'STATE':
+                return f"OK {session.get_status()} {session.get_game().to_fen()}"
+            if command == 'MOVES':
+                return 'OK ' + ' '.join(first + second for first, second in session.get_game().legal_moves())
+            if command == 'PLAY':
+                return await self.play(session, ' '.join(words[2:]))
+            if command == 'CLOSE':
+                del self._sessions[session.get_session_id()]
+                return 'OK'
+            raise ValueError(f"Unknown command {command}")
+        except ValueError as error:
+            self._stats['errors'] += 1
+            return f"ERR {error}"
+
+    def new_session(self):
+        """Creates a session and returns the response naming it"""
+        if len(self._sessions) >= self._max_sessions:
+            raise ValueError('Too many sessions')
+        session_id = str(next(self._session_ids))
+        self._sessions[session_id] = Session(session_id, self._backend)
+        self._stats['sessions_created'] += 1
+        return f"OK {session_id}"
+
+    def get_session(self, session_id):
+        """Returns the session with an id and marks it used, or raises ValueError if there is none"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise ValueError(f"No session {session_id}")
+        session.touch()
+        return session
+
+    async def move(self, session, move):
+        """Makes a move in a session's game and returns the response. While the server is busy the move is checked
+        in the worker pool, which sends back the position after it."""
+        first_index, second_index = move
+        async with session.get_lock():
+            game = session.get_game()
+            if self._pool is not None and self._connections >= self._offload_connections:
+                async with self._pool_slots:
+                    legal, data = await asyncio.get_running_loop().run_in_executor(
+                        self._pool, validate_move, game.snapshot(), first_index, second_index)
+                self._stats['offloaded_moves'] += 1
+                if legal:
+                    game.restore(data)
+            else:
+                legal = game.make_move_idx(first_index, second_index)
+        if legal:
+            self._stats['moves'] += 1
+            return f"OK {session.get_status()}"
+        self._stats['illegal_moves'] += 1
+        return f"ILLEGAL {session.get_status()}"
+
+    async def play(self, session, moves):
+        """Makes a string of moves in a session's game in one call and returns the response, which counts the moves
+        made before any rejected one"""
+        async with session.get_lock():
+            made = session.get_game().apply_moves(moves)
+        self._stats['moves'] += made
+        if made < len(moves.split()):
+            self._stats['illegal_moves'] += 1
+            return f"ILLEGAL {made} {session.get_status()}"
+        return f"OK {made} {session.get_status()}"
+
+
+async def request(reader, writer, line):
+    """Sends one request line and returns the words of the response, raising ValueError on an ERR response"""
+    writer.write(line.encode() + b'\n')
+    response = (await reader.readline()).decode().split()
+    if not response or response[0] == 'ERR':
+        raise ValueError(f"{line!r} failed: {' '.join(response) or 'connection closed'}")
+    return response
+
+
+async def load_client(host, port, moves, seed, latencies):
+    """Plays random games over one connection until it has made the given number of moves, starting a new game when
+    one ends, and appends the seconds each move took to latencies"""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port, limit=64 * 1024)
+    try:
+        session_id = (await request(reader, writer, 'NEW'))[1]
+        made = 0
+        while made < moves:
+            legal_moves = (await request(reader, writer, f"MOVES {session_id}"))[1:]
+            if not legal_moves:
+                await request(reader, writer, f"CLOSE {session_id}")
+                session_id = (await request(reader, writer, 'NEW'))[1]
+                continue
+            start = time.perf_counter()
+            response = await request(reader, writer, f"MOVE {session_id} {rng.choice(legal_moves)}")
+            latencies.append(time.perf_counter() - start)
+            made += 1
+            if response[1] != 'UNFINISHED':
+                await request(reader, writer, f"CLOSE {session_id}")
+                session_id = (await request(reader, writer, 'NEW'))[1]
+        await request(reader, writer, f"CLOSE {session_id}")
+        await request(reader, writer, 'QUIT')
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host, port, clients=50, moves=200, seed=0):
+    """Runs clients connections at once, each making the given number of random moves, and returns a dictionary of
+    the moves made, seconds taken, moves per second and move latency percentiles in milliseconds"""
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(load_client(host, port, moves, seed * 1000003 + client, latencies)
+                           for client in range(clients)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {'clients': clients, 'moves': len(latencies), 'seconds': seconds,
+            'moves_per_second': len(latencies) / max(seconds, 1e-9),
+            'p50_ms': percentile(latencies, 0.50) * 1000, 'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': percentile(latencies, 1.0) * 1000}
+
+
+async def run_local_load(clients=50, moves=200, seed=0, **server_options):
+    """Starts a server on a free local port, runs the load against it and returns the load results, with the
+    server's counters under 'server'"""
+    server = GameServer(**server_options)
+    await server.start('127.0.0.1', 0)
+    try:
+        results = await run_load('127.0.0.1', server.get_port(), clients, moves, seed)
+    finally:
+        await server.close()
+    results['server'] = server.get_stats()
+    return results
+
+
+async def serve(host, port, **server_options):
+    """Runs a server until it is interrupted"""
+    server = GameServer(**server_options)
+    await server.start(host, port)
+    print(f"serving ChessVar sessions on {host}:{server.get_port()}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """Runs a server, or a load test against a running server or a local one, from the command line"""
+    parser = argparse.ArgumentParser(description='Line-based TCP server hosting ChessVar games')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('serve', 'host games until interrupted'),
+                            ('load', 'measure move throughput and latency, against a local server by default')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int)
+        command.add_argument('--backend', choices=('board', 'bitboard'), default='bitboard')
+        command.add_argument('--workers', type=int, default=0, help='worker processes for checking moves under load')
+        command.add_argument('--offload-connections', type=int, default=DEFAULT_OFFLOAD_CONNECTIONS,
+                             help='open connections at which moves go to the workers')
+    commands.choices['serve'].add_argument('--ttl', type=float, default=DEFAULT_SESSION_TTL,
+                                           help='seconds before an idle session expires')
+    commands.choices['serve'].add_argument('--max-sessions', type=int, default=DEFAULT_MAX_SESSIONS)
+    commands.choices['load'].add_argument('--clients', type=int, default=50, help='connections at once')
+    commands.choices['load'].add_argument('--moves', type=int, default=200, help='moves made by each client')
+    commands.choices['load'].add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args(argv)
+    server_options = {'backend': arguments.backend, 'workers': arguments.workers,
+                      'offload_connections': arguments.offload_connections}
+
+    if arguments.command == 'serve':
+        try:
+            asyncio.run(serve(arguments.host, arguments.port or DEFAULT_PORT, session_ttl=arguments.ttl,
+                              max_sessions=arguments.max_sessions, **server_options))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if arguments.port is None:
+        results = asyncio.run(run_local_load(arguments.clients, arguments.moves, arguments.seed, **server_options))
+    else:
+        results = asyncio.run(run_load(arguments.host, arguments.port, arguments.clients, arguments.moves,
+                                       arguments.seed))
+    print(f"{results['moves']} moves from {results['clients']} clients in {results['seconds']:.2f}s "
+          f"({results['moves_per_second']:,.0f} moves/s)")
+    print(f"move latency: p50 {results['p50_ms']:.2f}ms, p99 {results['p99_ms']:.2f}ms, max {results['max_ms']:.2f}ms")
+    if 'server' in results:
+        print(' '.join(f"{name}={value}" for name, value in sorted(results['server'].items())))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,441 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Builds and probes endgame tables for small sets of pieces by retrograde analysis.
+
+import argparse
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+
+from ChessVar import FEN_CODES, FEN_LETTERS, PAWN, SQUARE_INDEX
+from batch import (BETWEEN_BITS, PAWN_CAPTURE_BITS, PAWN_DOUBLE_PUSH_BITS, PAWN_DOUBLE_PUSHES, PAWN_PUSH_BITS,
+                   PAWN_PUSHES, RAY_BITS, RAY_INCREASING, RAY_TYPES, SHAPES, SLIDES, SQUARE_BITS, STEP_BITS,
+                   bit_index, highest_bit, lowest_bit)
+
+# A table covers every placement of one material set, such as 'KN-KB' for a white king and knight against a black
+# king and bishop, with either team to move. Since a real game ends as soon as a team has no pieces of some type, a
+# game never reaches these positions; the tables solve the ending under the same rule, where a team loses when its last
+# piece of any type in the set is captured. Moves are the ones the Piece classes allow, with no promotion, and a team
+# with no legal move draws.
+#
+# A position's index is its side to move (0 for white, 1 for black) followed by six bits for each piece's square, in
+# the order the set lists them, white pieces first. Each position has one byte: the number of moves, counting both
+# teams', until the game ends with best play, so an odd count is a win for the team to move and an even one a loss. 0
+# is a draw and 255 marks indices that are not positions, such as two pieces on one square.
+TABLE_MAGIC = b'CVTABLE1'
+DRAW = 0
+NOT_A_POSITION = 255
+MAX_DISTANCE = 254
+TABLE_SUFFIX = '.cvtb'
+# the piece type letters in PIECE_TYPES order
+TYPE_LETTERS = FEN_LETTERS[1:7]
+# moves are counted for this many positions at a time, and frontiers are expanded this many positions at a time, so
+# the working arrays stay small
+COUNT_CHUNK_SIZE = 1 << 20
+CHUNK_SIZE = 1 << 16
+ORIGINS = np.arange(64, dtype=np.uint64)
+# a pawn is on its starting row exactly when it has not moved, since pawns never move backwards
+PAWN_START_ROWS = (1, 6)
+START_ROW_ORIGINS = np.array([np.arange(64) // 8 == row for row in PAWN_START_ROWS])
+
+
+def parse_material(name):
+    """Returns the list of (color number, piece type number) pieces named by a material set such as 'KN-KB' or
+    'KRR-KQ', white's pieces before the dash, with each team's pieces sorted by type"""
+    sides = name.upper().split('-')
+    if len(sides) != 2 or not all(sides) or any(letter not in TYPE_LETTERS for letter in ''.join(sides)):
+        raise ValueError(f"Expected a material set such as 'KN-KB', got {name!r}")
+    return [(color, piece_type) for color, side in enumerate(sides)
+            for piece_type in sorted(TYPE_LETTERS.index(letter) for letter in side)]
+
+
+def material_name(pieces):
+    """Returns the name of a material set from its list of (color number, piece type number) pieces, kings first"""
+    sides = ['', '']
+    for color, piece_type in pieces:
+        sides[color] += TYPE_LETTERS[piece_type]
+    return '-'.join(''.join(sorted(side, key=lambda letter: -TYPE_LETTERS.index(letter))) for side in sides)
+
+
+def position_material(codes):
+    """Returns the name of the material set of a list of 64 piece codes"""
+    return material_name([divmod(code - 1, 6) for code in codes if code])
+
+
+def piece_targets(color, piece_type, squares, own, enemy):
+    """Returns the bitboard of squares each piece of one color and type on an array of squares can move to, given
+    arrays of its own team's and the other team's occupancy bitboards"""
+    occupied = own | enemy
+    if piece_type == PAWN:
+        pushes = PAWN_PUSH_BITS[color, squares] & ~occupied
+        double_pushes = np.where((pushes != 0) & (squares // 8 == PAWN_START_ROWS[color]),
+                                 PAWN_DOUBLE_PUSH_BITS[color, squares] & ~occupied, np.uint64(0))
+        return pushes | double_pushes | (PAWN_CAPTURE_BITS[color, squares] & enemy)
+    targets = STEP_BITS[piece_type, squares]
+    for direction in np.flatnonzero(RAY_TYPES[piece_type]):
+        rays = RAY_BITS[direction, squares]
+        blockers = rays & occupied
+        if RAY_INCREASING[direction]:
+            blocker = bit_index(lowest_bit(blockers))
+        else:
+            blocker = bit_index(highest_bit(blockers))
+        targets = targets | np.where(blockers != 0, rays ^ RAY_BITS[direction, blocker], rays)
+    return targets & ~own
+
+
+def piece_origins(color, piece_type, squares, occupied):
+    """Returns a (positions, 64) array that is True where a piece of one color and type now on each of an array of
+    squares could have come from without capturing, given an array of occupancy bitboards"""
+    empty = (occupied[:, None] >> ORIGINS) & np.uint64(1) == 0
+    clear = (BETWEEN_BITS.T[squares] & occupied[:, None]) == 0
+    if piece_type == PAWN:
+        double_pushes = PAWN_DOUBLE_PUSHES[color].T[squares] & START_ROW_ORIGINS[color] & clear
+        origins = PAWN_PUSHES[color].T[squares] | double_pushes
+    elif SLIDES[piece_type]:
+        origins = SHAPES[piece_type].T[squares] & clear
+    else:
+        origins = SHAPES[piece_type].T[squares]
+    return origins & empty
+
+
+class Tablebase:
+    """The values of every position of one material set, held in memory or memory-mapped from a table file, probed
+    with one index calculation and one byte read"""
+
+    def __init__(self, name, values, source=None):
+        """Initializes a table for a material set from its bytes of position values, which can be a NumPy array, bytes
+        or a memory map, and the open file and map they were read from, if any"""
+        self._name = material_name(parse_material(name))
+        self._pieces = parse_material(name)
+        self._values = values
+        self._source = source
+        if len(values) != 2 * 64 ** len(self._pieces):
+            raise ValueError(f"A {self._name} table has {2 * 64 ** len(self._pieces)} positions, got {len(values)}")
+
+    def __enter__(self):
+        """Returns the table for use in a with statement"""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the table at the end of a with statement"""
+        self.close()
+
+    @classmethod
+    def load(cls, path):
+        """Returns the table saved in a file, memory-mapped so only the pages that are probed are read"""
+        table_file = open(path, 'rb')
+        data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(TABLE_MAGIC)] != TABLE_MAGIC:
+            data.close()
+            table_file.close()
+            raise ValueError(f"{path} is not an endgame table")
+        name_end = len(TABLE_MAGIC) + 1 + data[len(TABLE_MAGIC)]
+        name = data[len(TABLE_MAGIC) + 1:name_end].decode()
+        return cls(name, memoryview(data)[name_end:], (table_file, data))
+
+    def save(self, path):
+        """Writes the table to a file: the magic bytes, the material set's name after a length byte, then one value
+        byte per position in index order"""
+        with open(path, 'wb') as table_file:
+            table_file.write(TABLE_MAGIC + bytes((len(self._name),)) + self._name.encode())
+            table_file.write(bytes(self._values))
+
+    def close(self):
+        """Releases the memory map of a loaded table"""
+        if self._source is not None:
+            self._values.release()
+            self._source[1].close()
+            self._source[0].close()
+            self._source = None
+
+    def get_name(self):
+        """Returns the name of the table's material set, such as 'KN-KB'"""
+        return self._name
+
+    def get_pieces(self):
+        """Returns the table's list of (color number, piece type number) pieces in index order"""
+        return self._pieces
+
+    def get_values(self):
+        """Returns the table's position values"""
+        return self._values
+
+    def position_index(self, codes, team_turn):
+        """Returns the index of a position given as a list of 64 piece codes and the team to move, or raises ValueError
+        if its pieces are not the table's material set"""
+        squares_by_code = {}
+        for index, code in enumerate(codes):
+            if code:
+                squares_by_code.setdefault(code, []).append(index)
+        position = 0
+        for color, piece_type in self._pieces:
+            squares = squares_by_code.get(color * 6 + piece_type + 1)
+            if not squares:
+                raise ValueError(f"Position is {position_material(codes)}, not {self._name}")
+            position = position << 6 | squares.pop(0)
+        if any(squares_by_code.values()):
+            raise ValueError(f"Position is {position_material(codes)}, not {self._name}")
+        if team_turn == 'black':
+            position |= 1 << 6 * len(self._pieces)
+        return position
+
+    def probe(self, codes, team_turn):
+        """Returns the value of a position given as a list of 64 piece codes and the team to move: the number of moves
+        left with best play, odd for a win and even for a loss by the team to move, or 0 for a draw"""
+        return self._values[self.position_index(codes, team_turn)]
+
+    def result(self, codes, team_turn):
+        """Returns ('WIN', 'LOSS' or 'DRAW' for the team to move, moves left with best play) for a position"""
+        value = self.probe(codes, team_turn)
+        if value == DRAW:
+            return 'DRAW', 0
+        if value % 2:
+            return 'WIN', value
+        return 'LOSS', value
+
+    def get_stats(self):
+        """Returns a dictionary of the number of positions, wins, losses and draws for the team to move, and the
+        longest win"""
+        values = np.frombuffer(self._values, dtype=np.uint8)
+        positions = values != NOT_A_POSITION
+        wins = positions & (values % 2 == 1)
+        return {'positions': int(positions.sum()), 'wins': int(wins.sum()),
+                'losses': int((positions & (values != DRAW) & (values % 2 == 0)).sum()),
+                'draws': int((values == DRAW).sum()), 'longest': int(values[wins].max(initial=0))}
+
+
+class TablebaseGenerator:
+    """Solves material sets by retrograde analysis: the moves out of every position are counted once, then results
+    spread backwards from decided positions one move at a time, so each position's value is the shortest win or
+    longest loss. Captures that leave a smaller set are looked up in that set's table, which is solved first."""
+
+    def __init__(self, directory=None):
+        """Initializes a generator that reads and saves tables in a directory, or keeps them only in memory"""
+        self._directory = directory
+        self._tables = {}
+
+    def get_table(self, name):
+        """Returns the table for a material set, loading it from the directory or solving and saving it if needed"""
+        name = material_name(parse_material(name))
+        if name in self._tables:
+            return self._tables[name]
+        path = None
+        if self._directory is not None:
+            path = os.path.join(self._directory, name + TABLE_SUFFIX)
+            if os.path.exists(path):
+                self._tables[name] = Tablebase.load(path)
+                return self._tables[name]
+        table = Tablebase(name, self.solve(parse_material(name)))
+        if path is not None:
+            os.makedirs(self._directory, exist_ok=True)
+            table.save(path)
+        self._tables[name] = table
+        return table
+
+    def solve(self, pieces):
+        """Returns the array of position values for a list of (color number, piece type number) pieces"""
+        count = len(pieces)
+        size = 64 ** count
+        values = np.zeros(2 * size, dtype=np.uint8)
+        # how many of each position's moves are not yet known to lose, how many moves its longest losing move takes,
+        # and the fewest moves of any win found for it
+        open_moves = np.zeros(2 * size, dtype=np.uint8)
+        loss_distance = np.zeros(2 * size, dtype=np.uint8)
+        win_distance = np.zeros(2 * size, dtype=np.uint8)
+        for side in (0, 1):
+            for start in range(side * size, side * size + size, COUNT_CHUNK_SIZE):
+                stop = min(start + COUNT_CHUNK_SIZE, side * size + size)
+                self.count_moves(pieces, side, np.arange(start, stop, dtype=np.int64), values, open_moves,
+                                 loss_distance, win_distance)
+
+        # positions are decided in order of distance, so a win is always found by its shortest route first
+        pending = {}
+        positions = np.flatnonzero(win_distance)
+        for distance in np.unique(win_distance[positions]):
+            pending.setdefault(int(distance), []).append(positions[win_distance[positions] == distance])
+        positions = np.flatnonzero((values != NOT_A_POSITION) & (open_moves == 0) & (win_distance == 0)
+                                   & (loss_distance > 0))
+        for distance in np.unique(loss_distance[positions]):
+            pending.setdefault(int(distance), []).append(positions[loss_distance[positions] == distance])
+
+        distance = 0
+        while pending:
+            distance += 1
+            if distance > MAX_DISTANCE:
+                raise ValueError(f"{material_name(pieces)} has wins longer than {MAX_DISTANCE} moves")
+            candidates = pending.pop(distance, [])
+            if not candidates:
+                continue
+            positions = np.unique(np.concatenate(candidates))
+            positions = positions[values[positions] == DRAW]
+            if distance % 2:
+                positions = positions[win_distance[positions] == distance]
+            else:
+                positions = positions[(open_moves[positions] == 0) & (loss_distance[positions] == distance)
+                                      & (win_distance[positions] == 0)]
+            values[positions] = distance
+            for side in (0, 1):
+                side_positions = positions[positions >> 6 * len(pieces) == side]
+                for start in range(0, len(side_positions), CHUNK_SIZE):
+                    self.spread(pieces, side, side_positions[start:start + CHUNK_SIZE], distance, values, open_moves,
+                                loss_distance, win_distance, pending)
+        return values
+
+    def spread(self, pieces, side, positions, distance, values, open_moves, loss_distance, win_distance, pending):
+        """Passes the results of positions just decided at a distance back to the positions that move into them: a
+        position that can move into a loss wins one move later, and one whose every move leads to a win for the other
+        team loses one move after the longest of them"""
+        predecessors = self.unmake_moves(pieces, side, positions)
+        predecessors = predecessors[values[predecessors] == DRAW]
+        if distance % 2 == 0:
+            better = (win_distance[predecessors] == 0) | (win_distance[predecessors] > distance + 1)
+            win_distance[predecessors[better]] = distance + 1
+            pending.setdefault(distance + 1, []).append(predecessors[better])
+            return
+        predecessors, moves = np.unique(predecessors, return_counts=True)
+        open_moves[predecessors] -= moves.astype(np.uint8)
+        loss_distance[predecessors] = np.maximum(loss_distance[predecessors], distance + 1)
+        lost = predecessors[open_moves[predecessors] == 0]
+        for lost_distance in np.unique(loss_distance[lost]):
+            pending.setdefault(int(lost_distance), []).append(lost[loss_distance[lost] == lost_distance])
+
+    def count_moves(self, pieces, side, positions, values, open_moves, loss_distance, win_distance):
+        """Counts the moves out of a range of positions with one side to move, marking indices that are not positions,
+        and scores captures at once: taking a team's last piece of a type wins in one move, and other captures take
+        the value of the smaller set's position"""
+        count = len(pieces)
+        squares = [(positions >> 6 * (count - 1 - piece)) & 63 for piece in range(count)]
+        valid = np.ones(len(positions), dtype=bool)
+        occupied = [np.zeros(len(positions), dtype=np.uint64), np.zeros(len(positions), dtype=np.uint64)]
+        for piece, (color, piece_type) in enumerate(pieces):
+            for other in range(piece):
+                valid &= squares[piece] != squares[other]
+            if piece_type == PAWN:
+                valid &= (squares[piece] >= 8) if color == 0 else (squares[piece] < 56)
+            occupied[color] |= SQUARE_BITS[squares[piece]]
+        values[positions[~valid]] = NOT_A_POSITION
+
+        moves = np.zeros(len(positions), dtype=np.int64)
+        losses = np.zeros(len(positions), dtype=np.int64)
+        wins = np.zeros(len(positions), dtype=np.int64)
+        for piece, (color, piece_type) in enumerate(pieces):
+            if color != side:
+                continue
+            targets = piece_targets(color, piece_type, squares[piece], occupied[side], occupied[1 - side])
+            moves += np.bitwise_count(targets & ~occupied[1 - side])
+            for captured, captured_piece in enumerate(pieces):
+                if captured_piece[0] == side:
+                    continue
+                hits = np.flatnonzero((targets & SQUARE_BITS[squares[captured]]) != 0)
+                if pieces.count(captured_piece) == 1:
+                    wins[hits] = 1
+                    continue
+                child_values = self.capture_values(pieces, side, squares, piece, captured, hits)
+                # a child position is scored for the other team, so its losses are this team's wins
+                moves[hits] += child_values == DRAW
+                winning = (child_values != DRAW) & (child_values % 2 == 0)
+                child_wins = hits[winning]
+                wins[child_wins] = np.where(wins[child_wins] == 0, child_values[winning] + 1,
+                                            np.minimum(wins[child_wins], child_values[winning] + 1))
+                losing = child_values % 2 == 1
+                losses[hits[losing]] = np.maximum(losses[hits[losing]], child_values[losing] + 1)
+
+        if (moves > 255).any():
+            raise ValueError(f"{material_name(pieces)} has positions with more than 255 moves")
+        open_moves[positions] = np.where(valid, moves, 0)
+        loss_distance[positions] = np.where(valid, losses, 0)
+        win_distance[positions] = np.where(valid, wins, 0)
+
+    def capture_values(self, pieces, side, squares, piece, captured, hits):
+        """Returns the values, in the smaller set's table, of the positions after one piece captures another in the
+        positions at the hit indices"""
+        smaller = pieces[:captured] + pieces[captured + 1:]
+        table = self.get_table(material_name(smaller))
+        child = np.full(len(hits), (1 - side) << 6 * len(smaller), dtype=np.int64)
+        shift = 6 * len(smaller)
+        for other in range(len(pieces)):
+            if other == captured:
+                continue
+            shift -= 6
+            if other == piece:
+                child |= squares[captured][hits] << shift
+            else:
+                child |= squares[other][hits] << shift
+        return np.frombuffer(table.get_values(), dtype=np.uint8)[child].astype(np.int64)
+
+    def unmake_moves(self, pieces, side, positions):
+        """Returns the indices of every position that reaches one of an array of positions with the given side to
+        move by a move that captures nothing"""
+        count = len(pieces)
+        squares = [(positions >> 6 * (count - 1 - piece)) & 63 for piece in range(count)]
+        occupied = np.zeros(len(positions), dtype=np.uint64)
+        for piece in range(count):
+            occupied |= SQUARE_BITS[squares[piece]]
+
+        predecessors = []
+        for piece, (color, piece_type) in enumerate(pieces):
+            if color == side:
+                continue
+            origins = piece_origins(color, piece_type, squares[piece], occupied)
+            rows, origin_squares = np.nonzero(origins)
+            shift = 6 * (count - 1 - piece)
+            predecessors.append((positions[rows] ^ (1 << 6 * count)) - (squares[piece][rows] << shift)
+                                + (origin_squares.astype(np.int64) << shift))
+        return np.concatenate(predecessors)
+
+
+def parse_pieces(text):
+    """Returns the list of 64 piece codes for pieces written as a FEN letter and a square, such as 'Kd1 Nc3 ke8 bf5',
+    with white's letters in uppercase"""
+    codes = [0] * 64
+    for word in text.split():
+        code = FEN_CODES.get(word[:1])
+        index = SQUARE_INDEX.get(word[1:].upper())
+        if code is None or index is None:
+            raise ValueError(f"Expected a piece such as Kd1 or nc6, got {word!r}")
+        codes[index] = code
+    return codes
+
+
+def main(argv=None):
+    """Generates tables and probes positions from the command line"""
+    parser = argparse.ArgumentParser(description='Endgame tables for ChessVar material sets')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate_command = commands.add_parser('generate', help='solve material sets and save their tables')
+    generate_command.add_argument('materials', nargs='+', help="material sets such as 'KN-KB'")
+    generate_command.add_argument('--directory', default='tables')
+    probe_command = commands.add_parser('probe', help='look up a position')
+    probe_command.add_argument('pieces', help="pieces such as 'Kd1 Nc3 ke8 bf5', uppercase for white")
+    probe_command.add_argument('--turn', choices=('white', 'black'), default='white')
+    probe_command.add_argument('--directory', default='tables')
+    arguments = parser.parse_args(argv)
+
+    generator = TablebaseGenerator(arguments.directory)
+    if arguments.command == 'generate':
+        for name in arguments.materials:
+            start = time.perf_counter()
+            stats = generator.get_table(name).get_stats()
+            print(f"{material_name(parse_material(name))}: {stats['positions']:,} positions, {stats['wins']:,} won, "
+                  f"{stats['losses']:,} lost, {stats['draws']:,} drawn, longest win {stats['longest']} moves, "
+                  f"{time.perf_counter() - start:.1f}s")
+        return 0
+
+    codes = parse_pieces(arguments.pieces)
+    path = os.path.join(arguments.directory, position_material(codes) + TABLE_SUFFIX)
+    with Tablebase.load(path) as table:
+        result, moves = table.result(codes, arguments.turn)
+    if result == 'DRAW':
+        print(f"DRAW for {arguments.turn}")
+    elif moves == 1:
+        print(f"{result} for {arguments.turn} in 1 move")
+    else:
+        print(f"{result} for {arguments.turn} in {moves} moves")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Tests the integer move encoding and ChessVar.apply_moves.
+
+import unittest
+
+from ChessVar import ChessVar, decode_move, encode_move, square_index
+
+
+class ApplyMovesTest(unittest.TestCase):
+    """Tests apply_moves with move strings and encoded moves on both backends"""
+
+    def test_encoding_round_trips(self):
+        """Every square pair encodes to a distinct 12-bit move that decodes back to it"""
+        moves = set()
+        for first_index in range(64):
+            for second_index in range(64):
+                move = encode_move(first_index, second_index)
+                self.assertTrue(0 <= move < 4096)
+                self.assertEqual(decode_move(move), (first_index, second_index))
+                moves.add(move)
+        self.assertEqual(len(moves), 4096)
+
+    def test_all_moves_made(self):
+        """A legal line returns its length, whether given as text or as encoded moves"""
+        line = 'e2e4 d7d5 e4d5 g8f6'
+        encoded = [encode_move(square_index(word[:2]), square_index(word[2:])) for word in line.split()]
+        for backend in ('board', 'bitboard'):
+            text_game = ChessVar(backend)
+            encoded_game = ChessVar(backend)
+            self.assertEqual(text_game.apply_moves(line), 4)
+            self.assertEqual(encoded_game.apply_moves(encoded), 4)
+            self.assertEqual(text_game.snapshot(), encoded_game.snapshot())
+            self.assertEqual(text_game.get_undo_depth(), 4)
+
+    def test_returns_first_rejected_index(self):
+        """The first illegal, malformed or out of range move stops the line, and its index is returned with the moves
+        before it made"""
+        for backend in ('board', 'bitboard'):
+            for line, rejected in (('e2e4 e7e5 e4e5 d2d4', 2), ('e2e4 e7e5 g1f3 x9y9', 3), ('e2e5', 0), ('', 0)):
+                game = ChessVar(backend)
+                self.assertEqual(game.apply_moves(line), rejected, (backend, line))
+                self.assertEqual(game.get_undo_depth(), rejected)
+            game = ChessVar(backend)
+            self.assertEqual(game.apply_moves([encode_move(12, 28), 4096, encode_move(52, 36)]), 1)
+            self.assertEqual(game.apply_moves([-1]), 0)
+
+    def test_stops_after_win(self):
+        """Moves after the one that wins the game are rejected"""
+        for backend in ('board', 'bitboard'):
+            game = ChessVar(backend)
+            self.assertEqual(game.apply_moves('e2e4 d7d5 e4d5 d8d5 b1c3 h7h6 c3d5 e7e5'), 7)
+            self.assertEqual(game.get_game_state(), 'WHITE_WON')
+
+
+if __name__ == '__main__':
+    unittest.main()
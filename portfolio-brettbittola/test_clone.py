@@ -0,0 +1,68 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Tests that cloned games and the games they came from never change each other.
+
+import random
+import unittest
+
+from ChessVar import ChessVar
+
+
+class CloneTest(unittest.TestCase):
+    """Tests ChessVar.clone on both backends"""
+
+    def test_branches_match_replays(self):
+        """Games cloned from each other and played apart, with moves unmade past the point they were cloned at, each
+        hold the position a fresh game reaches by replaying their own moves"""
+        for backend in ('board', 'bitboard'):
+            rng = random.Random(9)
+            games = [(ChessVar(backend), [])]
+            for step in range(300):
+                game, moves = rng.choice(games)
+                if rng.random() < 0.2:
+                    games.append((game.clone(), list(moves)))
+                elif moves and rng.random() < 0.35:
+                    self.assertTrue(game.unmake_move())
+                    moves.pop()
+                elif game.get_game_state() == 'UNFINISHED':
+                    move = rng.choice(list(game.generate_moves()))
+                    self.assertTrue(game.make_move_idx(*move))
+                    moves.append(move)
+                else:
+                    game.reset()
+                    moves.clear()
+            for game, moves in games:
+                replayed = ChessVar(backend)
+                for move in moves:
+                    self.assertTrue(replayed.make_move_idx(*move))
+                self.assertEqual(game.get_piece_codes(), replayed.get_piece_codes(), backend)
+                self.assertEqual(game.get_unmoved_pawns(), replayed.get_unmoved_pawns())
+                self.assertEqual(game.get_hash(), replayed.get_hash())
+                self.assertEqual(game.material(), replayed.material())
+                self.assertEqual(game.get_game_state(), replayed.get_game_state())
+                self.assertEqual(game.get_undo_depth(), len(moves))
+
+    def test_unmake_past_clone_point(self):
+        """Both a game and its clone can unmake the moves made before the clone, each back to the start, without
+        changing the other"""
+        for backend in ('board', 'bitboard'):
+            game = ChessVar(backend)
+            game.apply_moves('e2e4 d7d5 e4d5')
+            after_capture = game.snapshot()
+            clone = game.clone()
+            for number in range(3):
+                self.assertTrue(clone.unmake_move())
+            self.assertEqual(game.snapshot(), after_capture, backend)
+            self.assertEqual(clone.snapshot(), ChessVar(backend).snapshot())
+            self.assertEqual(clone.material()[1][0], 8)
+            self.assertEqual(game.material()[1][0], 7)
+            for number in range(3):
+                self.assertTrue(game.unmake_move())
+            self.assertEqual(game.snapshot(), clone.snapshot())
+            self.assertEqual(clone.apply_moves('d2d4 e7e5 d4e5'), 3)
+            self.assertEqual(game.snapshot(), ChessVar(backend).snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Tests for the game archive's memory-mapped reader.
+
+import os
+import tempfile
+import unittest
+
+from gamedb import GameDatabase, GameWriter
+from replay import parse_moves
+
+
+class GameDatabaseTest(unittest.TestCase):
+    """Tests GameDatabase against a small archive written by GameWriter"""
+
+    def setUp(self):
+        """Writes an archive of two games to a temporary directory"""
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'games.cvdb')
+        self._games = ['e2e4 d7d5 e4d5 d8d5 b1c3 h7h6 c3d5', 'g1f3 g8f6']
+        with GameWriter(self._path) as writer:
+            for line in self._games:
+                writer.add_game(parse_moves(line))
+
+    def tearDown(self):
+        """Removes the archive"""
+        self._directory.cleanup()
+
+    def test_get_moves(self):
+        """Reads back each game's moves as written"""
+        with GameDatabase(self._path) as database:
+            for game_number, line in enumerate(self._games):
+                self.assertEqual(database.get_moves(game_number), parse_moves(line))
+                self.assertEqual(' '.join(database.get_move_names(game_number)), line)
+
+    def test_close_with_unconsumed_results(self):
+        """Closes cleanly while a get_moves result and a query are still held unconsumed"""
+        database = GameDatabase(self._path)
+        moves = database.get_moves(0)
+        query = database.query(outcome='WHITE_WON')
+        next(query)
+        database.close()
+        self.assertEqual(moves, parse_moves(self._games[0]))
+
+    def test_with_block_exit_with_unconsumed_results(self):
+        """Leaves a with block cleanly while a get_moves result is still held"""
+        with GameDatabase(self._path) as database:
+            moves = iter(database.get_moves(1))
+        self.assertEqual(next(moves), parse_moves(self._games[1])[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Tests that generate_moves lists exactly the moves make_move accepts, on both backends.
+
+import random
+import unittest
+
+from ChessVar import ChessVar
+
+
+class GenerateMovesTest(unittest.TestCase):
+    """Tests generate_moves and legal_moves against make_move along random games"""
+
+    def test_matches_make_move(self):
+        """Every from and to square pair is accepted by make_move_idx exactly when generate_moves lists it"""
+        for backend in ('board', 'bitboard'):
+            rng = random.Random(3)
+            game = ChessVar(backend)
+            for ply in range(12):
+                moves = set(game.generate_moves())
+                for first_index in range(64):
+                    for second_index in range(64):
+                        legal = game.make_move_idx(first_index, second_index)
+                        if legal:
+                            game.unmake_move()
+                        self.assertEqual(legal, (first_index, second_index) in moves,
+                                         (backend, ply, first_index, second_index))
+                game.make_move_idx(*rng.choice(sorted(moves)))
+
+    def test_backends_agree(self):
+        """Both backends list the same moves and reach the same positions and hashes along random games"""
+        rng = random.Random(11)
+        for game_number in range(20):
+            board_game = ChessVar('board')
+            bitboard_game = ChessVar('bitboard')
+            while board_game.get_game_state() == 'UNFINISHED':
+                moves = sorted(board_game.generate_moves())
+                self.assertEqual(moves, sorted(bitboard_game.generate_moves()))
+                move = rng.choice(moves)
+                self.assertTrue(board_game.make_move_idx(*move))
+                self.assertTrue(bitboard_game.make_move_idx(*move))
+                self.assertEqual(board_game.get_piece_codes(), bitboard_game.get_piece_codes())
+                self.assertEqual(board_game.get_unmoved_pawns(), bitboard_game.get_unmoved_pawns())
+                self.assertEqual(board_game.get_hash(), bitboard_game.get_hash())
+                self.assertEqual(board_game.material(), bitboard_game.material())
+                self.assertEqual(board_game.get_game_state(), bitboard_game.get_game_state())
+            self.assertEqual(list(bitboard_game.generate_moves()), [])
+
+    def test_legal_moves_names(self):
+        """legal_moves names the opening's 20 moves as lowercase squares that make_move accepts"""
+        game = ChessVar()
+        moves = game.legal_moves()
+        self.assertEqual(len(moves), 20)
+        self.assertIn(('e2', 'e4'), moves)
+        self.assertTrue(game.make_move(*moves[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
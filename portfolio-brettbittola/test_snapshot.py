@@ -0,0 +1,65 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Tests that snapshots and position text round-trip every part of a position.
+
+import random
+import unittest
+
+from ChessVar import SNAPSHOT_SIZE, STARTING_FEN, ChessVar
+
+
+class SnapshotTest(unittest.TestCase):
+    """Tests snapshot, restore, to_fen and from_fen along random games on both backends"""
+
+    def assert_same_position(self, game, expected):
+        """Checks that two games hold the same position, game state and turn"""
+        self.assertEqual(game.get_piece_codes(), expected.get_piece_codes())
+        self.assertEqual(game.get_unmoved_pawns(), expected.get_unmoved_pawns())
+        self.assertEqual(game.get_hash(), expected.get_hash())
+        self.assertEqual(game.material(), expected.material())
+        self.assertEqual(game.get_game_state(), expected.get_game_state())
+        self.assertEqual(game.get_team_turn(), expected.get_team_turn())
+        self.assertEqual(sorted(game.generate_moves()), sorted(expected.generate_moves()))
+
+    def test_round_trips(self):
+        """Restoring a snapshot and reading back position text give the position they were taken from, on a game
+        reused for every position"""
+        for backend in ('board', 'bitboard'):
+            rng = random.Random(5)
+            restored = ChessVar(backend)
+            for game_number in range(8):
+                game = ChessVar(backend)
+                while game.get_game_state() == 'UNFINISHED':
+                    game.make_move_idx(*rng.choice(list(game.generate_moves())))
+                    data = game.snapshot()
+                    self.assertEqual(len(data), SNAPSHOT_SIZE)
+                    restored.restore(data)
+                    self.assert_same_position(restored, game)
+                    self.assertEqual(restored.snapshot(), data)
+                    self.assert_same_position(ChessVar.from_fen(game.to_fen(), backend), game)
+
+    def test_starting_position(self):
+        """A new game writes the standard starting text, and reset returns a played game to it"""
+        for backend in ('board', 'bitboard'):
+            game = ChessVar(backend)
+            self.assertEqual(game.to_fen(), STARTING_FEN)
+            start = game.snapshot()
+            game.apply_moves('e2e4 d7d5 e4d5')
+            game.reset()
+            self.assertEqual(game.snapshot(), start)
+            self.assertEqual(game.get_undo_depth(), 0)
+
+    def test_rejects_bad_input(self):
+        """restore rejects snapshots of the wrong size or with unknown piece codes, and from_fen malformed text"""
+        game = ChessVar()
+        with self.assertRaises(ValueError):
+            game.restore(bytes(SNAPSHOT_SIZE - 1))
+        with self.assertRaises(ValueError):
+            game.restore(b'\xff' * SNAPSHOT_SIZE)
+        with self.assertRaises(ValueError):
+            ChessVar.from_fen('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w')
+
+
+if __name__ == '__main__':
+    unittest.main()
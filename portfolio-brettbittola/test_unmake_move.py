@@ -0,0 +1,58 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Tests that unmake_move puts back every part of the position make_move changed.
+
+import random
+import unittest
+
+from ChessVar import ChessVar
+
+
+class UnmakeMoveTest(unittest.TestCase):
+    """Tests unmake_move along random games on both backends"""
+
+    def test_restores_position(self):
+        """Unmaking every move of a game walks back through the same boards, hashes, piece counts, game states and
+        turns, to the starting position"""
+        for backend in ('board', 'bitboard'):
+            rng = random.Random(7)
+            for game_number in range(10):
+                game = ChessVar(backend)
+                history = []
+                while game.get_game_state() == 'UNFINISHED':
+                    history.append((game.get_piece_codes(), game.get_unmoved_pawns(), game.get_hash(),
+                                    [list(counts) for counts in game.material()], game.get_game_state(),
+                                    game.get_team_turn()))
+                    game.make_move_idx(*rng.choice(list(game.generate_moves())))
+                self.assertEqual(game.get_undo_depth(), len(history))
+                while history:
+                    self.assertTrue(game.unmake_move())
+                    self.assertEqual((game.get_piece_codes(), game.get_unmoved_pawns(), game.get_hash(),
+                                      game.material(), game.get_game_state(), game.get_team_turn()),
+                                     history.pop(), backend)
+                self.assertEqual(game.get_hash(), game.compute_hash())
+                self.assertFalse(game.unmake_move())
+
+    def test_pawn_double_push_after_unmake(self):
+        """A pawn whose first move is unmade can move two squares again"""
+        for backend in ('board', 'bitboard'):
+            game = ChessVar(backend)
+            self.assertTrue(game.make_move('e2', 'e3'))
+            self.assertTrue(game.unmake_move())
+            self.assertTrue(game.make_move('e2', 'e4'), backend)
+
+    def test_unmake_win(self):
+        """Unmaking the capture that won a game puts the piece back and lets play go on"""
+        for backend in ('board', 'bitboard'):
+            game = ChessVar(backend)
+            self.assertEqual(game.apply_moves('e2e4 d7d5 e4d5 d8d5 b1c3 h7h6 c3d5'), 7)
+            self.assertEqual(game.get_game_state(), 'WHITE_WON')
+            self.assertTrue(game.unmake_move())
+            self.assertEqual(game.get_game_state(), 'UNFINISHED')
+            self.assertEqual(game.material()[1][4], 1)
+            self.assertTrue(game.make_move('c3', 'b5'), backend)
+
+
+if __name__ == '__main__':
+    unittest.main()
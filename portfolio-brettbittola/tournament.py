@@ -0,0 +1,251 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: Plays self-play tournaments between move-choosing policies across a pool of processes.
+
+import argparse
+import collections
+import itertools
+import multiprocessing
+import random
+import sys
+import time
+
+from ChessVar import ChessVar, square_index
+from engine import Engine
+from mcts import MonteCarloPlayer
+
+DEFAULT_MAX_MOVES = 400
+
+
+class RandomPolicy:
+    """Chooses uniformly among the legal moves"""
+
+    def __init__(self, argument=None):
+        """Initializes the policy, which takes no settings"""
+        pass
+
+    def choose_move(self, game, rng):
+        """Returns a (from index, to index) move for the team whose turn it is"""
+        return rng.choice(list(game.generate_moves()))
+
+
+class GreedyCapturePolicy:
+    """Captures whenever it can, preferring the piece type the opponent has fewest of, so it takes a winning capture
+    as soon as one appears, and otherwise moves at random"""
+
+    def __init__(self, argument=None):
+        """Initializes the policy, which takes no settings"""
+        pass
+
+    def choose_move(self, game, rng):
+        """Returns a (from index, to index) move for the team whose turn it is"""
+        moves = list(game.generate_moves())
+        material = game.material()
+        best_moves = []
+        best_count = None
+        for move in moves:
+            code = game.get_piece_code_at(move[1])
+            if not code:
+                continue
+            count = material[(code - 1) // 6][(code - 1) % 6]
+            if best_count is None or count < best_count:
+                best_moves = [move]
+                best_count = count
+            elif count == best_count:
+                best_moves.append(move)
+        return rng.choice(best_moves or moves)
+
+
+class SearchPolicy:
+    """Chooses moves with the alpha-beta engine searching to a fixed depth, so games replay identically"""
+
+    def __init__(self, argument=None):
+        """Initializes the policy with the search depth given as its argument, 2 by default"""
+        if argument is None:
+            self._depth = 2
+        else:
+            self._depth = int(argument)
+        self._engine = Engine(table_bytes=1024 * 1024)
+
+    def choose_move(self, game, rng):
+        """Returns a (from index, to index) move for the team whose turn it is"""
+        first_square, second_square = self._engine.best_move(game, depth=self._depth)
+        return square_index(first_square), square_index(second_square)
+
+
+class MonteCarloPolicy:
+    """Chooses moves with Monte Carlo tree search, keeping its tree from move to move through the game"""
+
+    def __init__(self, argument=None):
+        """Initializes the policy with the playouts per move given as its argument, 200 by default"""
+        if argument is None:
+            self._playouts = 200
+        else:
+            self._playouts = int(argument)
+        self._player = None
+
+    def choose_move(self, game, rng):
+        """Returns a (from index, to index) move for the team whose turn it is"""
+        if self._player is None:
+            self._player = MonteCarloPlayer(self._playouts, rng=rng)
+        first_square, second_square = self._player.best_move(game)
+        return square_index(first_square), square_index(second_square)
+
+
+POLICIES = {'random': RandomPolicy, 'greedy': GreedyCapturePolicy, 'search': SearchPolicy, 'mcts': MonteCarloPolicy}
+
+
+def make_policy(spec):
+    """Returns a policy from a spec naming one of POLICIES, optionally followed by a colon and its argument, such as
+    'search:3'"""
+    name, separator, argument = spec.partition(':')
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {name!r}, expected one of {', '.join(sorted(POLICIES))}")
+    return POLICIES[name](argument or None)
+
+
+def game_seed(base_seed, game_number):
+    """Returns the random seed for one game of a tournament, which depends only on the tournament seed and the game's
+    number so any game can be replayed on its own"""
+    return base_seed * 1000003 + game_number
+
+
+def play_game(white_spec, black_spec, seed, max_moves=DEFAULT_MAX_MOVES, backend='bitboard'):
+    """Plays one game between two policies and returns a dictionary of the policies, the winning color (None for a
+    draw, when the move limit is reached or the side to move has no moves), the number of moves, and the piece type
+    whose last piece was captured"""
+    rng = random.Random(seed)
+    policies = {'white': make_policy(white_spec), 'black': make_policy(black_spec)}
+    game = ChessVar(backend)
+    moves = 0
+    while game.get_game_state() == 'UNFINISHED' and moves < max_moves:
+        if next(game.generate_moves(), None) is None:
+            break
+        first_index, second_index = policies[game.get_team_turn()].choose_move(game, rng)
+        game.make_move_idx(first_index, second_index)
+        moves += 1
+
+    state = game.get_game_state()
+    winner = None
+    decided_by = None
+    if state == 'WHITE_WON':
+        winner = 'white'
+        decided_by = game.scarcest_type('black')[0]
+    elif state == 'BLACK_WON':
+        winner = 'black'
+        decided_by = game.scarcest_type('white')[0]
+    return {'white': white_spec, 'black': black_spec, 'seed': seed, 'winner': winner, 'moves': moves,
+            'decided_by': decided_by}
+
+
+def play_game_task(task):
+    """Unpacks a (white, black, seed, max moves, backend) tuple for play_game in a worker process"""
+    return play_game(*task)
+
+
+def schedule(specs, games_per_pairing, base_seed, max_moves, backend):
+    """Yields a play_game task for every game of a round robin between the policy specs, with colors alternating
+    from game to game within each pairing"""
+    game_number = 0
+    for first_spec, second_spec in itertools.combinations(specs, 2):
+        for pairing_game in range(games_per_pairing):
+            if pairing_game % 2 == 0:
+                white_spec, black_spec = first_spec, second_spec
+            else:
+                white_spec, black_spec = second_spec, first_spec
+            yield white_spec, black_spec, game_seed(base_seed, game_number), max_moves, backend
+            game_number += 1
+
+
+class TournamentResults:
+    """Merges game results into win, loss and draw counts per policy, game lengths and the piece types that ended
+    games"""
+
+    def __init__(self):
+        """Initializes empty results"""
+        self._records = collections.defaultdict(lambda: {'wins': 0, 'losses': 0, 'draws': 0})
+        self._games = 0
+        self._total_moves = 0
+        self._shortest = None
+        self._longest = 0
+        self._decided_by = collections.Counter()
+
+    def add(self, result):
+        """Adds one play_game result"""
+        white = self._records[result['white']]
+        black = self._records[result['black']]
+        if result['winner'] == 'white':
+            white['wins'] += 1
+            black['losses'] += 1
+        elif result['winner'] == 'black':
+            black['wins'] += 1
+            white['losses'] += 1
+        else:
+            white['draws'] += 1
+            black['draws'] += 1
+        self._games += 1
+        self._total_moves += result['moves']
+        if self._shortest is None or result['moves'] < self._shortest:
+            self._shortest = result['moves']
+        self._longest = max(self._longest, result['moves'])
+        if result['decided_by'] is not None:
+            self._decided_by[result['decided_by']] += 1
+
+    def get_summary(self):
+        """Returns a dictionary of each policy's record, the game count, the shortest, longest and mean game length,
+        and how many games each piece type decided"""
+        return {'policies': {spec: dict(record) for spec, record in self._records.items()},
+                'games': self._games,
+                'length': {'min': self._shortest or 0, 'max': self._longest,
+                           'mean': self._total_moves / max(self._games, 1)},
+                'decided_by': dict(self._decided_by)}
+
+
+def run_tournament(specs, games_per_pairing, workers=1, base_seed=0, max_moves=DEFAULT_MAX_MOVES,
+                   backend='bitboard'):
+    """Plays a round robin between the policy specs across a pool of worker processes and returns the merged
+    summary. The results do not depend on the number of workers."""
+    for spec in specs:
+        make_policy(spec)
+    results = TournamentResults()
+    tasks = schedule(specs, games_per_pairing, base_seed, max_moves, backend)
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap_unordered(play_game_task, tasks, chunksize=4):
+                results.add(result)
+    else:
+        for task in tasks:
+            results.add(play_game_task(task))
+    return results.get_summary()
+
+
+def main(argv=None):
+    """Runs a tournament from the command line and prints the results"""
+    parser = argparse.ArgumentParser(description='Self-play round robin between ChessVar move policies')
+    parser.add_argument('policies', nargs='+', help="policy specs such as 'random', 'greedy', 'search:2' or 'mcts:200'")
+    parser.add_argument('--games', type=int, default=10, help='games per pairing of policies')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-moves', type=int, default=DEFAULT_MAX_MOVES, help='moves before a game is a draw')
+    parser.add_argument('--backend', choices=('board', 'bitboard'), default='bitboard')
+    arguments = parser.parse_args(argv)
+    if len(arguments.policies) < 2:
+        parser.error('at least two policies are needed')
+
+    start = time.perf_counter()
+    summary = run_tournament(arguments.policies, arguments.games, arguments.workers, arguments.seed,
+                             arguments.max_moves, arguments.backend)
+    seconds = time.perf_counter() - start
+    print(f"{summary['games']} games in {seconds:.1f}s")
+    for spec, record in sorted(summary['policies'].items()):
+        print(f"{spec:12} {record['wins']:>6} won {record['losses']:>6} lost {record['draws']:>6} drawn")
+    length = summary['length']
+    print(f"game length: min {length['min']}, mean {length['mean']:.1f}, max {length['max']}")
+    for piece_type, count in sorted(summary['decided_by'].items(), key=lambda item: -item[1]):
+        print(f"decided by capturing the last {piece_type}: {count}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: A fixed-size transposition table keyed by ChessVar's Zobrist hash.
+
+from array import array
+
+from ChessVar import decode_move, encode_move
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+NO_MOVE = 0xFFFF
+
+
+class TranspositionTable:
+    """Remembers search results by position hash in a fixed number of slots, so positions reached through different
+    move orders are only evaluated once"""
+
+    # bytes per slot: 8 for the key, 4 for the score, 2 for the move, and 1 each for depth, bound and generation
+    ENTRY_BYTES = 17
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        """Initializes the table with the largest power of two slots that fits in max_bytes, stored in parallel typed
+        arrays so the memory used is fixed up front"""
+        if max_bytes < self.ENTRY_BYTES:
+            raise ValueError(f"max_bytes must be at least {self.ENTRY_BYTES}, got {max_bytes}")
+        size = 1
+        while size * 2 * self.ENTRY_BYTES <= max_bytes:
+            size *= 2
+        self._size = size
+        self._mask = size - 1
+        self._keys = array('Q', bytes(8 * size))
+        self._scores = array('i', bytes(4 * size))
+        self._moves = array('H', [NO_MOVE]) * size
+        self._depths = array('b', [-1]) * size
+        self._bounds = array('B', bytes(size))
+        self._generations = array('B', bytes(size))
+        self._generation = 0
+        self._stored = 0
+        self._probes = 0
+        self._hits = 0
+
+    def __len__(self):
+        """Returns how many slots hold an entry"""
+        return self._stored
+
+    def get_size(self):
+        """Returns the number of slots in the table"""
+        return self._size
+
+    def get_memory(self):
+        """Returns the number of bytes used by the table's slots"""
+        return self._size * self.ENTRY_BYTES
+
+    def get_stats(self):
+        """Returns a dictionary of the table's size, filled slots, probes and hits"""
+        return {'size': self._size, 'stored': self._stored, 'probes': self._probes, 'hits': self._hits}
+
+    def new_search(self):
+        """Starts a new search generation, so entries from earlier searches are replaced before current ones"""
+        self._generation = (self._generation + 1) & 0xFF
+
+    def clear(self):
+        """Empties every slot"""
+        for index in range(self._size):
+            self._depths[index] = -1
+        self._stored = 0
+
+    def probe(self, key):
+        """Returns the (depth, score, bound, move) stored for a position hash, where move is a (from index, to index)
+        pair or None, or returns None if the position is not in the table"""
+        self._probes += 1
+        slot = key & self._mask
+        if self._depths[slot] < 0 or self._keys[slot] != key:
+            return None
+        self._hits += 1
+        move = self._moves[slot]
+        if move == NO_MOVE:
+            return self._depths[slot], self._scores[slot], self._bounds[slot], None
+        return self._depths[slot], self._scores[slot], self._bounds[slot], decode_move(move)
+
+    def store(self, key, depth, score, bound=EXACT, move=None):
+        """Stores a search result for a position hash. A slot holding a different position is replaced only if its
+        entry comes from an earlier search or was searched no deeper than the new one."""
+        slot = key & self._mask
+        stored_depth = self._depths[slot]
+        if stored_depth < 0:
+            self._stored += 1
+        elif (self._keys[slot] != key and self._generations[slot] == self._generation
+              and stored_depth > depth):
+            return
+        self._keys[slot] = key
+        self._depths[slot] = min(depth, 127)
+        self._scores[slot] = score
+        self._bounds[slot] = bound
+        if move is None:
+            self._moves[slot] = NO_MOVE
+        else:
+            self._moves[slot] = encode_move(move[0], move[1])
+        self._generations[slot] = self._generation
@@ -0,0 +1,21 @@
+# Author:  Brett Bittola
+# GitHub username: brettbittola
+# Date: 10/18/2026
+# Description: The ChessVar game each process-pool worker creates once and reuses for every task it runs.
+
+from ChessVar import ChessVar
+
+# the game this worker process reuses, set up by init_worker_game
+_worker_game = None
+
+
+def init_worker_game(backend='bitboard'):
+    """Creates the game this worker process reuses for every task it runs. Give it as a process pool's initializer,
+    or call it from one."""
+    global _worker_game
+    _worker_game = ChessVar(backend)
+
+
+def worker_game():
+    """Returns the game init_worker_game created for this worker process"""
+    return _worker_game